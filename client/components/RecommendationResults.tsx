@@ -14,6 +14,23 @@ export default function RecommendationResults({ recommendations, onBack }: Recom
   const [sortBy, setSortBy] = useState('matchScore')
   const [filterBy, setFilterBy] = useState('all')
   const [searchTerm, setSearchTerm] = useState('')
+  const [reasons, setReasons] = useState<Record<string, string[]>>({})
+
+  const toggleReasons = async (courseId: string) => {
+    if (reasons[courseId]) {
+      const { [courseId]: _, ...rest } = reasons
+      setReasons(rest)
+      return
+    }
+    try {
+      const response = await api.get(`/recommendations/${recommendations.recommendationId}/reasons`, {
+        params: { courseIds: courseId }
+      })
+      setReasons({ ...reasons, [courseId]: response.data.reasons[courseId] || [] })
+    } catch (error) {
+      toast.error('Failed to load match reasons')
+    }
+  }
 
   const getMatchScoreClass = (score: number) => {
     if (score >= 0.8) return 'match-excellent'
@@ -213,16 +230,23 @@ export default function RecommendationResults({ recommendations, onBack }: Recom
               </div>
 
               {/* Match Reasons */}
-              {recommendation.reasons && recommendation.reasons.length > 0 && (
+              {recommendation.reasonCodes && recommendation.reasonCodes.length > 0 && (
                 <div className="mb-4">
-                  <h4 className="text-sm font-medium text-gray-900 mb-2">Why this matches:</h4>
-                  <ul className="list-disc list-inside space-y-1">
-                    {recommendation.reasons.map((reason: string, reasonIndex: number) => (
-                      <li key={reasonIndex} className="text-sm text-gray-600">
-                        {reason}
-                      </li>
-                    ))}
-                  </ul>
+                  <button
+                    onClick={() => toggleReasons(recommendation.course.id)}
+                    className="text-sm font-medium text-primary-600 hover:text-primary-700 mb-2"
+                  >
+                    Why this matches?
+                  </button>
+                  {reasons[recommendation.course.id] && (
+                    <ul className="list-disc list-inside space-y-1">
+                      {reasons[recommendation.course.id].map((reason: string, reasonIndex: number) => (
+                        <li key={reasonIndex} className="text-sm text-gray-600">
+                          {reason}
+                        </li>
+                      ))}
+                    </ul>
+                  )}
                 </div>
               )}
 
@@ -5,10 +5,20 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from pymongo import MongoClient
 from bson import ObjectId
 import os
+import time
+import atexit
 from datetime import datetime, timedelta
 import json
+from functools import wraps
 from dotenv import load_dotenv
 from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, PostgresCatalogueSource
+from course_snapshot import SnapshotCatalogueSource, DEFAULT_SNAPSHOT_DIR
+from result_cache import ResultCache
+from student_scores import StudentScoreStore
+from pagination import RecommendationPager, parse_page_size
+from reasons import render_reasons
+from instrumentation import Instrumentation, server_timing_header
 from models.student import Student
 from models.course import Course
 from models.university import University
@@ -20,6 +30,12 @@ app = Flask(__name__)
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
 
+# Largest cohort accepted by the batch recommendations endpoint
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '1000'))
+
+# Paged recommendations: largest page and how long a cursor stays valid
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+
 # Initialize extensions
 jwt = JWTManager(app)
 CORS(app)
@@ -28,8 +44,77 @@ CORS(app)
 client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
 db = client.university_recommender
 
+# Course catalogue: 'postgres' serves the course tables from memory and
+# hot-reloads when the catalogue_version row changes; 'snapshot' memory-maps a
+# snapshot built by course_snapshot.py and reloads when it is rebuilt;
+# 'sample' serves sample data
+course_catalogue = None
+catalogue_source = None
+if os.getenv('RECOMMENDER_CATALOGUE', 'sample') == 'postgres':
+    catalogue_source = PostgresCatalogueSource()
+elif os.getenv('RECOMMENDER_CATALOGUE', 'sample') == 'snapshot':
+    catalogue_source = SnapshotCatalogueSource(os.getenv('CATALOGUE_SNAPSHOT_DIR', str(DEFAULT_SNAPSHOT_DIR)))
+if catalogue_source is not None:
+    course_catalogue = CourseCatalogue(
+        catalogue_source,
+        poll_interval=float(os.getenv('CATALOGUE_POLL_SECONDS', '60'))
+    )
+    # Sharded scoring workers import this module as __mp_main__; only the
+    # serving process polls for catalogue changes
+    if __name__ != '__mp_main__':
+        course_catalogue.start()
+
+# Recommendation result cache (set RESULT_CACHE_ENTRIES=0 to disable)
+result_cache = None
+if int(os.getenv('RESULT_CACHE_ENTRIES', '2048')) > 0:
+    result_cache = ResultCache(
+        max_entries=int(os.getenv('RESULT_CACHE_ENTRIES', '2048')),
+        ttl_seconds=float(os.getenv('RESULT_CACHE_TTL_SECONDS', '600')),
+        max_bytes=int(float(os.getenv('RESULT_CACHE_MAX_MB', '64')) * 1024 * 1024)
+    )
+
+# Stage timing spans (RECOMMENDER_INSTRUMENTATION=1); requests sending the
+# debug header also get their own breakdown in a Server-Timing header
+instrumentation = Instrumentation(enabled=os.getenv('RECOMMENDER_INSTRUMENTATION', '0') == '1')
+DEBUG_TIMINGS_HEADER = 'X-Debug-Timings'
+
 # Initialize recommendation engine
-recommendation_engine = RecommendationEngine()
+recommendation_engine = RecommendationEngine(
+    scoring_mode=os.getenv('RECOMMENDER_SCORING_MODE', 'vectorized'),
+    catalogue=course_catalogue,
+    result_cache=result_cache,
+    # Per-student score vectors for incremental re-ranking
+    score_store=StudentScoreStore(
+        max_students=int(os.getenv('STUDENT_SCORES_MAX_STUDENTS', '128')),
+        max_bytes=int(float(os.getenv('STUDENT_SCORES_MAX_MB', '256')) * 1024 * 1024)
+    ),
+    # Worker processes for sharded scoring (0 = score in the request thread)
+    workers=int(os.getenv('RECOMMENDER_WORKERS', '0')),
+    # Build the "similar courses" index with every catalogue load
+    similarity_index=True,
+    instrumentation=instrumentation
+)
+atexit.register(recommendation_engine.close)
+
+# Ranked orders behind recommendation cursors
+recommendation_pager = RecommendationPager(
+    recommendation_engine,
+    ttl_seconds=float(os.getenv('CURSOR_TTL_SECONDS', '900'))
+)
+
+def is_admin(student_id):
+    """Whether a student account has the admin role"""
+    student = db.students.find_one({'_id': ObjectId(student_id)}, {'role': 1})
+    return student is not None and student.get('role') == 'admin'
+
+def admin_required(view):
+    """Reject callers without the admin role; use below @jwt_required()"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin(get_jwt_identity()):
+            return jsonify({'message': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -51,6 +136,8 @@ def register():
         if db.students.find_one({'email': data['email']}):
             return jsonify({'message': 'User already exists'}), 400
         
+        recommendation_engine.validate_preferences(data.get('preferences', {}))
+        
         # Create new student
         student_data = {
             'email': data['email'],
@@ -61,6 +148,8 @@ def register():
             'aLevelSubjects': data.get('aLevelSubjects', []),
             'predictedGrades': data.get('predictedGrades', {}),
             'preferences': data.get('preferences', {}),
+            # Never taken from the request; admins are promoted in the database
+            'role': 'student',
             'createdAt': datetime.now(),
             'lastLogin': None
         }
@@ -77,6 +166,8 @@ def register():
             'student_id': student_id
         }), 201
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Registration failed: {str(e)}'}), 500
 
@@ -144,6 +235,7 @@ def update_profile():
         if 'predictedGrades' in data:
             update_data['predictedGrades'] = data['predictedGrades']
         if 'preferences' in data:
+            recommendation_engine.validate_preferences(data['preferences'])
             update_data['preferences'] = data['preferences']
         
         update_data['updatedAt'] = datetime.now()
@@ -158,9 +250,42 @@ def update_profile():
         
         return jsonify({'message': 'Profile updated successfully'})
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to update profile: {str(e)}'}), 500
 
+@app.before_request
+def start_debug_timings():
+    if request.headers.get(DEBUG_TIMINGS_HEADER):
+        instrumentation.start_trace()
+
+@app.after_request
+def add_debug_timings(response):
+    timings = instrumentation.finish_trace()
+    if timings:
+        response.headers['Server-Timing'] = server_timing_header(timings)
+    return response
+
+def stored_course_id(rec):
+    """Course ID of a stored recommendation, compact or in the older full-course shape"""
+    return rec['courseId'] if 'courseId' in rec else rec['course'].get('id')
+
+def stored_reasons(rec):
+    """Reason text of a stored recommendation; older records kept the rendered text"""
+    return rec['reasons'] if 'reasons' in rec else render_reasons(rec.get('reasonCodes', []))
+
+def compact_recommendations(recommendations):
+    """Stored form of a result list: course IDs, scores and reason codes only"""
+    return [
+        {
+            'courseId': rec['course'].get('id'),
+            'matchScore': rec['matchScore'],
+            'reasonCodes': rec['reasonCodes']
+        }
+        for rec in recommendations
+    ]
+
 # Recommendation routes
 @app.route('/api/recommendations', methods=['POST'])
 @jwt_required()
@@ -168,40 +293,210 @@ def get_recommendations():
     """Get course recommendations for student"""
     try:
         student_id = get_jwt_identity()
-        student = db.students.find_one({'_id': ObjectId(student_id)})
+        
+        # Get recommendation criteria from request
+        criteria = request.get_json() or {}
+        
+        # Paged mode: a cursor from a previous page is served straight from
+        # the stored ranking, without loading the student or re-scoring
+        if 'cursor' in criteria:
+            page_size = parse_page_size(criteria.get('pageSize', 50), MAX_PAGE_SIZE)
+            try:
+                page = recommendation_pager.next_page(criteria['cursor'], page_size, owner=student_id)
+            except ValueError:
+                page = None
+            if page is None:
+                return jsonify({'message': 'Cursor expired or invalid'}), 410
+            return jsonify(page)
+        
+        with instrumentation.span('mongo_lookup'):
+            student = db.students.find_one({'_id': ObjectId(student_id)})
         
         if not student:
             return jsonify({'message': 'Student not found'}), 404
         
-        # Get recommendation criteria from request
-        criteria = request.get_json()
+        # Optional per-request weights (counsellor sliders); missing criteria keep their defaults
+        weights = recommendation_engine.resolve_weights(criteria.pop('weights', None))
+        
+        if 'pageSize' in criteria:
+            page_size = parse_page_size(criteria.pop('pageSize'), MAX_PAGE_SIZE)
+            page = recommendation_pager.first_page(
+                student['aLevelSubjects'],
+                student['predictedGrades'],
+                student.get('preferences', {}),
+                criteria,
+                page_size,
+                owner=student_id,
+                weights=weights
+            )
+            
+            # Only the first page is stored; the profile lets reasons for
+            # courses on later pages be computed when they are expanded
+            with instrumentation.span('mongo_insert'):
+                result = db.recommendations.insert_one({
+                    'studentId': ObjectId(student_id),
+                    'criteria': criteria,
+                    'weights': weights,
+                    'recommendations': compact_recommendations(page['recommendations']),
+                    'profile': {
+                        'aLevelSubjects': student['aLevelSubjects'],
+                        'predictedGrades': student['predictedGrades'],
+                        'preferences': student.get('preferences', {})
+                    },
+                    'createdAt': datetime.now()
+                })
+            page['recommendationId'] = str(result.inserted_id)
+            return jsonify(page)
         
         # Generate recommendations
         recommendations = recommendation_engine.get_recommendations(
             student['aLevelSubjects'],
             student['predictedGrades'],
             student.get('preferences', {}),
-            criteria
+            criteria,
+            student_key=student_id,
+            weights=weights
         )
         
         # Save recommendations to database
         recommendation_data = {
             'studentId': ObjectId(student_id),
             'criteria': criteria,
-            'recommendations': recommendations,
+            'weights': weights,
+            'recommendations': compact_recommendations(recommendations),
             'createdAt': datetime.now()
         }
         
-        db.recommendations.insert_one(recommendation_data)
+        with instrumentation.span('mongo_insert'):
+            result = db.recommendations.insert_one(recommendation_data)
         
         return jsonify({
+            'recommendationId': str(result.inserted_id),
             'recommendations': recommendations,
-            'total': len(recommendations)
+            'total': len(recommendations),
+            'weights': weights
         })
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to get recommendations: {str(e)}'}), 500
 
+@app.route('/api/recommendations/<recommendation_id>/reasons', methods=['GET'])
+@jwt_required()
+def get_recommendation_reasons(recommendation_id):
+    """Render the match reasons of stored recommendations for the courses a user expands"""
+    try:
+        student_id = get_jwt_identity()
+        
+        recommendation = db.recommendations.find_one({
+            '_id': ObjectId(recommendation_id),
+            'studentId': ObjectId(student_id)
+        })
+        
+        if not recommendation:
+            return jsonify({'message': 'Recommendations not found'}), 404
+        
+        # Only the requested courses are rendered; without courseIds every course is
+        course_ids = request.args.get('courseIds')
+        wanted = set(course_ids.split(',')) if course_ids else None
+        
+        reasons = {
+            stored_course_id(rec): stored_reasons(rec)
+            for rec in recommendation['recommendations']
+            if wanted is None or stored_course_id(rec) in wanted
+        }
+        
+        # Courses from later pages of a paged request were never stored
+        profile = recommendation.get('profile')
+        if wanted and profile:
+            unstored = [course_id for course_id in wanted if course_id not in reasons]
+            codes = recommendation_engine.get_reason_codes(
+                unstored, profile['aLevelSubjects'], profile['predictedGrades'], profile['preferences']
+            )
+            reasons.update({course_id: render_reasons(course_codes) for course_id, course_codes in codes.items()})
+        
+        return jsonify({'reasons': reasons})
+        
+    except Exception as e:
+        return jsonify({'message': f'Failed to get reasons: {str(e)}'}), 500
+
+@app.route('/api/recommendations/batch', methods=['POST'])
+@jwt_required()
+def get_batch_recommendations():
+    """Get course recommendations for a whole cohort in one call"""
+    try:
+        data = request.get_json()
+        criteria = data.get('criteria', {})
+        limit = parse_page_size(data.get('limit', 50), MAX_PAGE_SIZE, 'limit')
+        # Optional per-request weights, shared by the whole cohort
+        weights = recommendation_engine.resolve_weights(data.get('weights'))
+        
+        # Profiles are either looked up by student ID in one query or sent
+        # inline; students may only request their own ID, admins any
+        caller_id = get_jwt_identity()
+        stored_profiles = 'studentIds' in data
+        if stored_profiles:
+            if any(student_id != caller_id for student_id in data['studentIds']) and not is_admin(caller_id):
+                return jsonify({'message': 'Not authorised for these students'}), 403
+            student_ids = [ObjectId(student_id) for student_id in data['studentIds']]
+            students = {
+                student['_id']: student
+                for student in db.students.find({'_id': {'$in': student_ids}})
+            }
+            missing = [str(student_id) for student_id in student_ids if student_id not in students]
+            if missing:
+                return jsonify({'message': 'Students not found', 'studentIds': missing}), 404
+            profiles = [students[student_id] for student_id in student_ids]
+        else:
+            profiles = data.get('students', [])
+            for profile in profiles:
+                recommendation_engine.validate_preferences(profile.get('preferences', {}))
+        
+        if not profiles:
+            return jsonify({'message': 'No students provided'}), 400
+        if len(profiles) > MAX_BATCH_SIZE:
+            return jsonify({'message': f'Batch size is limited to {MAX_BATCH_SIZE} students'}), 400
+        
+        started = time.perf_counter()
+        recommendations = recommendation_engine.get_batch_recommendations(profiles, criteria, limit, weights)
+        elapsed = time.perf_counter() - started
+        
+        # Save recommendations for stored students in a single round trip;
+        # inline profiles are never saved, whatever IDs they carry
+        if stored_profiles:
+            created_at = datetime.now()
+            db.recommendations.insert_many([
+                {
+                    'studentId': profile['_id'],
+                    'criteria': criteria,
+                    'weights': weights,
+                    'recommendations': compact_recommendations(student_recommendations),
+                    'createdAt': created_at
+                }
+                for profile, student_recommendations in zip(profiles, recommendations)
+            ])
+        
+        return jsonify({
+            'results': [
+                {
+                    'studentId': str(profile['_id']) if '_id' in profile else profile.get('studentId'),
+                    'recommendations': student_recommendations,
+                    'total': len(student_recommendations)
+                }
+                for profile, student_recommendations in zip(profiles, recommendations)
+            ],
+            'students': len(profiles),
+            'weights': weights,
+            'elapsedSeconds': round(elapsed, 4),
+            'studentsPerSecond': round(len(profiles) / elapsed, 1) if elapsed > 0 else None
+        })
+        
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Failed to get batch recommendations: {str(e)}'}), 500
+
 # Course and university data routes
 @app.route('/api/courses', methods=['GET'])
 def get_courses():
@@ -239,6 +534,23 @@ def get_courses():
     except Exception as e:
         return jsonify({'message': f'Failed to get courses: {str(e)}'}), 500
 
+@app.route('/api/courses/<course_id>/similar', methods=['GET'])
+def get_similar_courses(course_id):
+    """Get the courses most similar to a course"""
+    try:
+        limit = parse_page_size(request.args.get('limit', 10), MAX_PAGE_SIZE, 'limit')
+        similar = recommendation_engine.get_similar_courses(course_id, limit)
+        
+        if similar is None:
+            return jsonify({'message': 'Course not found'}), 404
+        
+        return jsonify({'courseId': course_id, 'similar': similar})
+        
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Failed to get similar courses: {str(e)}'}), 500
+
 @app.route('/api/universities', methods=['GET'])
 def get_universities():
     """Get all universities"""
@@ -257,10 +569,10 @@ def get_universities():
 # Admin routes
 @app.route('/api/admin/courses', methods=['POST'])
 @jwt_required()
+@admin_required
 def add_course():
     """Add new course (admin only)"""
     try:
-        # Check if user is admin (implement proper admin check)
         data = request.get_json()
         
         course_data = {
@@ -286,6 +598,40 @@ def add_course():
     except Exception as e:
         return jsonify({'message': f'Failed to add course: {str(e)}'}), 500
 
+@app.route('/api/admin/stats/cache', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_cache_stats():
+    """Get recommendation result cache counters"""
+    if result_cache is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify({
+        'enabled': True,
+        'catalogueVersion': recommendation_engine.catalogue.version,
+        **result_cache.stats()
+    })
+
+@app.route('/api/admin/stats/timings', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_timing_stats():
+    """Get per-stage request timing counters and histograms"""
+    stats = instrumentation.stats()
+    if request.args.get('reset') == '1':
+        instrumentation.reset()
+    return jsonify(stats)
+
+@app.route('/api/admin/stats/catalogue', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_catalogue_stats():
+    """Get catalogue size, load time and per-version precompute timings"""
+    try:
+        return jsonify(recommendation_engine.get_catalogue_stats())
+    except Exception as e:
+        return jsonify({'message': f'Failed to get catalogue stats: {str(e)}'}), 500
+
 # Export routes
 @app.route('/api/export/recommendations/<student_id>', methods=['GET'])
 @jwt_required()
@@ -314,15 +660,25 @@ def export_recommendations(student_id):
             # Write header
             writer.writerow(['Rank', 'Course', 'University', 'Match Score', 'Fees', 'Entry Requirements'])
             
+            # Stored recommendations only keep course IDs; details come from the catalogue
+            # (older records embed the whole course instead)
+            stored = recommendations['recommendations']
+            courses = recommendation_engine.find_courses([stored_course_id(rec) for rec in stored])
+            
             # Write data
-            for i, rec in enumerate(recommendations['recommendations'], 1):
+            for i, rec in enumerate(stored, 1):
+                course = courses.get(stored_course_id(rec), rec.get('course'))
+                if course is None:
+                    # Course no longer in the catalogue
+                    writer.writerow([i, stored_course_id(rec), '', rec['matchScore'], '', ''])
+                    continue
                 writer.writerow([
                     i,
-                    rec['course']['name'],
-                    rec['course']['university']['name'],
+                    course['name'],
+                    course['university']['name'],
                     rec['matchScore'],
-                    rec['course']['fees']['uk'],
-                    str(rec['course']['entryRequirements']['grades'])
+                    course['fees']['uk'],
+                    str(course['entryRequirements']['grades'])
                 ])
             
             return jsonify({
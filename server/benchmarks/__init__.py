@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the recommendation engine
+Run from the server directory, e.g. `python -m benchmarks.sharded_scoring`;
+`python -m benchmarks.engine_suite` runs the full suite against baselines.json
+"""
@@ -0,0 +1,64 @@
+"""
+Catalogue snapshot benchmark
+Times writing a course catalogue snapshot, memory-mapping it, compiling the
+scoring matrix from the mapped columns (the API's cold start) and decoding
+every course view, on synthetic catalogues
+
+Usage: python -m benchmarks.catalogue_snapshot [--sizes 30k,400k]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_snapshot import SnapshotCatalogueSource, decode_courses, write_snapshot
+from course_matrix import CourseMatrix
+from recommendation_engine import RecommendationEngine
+from benchmarks.synthetic import generate_courses
+from benchmarks.engine_suite import parse_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory-mapped catalogue snapshot')
+    parser.add_argument('--sizes', default='30k,400k', help='Comma-separated catalogue sizes')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CATALOGUE SNAPSHOT BENCHMARK")
+    print("=" * 60)
+    engine = RecommendationEngine()
+    print(f"\n{'courses':>10} {'write s':>10} {'MB':>8} {'map ms':>10} {'compile s':>10} {'decode s':>10}")
+
+    for size in [parse_size(value) for value in args.sizes.split(',')]:
+        courses = generate_courses(size)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            started = time.perf_counter()
+            build = write_snapshot(Path(temp_dir), 1, courses)
+            write_seconds = time.perf_counter() - started
+            megabytes = sum(path.stat().st_size for path in build.iterdir()) / (1024 * 1024)
+
+            started = time.perf_counter()
+            _, loaded = SnapshotCatalogueSource(Path(temp_dir)).load()
+            map_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            CourseMatrix(loaded, engine.grade_values, engine._get_university_region)
+            compile_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            decoded = decode_courses(loaded.columns)
+            decode_seconds = time.perf_counter() - started
+            assert decoded == courses
+            del loaded, decoded
+
+        print(f"{size:>10,} {write_seconds:>10.2f} {megabytes:>8.1f} {map_seconds * 1000:>10.1f} "
+              f"{compile_seconds:>10.2f} {decode_seconds:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
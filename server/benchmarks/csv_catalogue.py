@@ -0,0 +1,258 @@
+"""
+Course catalogue loaded straight from the import CSV files
+Builds the same course views PostgresCatalogueSource serves, from the core
+`universities.csv` and `courses.csv` files (see database/data/README.md) and
+from the Discover Uni extract in the repository's data/ directory, so
+benchmarks can run on real data without a database
+"""
+
+import csv
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from catalogue import kis_course_id
+from tariff import TARIFF_COLUMNS
+
+# The Discover Uni extract shipped with the repository
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
+
+NSS_THEME_COLUMNS = ['t1', 't2', 't3', 't4', 't5', 't6', 't7']
+
+
+def _first(row: Dict[str, str], *columns: str) -> Optional[str]:
+    """Value of the first of several alias columns that is present and non-empty"""
+    for column in columns:
+        value = (row.get(column) or '').strip()
+        if value:
+            return value
+    return None
+
+
+def _number(value: Optional[str]) -> Optional[int]:
+    return int(float(value)) if value is not None else None
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _csv_files(data_dir: Path) -> Dict[str, Path]:
+    """CSV files in a directory, keyed by lower-case file name"""
+    return {path.name.lower(): path for path in data_dir.glob('*') if path.suffix.lower() == '.csv'}
+
+
+def _rows(path: Path) -> Iterator[Dict[str, str]]:
+    """Rows of a Discover Uni file with lower-case column names (the table column names)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader, [])]
+        for values in reader:
+            yield dict(zip(header, values))
+
+
+def _course_key(row: Dict[str, str]) -> Tuple[str, str, str]:
+    return row['pubukprn'], row['kiscourseid'], row['kismode']
+
+
+def _per_course(files: Dict[str, Path], name: str) -> Dict[Tuple[str, str, str], Dict[str, str]]:
+    """First row per course of a Discover Uni file keyed by course (empty if the file is absent)"""
+    rows = {}
+    if name in files:
+        for row in _rows(files[name]):
+            rows.setdefault(_course_key(row), row)
+    return rows
+
+
+def load_catalogue(data_dir: Path = DEFAULT_DATA_DIR) -> List[Dict[str, Any]]:
+    """Every course the files in data_dir describe: core courses, then Discover Uni courses"""
+    data_dir = Path(data_dir)
+    files = _csv_files(data_dir)
+    courses = []
+    if 'courses.csv' in files:
+        courses += load_csv_courses(data_dir)
+    if 'kiscourse.csv' in files or 'common.csv' in files:
+        courses += load_discover_uni_courses(data_dir)
+    if not courses:
+        raise FileNotFoundError(f"No courses.csv or Discover Uni course files in {data_dir}")
+    return courses
+
+
+def load_csv_courses(data_dir: Path = DEFAULT_DATA_DIR) -> List[Dict[str, Any]]:
+    """Course dictionaries for every course in courses.csv whose university is in universities.csv"""
+    data_dir = Path(data_dir)
+    universities = {}
+    with open(data_dir / 'universities.csv', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            university_id = _first(row, 'university_id')
+            name = _first(row, 'name')
+            if not (university_id and name):
+                continue
+            rank_overall = _number(_first(row, 'rank_overall', 'ranking'))
+            universities[university_id] = {
+                'id': university_id,
+                'name': name,
+                'region': _first(row, 'region', 'location'),
+                'ranking': {'overall': rank_overall} if rank_overall is not None else {},
+                'website': _first(row, 'website_url', 'website'),
+                'employabilityScore': _number(_first(row, 'employability_score', 'employability'))
+            }
+
+    courses = []
+    with open(data_dir / 'courses.csv', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            course_id = _first(row, 'course_id')
+            name = _first(row, 'name', 'course_name')
+            university = universities.get(_first(row, 'university_id'))
+            if not (course_id and name and university):
+                continue
+
+            # Requirements pair subjects with grades by position, 'B' when unspecified
+            subjects = _split(_first(row, 'required_subjects', 'subjects'))
+            grades = _split(_first(row, 'required_grades', 'grades'))
+            requirements = {
+                'subjects': subjects,
+                'grades': {subject: grades[i] if i < len(grades) else 'B' for i, subject in enumerate(subjects)}
+            }
+
+            ranking = dict(university['ranking'])
+            subject_rank = _number(_first(row, 'subject_rank', 'subject_ranking'))
+            if subject_rank is not None:
+                ranking['subject'] = subject_rank
+
+            employability = {}
+            employment_rate = _number(_first(row, 'employability_score', 'employability'))
+            if employment_rate is None:
+                employment_rate = university['employabilityScore']
+            if employment_rate is not None:
+                employability['employmentRate'] = employment_rate
+
+            annual_fee = _number(_first(row, 'annual_fee', 'fee', 'uk_fees'))
+            courses.append({
+                'id': course_id,
+                'name': name,
+                'ucasCode': _first(row, 'ucas_code', 'ucas'),
+                'university': {
+                    'id': university['id'],
+                    'name': university['name'],
+                    'region': university['region'],
+                    'ranking': ranking,
+                    'website': university['website']
+                },
+                'entryRequirements': requirements,
+                'fees': {'uk': annual_fee} if annual_fee is not None else {},
+                'employability': employability,
+                'typicalOffer': {
+                    'text': _first(row, 'typical_offer_text', 'typical_offer'),
+                    'tariff': _number(_first(row, 'typical_offer_tariff', 'tariff'))
+                },
+                'url': _first(row, 'course_url', 'url'),
+                'source': 'course'
+            })
+
+    # The database serves courses ordered by ID
+    courses.sort(key=lambda course: course['id'])
+    return courses
+
+
+def load_discover_uni_courses(data_dir: Path = DEFAULT_DATA_DIR) -> List[Dict[str, Any]]:
+    """
+    Course views for the Discover Uni files, as PostgresCatalogueSource builds them.
+
+    KISCOURSE.csv lists the courses; extracts without it fall back to the
+    course keys in COMMON.csv, named by their KIS course ID. Files with one row
+    per course and subject aggregate contribute their first row.
+    """
+    files = _csv_files(Path(data_dir))
+
+    institutions = {}
+    for row in _rows(files['institution.csv']):
+        institutions[row['pubukprn']] = row
+
+    cah_codes = defaultdict(list)
+    if 'sbj.csv' in files:
+        for row in _rows(files['sbj.csv']):
+            cah_codes[_course_key(row)].append(row['sbj'])
+
+    tariffs = {}
+    for key, row in _per_course(files, 'tariff.csv').items():
+        distribution = [float(_number(row.get(column) or None) or 0) for column in TARIFF_COLUMNS]
+        if sum(distribution) > 0:
+            tariffs[key] = distribution
+
+    coordinates = {}
+    if 'location.csv' in files:
+        for row in _rows(files['location.csv']):
+            if row.get('latitude') and row.get('longitude'):
+                coordinates[(row['ukprn'], row['locid'])] = row
+    locations = defaultdict(list)
+    if 'courselocation.csv' in files:
+        for row in _rows(files['courselocation.csv']):
+            location = coordinates.get((row['ukprn'], row['locid']))
+            if location is not None:
+                locations[_course_key(row)].append({
+                    'id': location['locid'],
+                    'name': location['locname'],
+                    'latitude': float(location['latitude']),
+                    'longitude': float(location['longitude'])
+                })
+
+    employment = _per_course(files, 'employment.csv')
+    salaries = _per_course(files, 'gosalary.csv')
+    continuation = _per_course(files, 'continuation.csv')
+    nss = _per_course(files, 'nss.csv')
+    spine = _per_course(files, 'kiscourse.csv') or _per_course(files, 'common.csv')
+
+    courses = []
+    for key in sorted(spine):
+        pubukprn, kiscourseid, kismode = key
+        institution = institutions.get(pubukprn)
+        if institution is None:
+            continue
+        course = spine[key]
+
+        employability = {}
+        work_or_study = _number(employment.get(key, {}).get('workstudy') or None)
+        if work_or_study is not None:
+            employability['employmentRate'] = work_or_study
+        salary = salaries.get(key, {})
+        median_salary = _number(salary.get('goinstmed') or None)
+        if median_salary is not None:
+            employability['averageSalary'] = median_salary
+
+        outcomes = {}
+        for field, value in (('salaryLowerQuartile', salary.get('goinstlq')),
+                             ('salaryUpperQuartile', salary.get('goinstuq')),
+                             ('continuationRate', continuation.get(key, {}).get('ucont'))):
+            if _number(value or None) is not None:
+                outcomes[field] = _number(value)
+
+        nss_themes = [_number(nss.get(key, {}).get(column) or None) for column in NSS_THEME_COLUMNS]
+        # Locations are ordered by ID, as LOCATION_QUERY returns them
+        course_locations = sorted(locations.get(key, []), key=lambda location: location['id'])
+
+        courses.append({
+            'id': kis_course_id(pubukprn, kiscourseid, kismode),
+            'kisCourseId': kiscourseid,
+            'kisMode': kismode,
+            'kisAimCode': course.get('kisaimcode') or None,
+            'name': course.get('title') or kiscourseid,
+            'university': {
+                'id': pubukprn,
+                'name': institution.get('first_trading_name') or institution.get('legal_name'),
+                'ranking': {},
+                'website': institution.get('provurl') or None
+            },
+            'entryRequirements': {'subjects': [], 'grades': {}},
+            'cahCodes': sorted(cah_codes.get(key, [])),
+            'locations': course_locations,
+            'fees': {},
+            'employability': employability,
+            'outcomes': outcomes,
+            'tariffDistribution': tariffs.get(key),
+            'nssThemes': nss_themes if any(theme is not None for theme in nss_themes) else None,
+            'url': course.get('crseurl') or None,
+            'source': 'discover_uni'
+        })
+
+    return courses
@@ -0,0 +1,148 @@
+"""
+CSV import benchmark
+Times turning a courses.csv into the row tuples import_csv.py inserts, for the
+column-wise preparation against the per-row DataFrame.iterrows loop it
+replaced, on synthetic files. No database is needed.
+
+Usage: python -m benchmarks.csv_import [--sizes 10k,100k] [--iterrows-max 100k]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database'))
+
+from import_csv import COURSE_FIELDS, prepare_courses, _rows, _split_list
+from benchmarks.synthetic import generate_courses, UNIVERSITIES
+from benchmarks.engine_suite import parse_size
+
+EXAMS = ['MAT', 'STEP', 'PAT', 'TSA', 'BMAT', 'UKCAT', 'LNAT']
+
+
+def write_courses_csv(courses_file: Path, count: int):
+    """courses.csv with `count` courses, in the documented import format"""
+    rng = random.Random(4)
+    university_ids = {name: f'UNIV_{i:03d}' for i, name in enumerate(UNIVERSITIES)}
+    rows = []
+    for course in generate_courses(count):
+        subjects = course['entryRequirements']['subjects']
+        rows.append({
+            'course_id': course['id'],
+            'university_id': university_ids[course['university']['name']],
+            'name': course['name'],
+            'ucas_code': f'{rng.choice("GHLNV")}{rng.randint(100, 999)}',
+            'annual_fee': course['fees']['uk'],
+            'subject_rank': rng.randint(1, 100) if rng.random() < 0.7 else None,
+            'employability_score': course.get('employability', {}).get('employmentRate'),
+            'course_url': f'https://example.ac.uk/{course["id"].lower()}',
+            'typical_offer_text': ''.join(rng.choice('A*AB') for _ in range(3)),
+            'typical_offer_tariff': rng.choice([112, 128, 144, 160]) if rng.random() < 0.8 else None,
+            'required_subjects': ','.join(subjects),
+            'required_grades': ','.join(course['entryRequirements']['grades'][subject] for subject in subjects),
+            'required_exams': rng.choice(EXAMS) if rng.random() < 0.1 else ''
+        })
+    pd.DataFrame(rows).to_csv(courses_file, index=False)
+
+
+def iterrows_courses(df: pd.DataFrame) -> Tuple[List[tuple], int, int]:
+    """The per-row loops import_courses used: course tuples, then two more passes splitting requirements and exams"""
+    courses = []
+    course_map = {}
+    for _, row in df.iterrows():
+        course_id = str(row.get('course_id', ''))
+        university_id = str(row.get('university_id', '')).strip()
+        ucas_code = str(row.get('ucas_code', row.get('ucas', ''))).strip() or None
+        name = str(row.get('name', row.get('course_name', ''))).strip()
+        annual_fee = int(row.get('annual_fee', row.get('fee', row.get('uk_fees', 0)))) if pd.notna(row.get('annual_fee', row.get('fee', row.get('uk_fees', None)))) else None
+        subject_rank = int(row.get('subject_rank', row.get('subject_ranking', 0))) if pd.notna(row.get('subject_rank', row.get('subject_ranking', None))) else None
+        employability_score = int(row.get('employability_score', row.get('employability', 0))) if pd.notna(row.get('employability_score', row.get('employability', None))) else None
+        course_url = str(row.get('course_url', row.get('url', ''))).strip() or None
+        typical_offer_text = str(row.get('typical_offer_text', row.get('typical_offer', ''))).strip() or None
+        typical_offer_tariff = int(row.get('typical_offer_tariff', row.get('tariff', 0))) if pd.notna(row.get('typical_offer_tariff', row.get('tariff', None))) else None
+        if name and university_id:
+            courses.append((course_id, university_id, ucas_code, name, annual_fee, subject_rank, employability_score, course_url, typical_offer_text, typical_offer_tariff))
+            course_map[course_id] = university_id
+
+    requirements = 0
+    for _, row in df.iterrows():
+        if str(row.get('course_id', '')) not in course_map:
+            continue
+        subjects_str = str(row.get('required_subjects', row.get('subjects', ''))).strip()
+        grades_str = str(row.get('required_grades', row.get('grades', ''))).strip()
+        if subjects_str:
+            grade_list = [g.strip() for g in grades_str.split(',') if g.strip()] if grades_str else []
+            requirements += len([s.strip() for s in subjects_str.split(',') if s.strip()])
+
+    exams = 0
+    for _, row in df.iterrows():
+        if str(row.get('course_id', '')) not in course_map:
+            continue
+        exams_str = str(row.get('required_exams', row.get('entrance_exams', ''))).strip()
+        if exams_str:
+            exams += len([e.strip() for e in exams_str.split(',') if e.strip()])
+
+    return courses, requirements, exams
+
+
+def columnar_courses(df: pd.DataFrame) -> Tuple[List[tuple], int, int]:
+    """prepare_courses, then the requirement and exam splitting done by the importers"""
+    columns = prepare_courses(df)
+    courses = _rows(columns, COURSE_FIELDS)
+    requirements = sum(len(_split_list(value)) for value in columns['required_subjects'])
+    exams = sum(len(_split_list(value)) for value in columns['required_exams'])
+    return courses, requirements, exams
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark preparing course rows from the import CSV files')
+    parser.add_argument('--sizes', default='10k,100k', help='Comma-separated course counts')
+    parser.add_argument('--iterrows-max', default='100k',
+                        help='Largest size the slow iterrows loop is timed at')
+    args = parser.parse_args()
+    iterrows_max = parse_size(args.iterrows_max)
+
+    print("=" * 60)
+    print("CSV IMPORT BENCHMARK")
+    print("=" * 60)
+    print(f"\n{'courses':>10} {'read s':>10} {'iterrows s':>12} {'columnar s':>12} {'speedup':>10} {'rows/s':>12}")
+
+    for size in [parse_size(value) for value in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            courses_file = Path(temp_dir) / 'courses.csv'
+            write_courses_csv(courses_file, size)
+            df, read_seconds = timed(pd.read_csv, courses_file, dtype=str)
+            # The iterrows loop read the file with inferred dtypes
+            legacy_df = pd.read_csv(courses_file) if size <= iterrows_max else None
+
+        columnar, columnar_seconds = timed(columnar_courses, df)
+        if legacy_df is not None:
+            legacy, iterrows_seconds = timed(iterrows_courses, legacy_df)
+            # Both paths must insert the same courses (the old loop also split
+            # blank cells into a 'nan' subject or exam, so those counts differ)
+            assert legacy[0] == columnar[0]
+            iterrows_text = f"{iterrows_seconds:>12.3f}"
+            speedup = f"{iterrows_seconds / columnar_seconds:>9.0f}x"
+        else:
+            iterrows_text, speedup = f"{'-':>12}", f"{'-':>10}"
+
+        print(f"{size:>10,} {read_seconds:>10.3f} {iterrows_text} {columnar_seconds:>12.3f} {speedup} "
+              f"{size / columnar_seconds:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
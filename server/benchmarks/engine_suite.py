@@ -0,0 +1,235 @@
+"""
+RecommendationEngine benchmark suite
+Runs single-request, batch and cache-warm scenarios on synthetic catalogues
+(1k, 40k and 400k courses by default) or on the CSV data files, reports
+p50/p95/p99 latency, throughput and peak memory, and compares the numbers
+with the stored baselines
+
+Usage: python -m benchmarks.engine_suite [--sizes 1k,40k,400k] [--csv [DATA_DIR]]
+                                         [--update-baselines] [--tolerance 0.25]
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Tuple
+
+import numpy as np
+
+try:
+    import resource  # Unix only; the process RSS line is skipped elsewhere
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from result_cache import ResultCache
+from benchmarks.synthetic import generate_courses, generate_students
+from benchmarks.csv_catalogue import DEFAULT_DATA_DIR, load_catalogue
+
+BASELINES_FILE = Path(__file__).resolve().parent / 'baselines.json'
+
+# Metrics checked against the baselines, and whether lower is better
+CHECKED_METRICS = {'p95_ms': True, 'peak_mb': True, 'throughput': False}
+
+# Differences this small are timer and allocator noise, whatever the ratio
+# (throughput is compared as milliseconds per request)
+NOISE_FLOOR = {'p95_ms': 0.5, 'peak_mb': 1.0, 'throughput': 0.5}
+
+
+def parse_size(value: str) -> int:
+    """'40k' -> 40000"""
+    value = value.strip().lower()
+    return int(float(value[:-1]) * 1000) if value.endswith('k') else int(value)
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3)}
+
+
+def peak_memory_mb(run_once: Callable[[], Any]) -> float:
+    """Peak Python/NumPy allocation (MB) of one run, measured separately from the timed runs"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def build_engine(courses: List[Dict[str, Any]], mode: str, cached: bool) -> Tuple[RecommendationEngine, float]:
+    """Engine over a static catalogue, and the seconds spent loading and compiling it"""
+    engine = RecommendationEngine(
+        scoring_mode=mode,
+        catalogue=CourseCatalogue(StaticCatalogueSource(courses)),
+        result_cache=ResultCache(max_entries=100000, ttl_seconds=3600, max_bytes=1024 * 1024 * 1024) if cached else None
+    )
+    started = time.perf_counter()
+    engine.catalogue.current()
+    return engine, time.perf_counter() - started
+
+
+def scenario_single(engine: RecommendationEngine, students, args) -> Dict[str, Any]:
+    """One request at a time, nothing cached"""
+    def request(student):
+        engine.get_recommendations(
+            student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {}
+        )
+
+    latencies = []
+    started = time.perf_counter()
+    for student in students:
+        request_started = time.perf_counter()
+        request(student)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    result = percentiles(latencies)
+    result['throughput'] = round(len(students) / elapsed, 1)
+    result['peak_mb'] = peak_memory_mb(lambda: [request(student) for student in students[:args.memory_sample]])
+    return result
+
+
+def scenario_batch(engine: RecommendationEngine, students, args) -> Dict[str, Any]:
+    """Whole cohorts per call; latency is per batch, throughput in students/sec"""
+    cohort = (students * (args.batch_size // len(students) + 1))[:args.batch_size]
+
+    latencies = []
+    for _ in range(args.batch_rounds):
+        started = time.perf_counter()
+        engine.get_batch_recommendations(cohort, {})
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    result = percentiles(latencies)
+    result['throughput'] = round(len(cohort) * len(latencies) / (sum(latencies) / 1000), 1)
+    result['peak_mb'] = peak_memory_mb(lambda: engine.get_batch_recommendations(cohort, {}))
+    return result
+
+
+def scenario_cache_warm(engine: RecommendationEngine, students, args) -> Dict[str, Any]:
+    """Repeat requests served from a primed result cache"""
+    for student in students:
+        engine.get_recommendations(student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {})
+    return scenario_single(engine, students, args)
+
+
+SCENARIOS = {
+    'single': (scenario_single, False),
+    'batch': (scenario_batch, False),
+    'cache_warm': (scenario_cache_warm, True)
+}
+
+
+def check_regressions(results: Dict[str, Dict[str, Dict[str, float]]],
+                      baselines: Dict[str, Dict[str, Dict[str, float]]],
+                      tolerance: float) -> List[str]:
+    """Descriptions of every metric worse than its baseline by more than `tolerance`"""
+    regressions = []
+    for catalogue, scenarios in results.items():
+        for scenario, metrics in scenarios.items():
+            baseline = baselines.get(catalogue, {}).get(scenario)
+            if not baseline:
+                continue
+            for metric, lower_is_better in CHECKED_METRICS.items():
+                if metric not in baseline or metric not in metrics:
+                    continue
+                current, expected = metrics[metric], baseline[metric]
+                # Convert to lower-is-better so one rule covers every metric
+                cost, expected_cost = (current, expected) if lower_is_better else (1000 / current, 1000 / expected)
+                if cost > expected_cost * (1 + tolerance) and cost - expected_cost > NOISE_FLOOR[metric]:
+                    regressions.append(f"{catalogue} {scenario} {metric}: {current} (baseline {expected})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the recommendation engine')
+    parser.add_argument('--sizes', default='1k,40k,400k',
+                        help='Comma-separated synthetic catalogue sizes (e.g. 1k,40k)')
+    parser.add_argument('--csv', nargs='?', const=str(DEFAULT_DATA_DIR), default=None,
+                        help='Benchmark the courses in a CSV data directory instead '
+                             '(default: the Discover Uni extract in data/)')
+    parser.add_argument('--mode', default='vectorized', choices=['scalar', 'vectorized'])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--batch-rounds', type=int, default=5)
+    parser.add_argument('--memory-sample', type=int, default=20,
+                        help='Requests traced for peak memory in the single-request scenarios')
+    parser.add_argument('--baselines', default=str(BASELINES_FILE))
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed regression before failing (0.25 = 25%%)')
+    parser.add_argument('--update-baselines', action='store_true',
+                        help='Store these results as the new baselines')
+    args = parser.parse_args()
+
+    if args.csv:
+        catalogues = [('csv', lambda: load_catalogue(Path(args.csv)))]
+    else:
+        catalogues = [
+            (f'synthetic-{size}', lambda size=size: generate_courses(size))
+            for size in (parse_size(value) for value in args.sizes.split(','))
+        ]
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    students = generate_students(args.students)
+
+    print("=" * 60)
+    print("RECOMMENDATION ENGINE BENCHMARK")
+    print("=" * 60)
+    print(f"Mode: {args.mode}  Students: {args.students}  Batch: {args.batch_size} x {args.batch_rounds}")
+
+    results = {}
+    for catalogue, load in catalogues:
+        courses = load()
+        # Baselines are per scoring mode
+        catalogue = f"{args.mode}:{catalogue}"
+        print(f"\n{catalogue}: {len(courses):,} courses")
+        print(f"{'scenario':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'per sec':>10} {'peak MB':>10}")
+
+        results[catalogue] = {}
+        for name in scenarios:
+            run, cached = SCENARIOS[name]
+            engine, load_seconds = build_engine(courses, args.mode, cached)
+            try:
+                metrics = run(engine, students, args)
+            finally:
+                engine.close()
+            metrics['load_seconds'] = round(load_seconds, 3)
+            results[catalogue][name] = metrics
+            print(f"{name:>12} {metrics['p50_ms']:>10.2f} {metrics['p95_ms']:>10.2f} {metrics['p99_ms']:>10.2f} "
+                  f"{metrics['throughput']:>10.1f} {metrics['peak_mb']:>10.1f}")
+
+    if resource is not None:
+        # ru_maxrss is in KB on Linux
+        print(f"\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    baselines_file = Path(args.baselines)
+    baselines = json.loads(baselines_file.read_text()) if baselines_file.exists() else {}
+
+    if args.update_baselines:
+        for catalogue, scenario_results in results.items():
+            baselines.setdefault(catalogue, {}).update(scenario_results)
+        baselines_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+        print(f"✓ Baselines written to {baselines_file}")
+        return
+
+    regressions = check_regressions(results, baselines, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  ✗ {regression}")
+        sys.exit(1)
+    print(f"\n✓ No regressions beyond {args.tolerance:.0%} of the baselines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Sharded scoring benchmark
+Measures single-request latency and batch throughput in-process and with
+1..N worker processes on a synthetic catalogue
+
+Usage: python -m benchmarks.sharded_scoring [--courses 200000] [--max-workers 8]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from benchmarks.synthetic import generate_courses, generate_students
+
+
+def run(engine: RecommendationEngine, students, batch_size: int):
+    """Median single-request latency (ms) and batch throughput (students/sec)"""
+    engine.get_recommendations([], {}, {}, {})  # Warm up (compile / start workers)
+
+    latencies = []
+    for student in students:
+        started = time.perf_counter()
+        engine.get_recommendations(
+            student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {}
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    cohort = (students * (batch_size // len(students) + 1))[:batch_size]
+    started = time.perf_counter()
+    engine.get_batch_recommendations(cohort, {})
+    throughput = batch_size / (time.perf_counter() - started)
+
+    return statistics.median(latencies), throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sharded scoring')
+    parser.add_argument('--courses', type=int, default=200000)
+    parser.add_argument('--students', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SHARDED SCORING BENCHMARK")
+    print("=" * 60)
+    print(f"Courses: {args.courses:,}  Students: {args.students}  Batch: {args.batch_size}  CPUs: {os.cpu_count()}")
+
+    courses = generate_courses(args.courses)
+    students = generate_students(args.students)
+
+    print(f"\n{'workers':>8} {'p50 ms':>10} {'batch/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in [0] + list(range(1, args.max_workers + 1)):
+        engine = RecommendationEngine(
+            scoring_mode='vectorized',
+            catalogue=CourseCatalogue(StaticCatalogueSource(courses)),
+            workers=workers
+        )
+        try:
+            latency, throughput = run(engine, students, args.batch_size)
+        finally:
+            engine.close()
+
+        baseline = baseline or throughput
+        label = 'in-proc' if workers == 0 else str(workers)
+        print(f"{label:>8} {latency:>10.2f} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
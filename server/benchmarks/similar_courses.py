@@ -0,0 +1,64 @@
+"""
+Similar courses benchmark
+Measures similarity index build time, memory and top-N query latency across
+synthetic catalogue sizes
+
+Usage: python -m benchmarks.similar_courses [--sizes 1000,40000,400000] [--queries 200]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import SimilarityIndex
+from benchmarks.synthetic import generate_courses
+
+
+def run(courses, queries: int, limit: int):
+    """Build seconds, index MB and p50/p99 query latency (ms)"""
+    started = time.perf_counter()
+    index = SimilarityIndex(courses)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(3)
+    course_ids = [rng.choice(courses)['id'] for _ in range(queries)]
+    index.neighbours(course_ids[0], limit)  # Warm up
+
+    latencies = []
+    for course_id in course_ids:
+        started = time.perf_counter()
+        index.neighbours(course_id, limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return build_seconds, index.nbytes / (1024 * 1024), statistics.median(latencies), p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the similar courses index')
+    parser.add_argument('--sizes', default='1000,40000,400000',
+                        help='Comma-separated catalogue sizes')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SIMILAR COURSES BENCHMARK")
+    print("=" * 60)
+    print(f"Queries per size: {args.queries}  Neighbours: {args.limit}")
+
+    print(f"\n{'courses':>10} {'build s':>10} {'index MB':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in [int(value) for value in args.sizes.split(',')]:
+        courses = generate_courses(size)
+        build_seconds, megabytes, p50, p99 = run(courses, args.queries, args.limit)
+        print(f"{size:>10,} {build_seconds:>10.2f} {megabytes:>10.1f} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
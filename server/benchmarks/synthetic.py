@@ -0,0 +1,117 @@
+"""
+Synthetic course catalogues and student profiles for benchmarks
+Deterministic for a given seed, shaped like the catalogue view the engine serves
+"""
+
+import random
+from typing import List, Dict, Any
+from tariff import TARIFF_BUCKETS
+
+SUBJECTS = [
+    'Mathematics', 'Further Mathematics', 'Physics', 'Chemistry', 'Biology',
+    'Computer Science', 'Economics', 'History', 'Geography', 'English Literature',
+    'Psychology', 'French', 'Spanish', 'Art', 'Music', 'Politics'
+]
+
+GRADES = ['A*', 'A', 'B', 'C', 'D', 'E']
+
+UNIVERSITIES = [
+    'University of Cambridge', 'University of Oxford', 'Imperial College London',
+    'University College London', 'University of Bristol', 'University of Bath',
+    'University of Exeter', 'University of Birmingham', 'University of Nottingham',
+    'University of Manchester', 'University of Liverpool', 'Durham University',
+    'University of York', 'Newcastle University', 'University of Edinburgh',
+    'University of Glasgow', 'University of St Andrews', 'Cardiff University',
+    'Swansea University', 'University of Reading'
+]
+
+# KIS aim codes and CAH codes drawn for the Discover Uni fields
+KIS_AIMS = ['000', '001', '021', '083', '100']
+CAH_CODES = [
+    f'CAH{area:02d}-{subject:02d}-{detail:02d}'
+    for area in range(1, 27) for subject in range(1, 4) for detail in range(1, 3)
+]
+
+REGIONS = ['London', 'South East', 'South West', 'Midlands', 'North West', 'North East', 'Scotland', 'Wales']
+
+
+def generate_courses(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Generate `count` course dictionaries"""
+    rng = random.Random(seed)
+    # Discover Uni fields use their own stream so the other fields stay the
+    # same for a given seed
+    extras = random.Random(seed + 1000003)
+    courses = []
+
+    for i in range(count):
+        university = rng.choice(UNIVERSITIES)
+        required = rng.sample(SUBJECTS, rng.choice([0, 1, 2, 2, 3]))
+
+        course = {
+            'id': f'SYN{i:07d}',
+            'name': f'{rng.choice(SUBJECTS)} {rng.choice(["BSc", "BA", "MEng", "MSci"])}',
+            'university': {
+                'name': university,
+                'ranking': {'overall': rng.randint(1, 130)} if rng.random() < 0.8 else {},
+                'size': rng.choice(['small', 'medium', 'large'])
+            },
+            'entryRequirements': {
+                'subjects': required,
+                'grades': {subject: rng.choice(GRADES[:4]) for subject in required}
+            },
+            'fees': {'uk': rng.choice([9250, 9250, 9250, 6000, 11000])},
+            'duration': rng.choice(['3', '3', '4'])
+        }
+        if rng.random() < 0.7:
+            course['employability'] = {
+                'employmentRate': rng.randint(55, 99),
+                'averageSalary': rng.randint(18000, 55000)
+            }
+        _add_discover_uni_fields(course, extras)
+        courses.append(course)
+
+    return courses
+
+
+def _add_discover_uni_fields(course: Dict[str, Any], rng: random.Random):
+    """Add CAH codes, KIS aim, tariff distribution, outcomes and NSS themes to a course"""
+    course['cahCodes'] = sorted(rng.sample(CAH_CODES, rng.choice([1, 1, 1, 2])))
+    course['kisAimCode'] = rng.choice(KIS_AIMS)
+    if rng.random() < 0.6:
+        peak = rng.randint(2, len(TARIFF_BUCKETS) - 3)
+        course['tariffDistribution'] = [
+            float(max(0, 30 - 8 * abs(bucket - peak) + rng.randint(0, 5))) for bucket in range(len(TARIFF_BUCKETS))
+        ]
+    if rng.random() < 0.7:
+        median = rng.randint(20000, 45000)
+        course['outcomes'] = {
+            'salaryLowerQuartile': median - rng.randint(2000, 6000),
+            'salaryUpperQuartile': median + rng.randint(3000, 12000),
+            'continuationRate': rng.randint(75, 99)
+        }
+    if rng.random() < 0.6:
+        course['nssThemes'] = [rng.randint(55, 95) for _ in range(7)]
+
+
+def generate_students(count: int, seed: int = 2) -> List[Dict[str, Any]]:
+    """Generate `count` student profiles (aLevelSubjects, predictedGrades, preferences)"""
+    rng = random.Random(seed)
+    students = []
+
+    for _ in range(count):
+        subjects = rng.sample(SUBJECTS, rng.choice([3, 3, 4]))
+        preferences = {}
+        if rng.random() < 0.6:
+            preferences['preferredRegion'] = rng.choice(REGIONS)
+        if rng.random() < 0.4:
+            preferences['maxBudget'] = rng.choice([9250, 12000])
+        if rng.random() < 0.3:
+            preferences['preferredUniSize'] = rng.choice(['small', 'medium', 'large'])
+
+        students.append({
+            'aLevelSubjects': subjects,
+            'predictedGrades': {subject: rng.choice(GRADES) for subject in subjects},
+            'preferences': preferences
+        })
+
+    return students
@@ -0,0 +1,388 @@
+"""
+Versioned in-memory course catalogue
+Builds the recommendation engine's course view from PostgreSQL with a few bulk
+queries, keeps it in memory under a data version and hot-reloads it in the
+background when the version changes
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from collections import defaultdict
+from typing import List, Dict, Any, Callable, Optional, Sequence
+from tariff import TARIFF_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Database configuration
+DB_NAME = os.getenv('POSTGRES_DB', 'university_recommender')
+DB_USER = os.getenv('POSTGRES_USER', 'postgres')
+DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'postgres')
+DB_HOST = os.getenv('POSTGRES_HOST', 'localhost')
+DB_PORT = os.getenv('POSTGRES_PORT', '5432')
+
+
+def get_db_connection():
+    """Create database connection"""
+    import psycopg2
+
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+
+
+@dataclass
+class CatalogueSnapshot:
+    """
+    Immutable course list published under a single data version.
+
+    `derived` lets consumers memoize structures built from this exact course
+    list (compiled matrices, indexes) so they are dropped with the snapshot.
+    """
+    version: int
+    courses: Sequence[Dict[str, Any]]
+    loaded_at: datetime = field(default_factory=datetime.now)
+    load_seconds: float = 0.0
+    prepare_seconds: Dict[str, float] = field(default_factory=dict)
+    derived: Dict[Any, Any] = field(default_factory=dict)
+
+
+class StaticCatalogueSource:
+    """Catalogue source serving a fixed course list (sample data, benchmarks)"""
+
+    def __init__(self, courses: List[Dict[str, Any]], version: int = 1):
+        self.courses = courses
+        self.version = version
+
+    def current_version(self) -> int:
+        return self.version
+
+    def load(self):
+        return self.version, self.courses
+
+
+# Bulk queries; every query reads the whole table once, ordered so course
+# positions (and therefore tie-breaking between equal scores) are stable
+VERSION_QUERY = "SELECT version FROM catalogue_version"
+
+COURSE_QUERY = """
+    SELECT c.course_id, c.name, c.ucas_code, c.annual_fee, c.subject_rank,
+           c.employability_score, c.course_url, c.typical_offer_text, c.typical_offer_tariff,
+           u.university_id, u.name, u.region, u.rank_overall, u.employability_score, u.website_url
+    FROM course c
+    JOIN university u ON u.university_id = c.university_id
+    ORDER BY c.course_id
+"""
+
+REQUIREMENT_QUERY = """
+    SELECT r.course_id, s.subject_name, r.grade_req
+    FROM course_requirement r
+    JOIN subject s ON s.subject_id = r.subject_id
+    ORDER BY r.course_id, r.req_id
+"""
+
+KISCOURSE_QUERY = """
+    SELECT k.pubukprn, k.kiscourseid, k.kismode, k.title, k.crseurl, k.kisaimcode,
+           COALESCE(i.first_trading_name, i.legal_name), i.provurl,
+           e.workstudy, g.goinstmed, g.goinstlq, g.goinstuq, ct.ucont,
+           n.t1, n.t2, n.t3, n.t4, n.t5, n.t6, n.t7
+    FROM kiscourse k
+    JOIN institution i ON i.pubukprn = k.pubukprn
+    LEFT JOIN employment e
+        ON e.pubukprn = k.pubukprn AND e.kiscourseid = k.kiscourseid AND e.kismode = k.kismode
+    LEFT JOIN gosalary g
+        ON g.pubukprn = k.pubukprn AND g.kiscourseid = k.kiscourseid AND g.kismode = k.kismode
+    LEFT JOIN continuation ct
+        ON ct.pubukprn = k.pubukprn AND ct.kiscourseid = k.kiscourseid AND ct.kismode = k.kismode
+    LEFT JOIN nss n
+        ON n.pubukprn = k.pubukprn AND n.kiscourseid = k.kiscourseid AND n.kismode = k.kismode
+    ORDER BY k.pubukprn, k.kiscourseid, k.kismode
+"""
+
+SBJ_QUERY = """
+    SELECT pubukprn, kiscourseid, kismode, sbj
+    FROM sbj
+    ORDER BY pubukprn, kiscourseid, kismode, sbj
+"""
+
+TARIFF_QUERY = f"""
+    SELECT pubukprn, kiscourseid, kismode, {', '.join(TARIFF_COLUMNS)}
+    FROM tariff
+"""
+
+LOCATION_QUERY = """
+    SELECT cl.pubukprn, cl.kiscourseid, cl.kismode, l.locid, l.locname, l.latitude, l.longitude
+    FROM courselocation cl
+    JOIN location l ON l.ukprn = cl.ukprn AND l.locid = cl.locid
+    WHERE l.latitude IS NOT NULL AND l.longitude IS NOT NULL
+    ORDER BY cl.pubukprn, cl.kiscourseid, cl.kismode, l.locid
+"""
+
+
+def kis_course_id(pubukprn: str, kiscourseid: str, kismode: str) -> str:
+    """Catalogue ID for a Discover Uni course"""
+    return f"{pubukprn}:{kiscourseid}:{kismode}"
+
+
+class PostgresCatalogueSource:
+    """
+    Catalogue source reading the `course`/`university`/`course_requirement`
+    tables and the Discover Uni `kiscourse` tables.
+    """
+
+    def __init__(self, connect: Callable = get_db_connection):
+        self.connect = connect
+
+    def current_version(self) -> int:
+        """Read the data version row (cheap; used for polling)"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(VERSION_QUERY)
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def load(self):
+        """Load every course in one consistent read, returning (version, courses)"""
+        conn = self.connect()
+        try:
+            # One repeatable-read transaction: the version and all bulk queries
+            # see the same committed data
+            conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            cursor = conn.cursor()
+
+            cursor.execute(VERSION_QUERY)
+            row = cursor.fetchone()
+            version = row[0] if row else 0
+
+            courses = self._load_courses(cursor)
+            courses.extend(self._load_kis_courses(cursor))
+
+            conn.rollback()
+            return version, courses
+        finally:
+            conn.close()
+
+    def _load_courses(self, cursor) -> List[Dict[str, Any]]:
+        """Build course views from the core course tables"""
+        cursor.execute(REQUIREMENT_QUERY)
+        requirements = defaultdict(lambda: {'subjects': [], 'grades': {}})
+        for course_id, subject_name, grade_req in cursor.fetchall():
+            requirements[course_id]['subjects'].append(subject_name)
+            requirements[course_id]['grades'][subject_name] = grade_req
+
+        cursor.execute(COURSE_QUERY)
+        courses = []
+        for (course_id, name, ucas_code, annual_fee, subject_rank, course_employability,
+             course_url, offer_text, offer_tariff, university_id, university_name, region,
+             rank_overall, university_employability, website_url) in cursor.fetchall():
+
+            ranking = {}
+            if rank_overall is not None:
+                ranking['overall'] = rank_overall
+            if subject_rank is not None:
+                ranking['subject'] = subject_rank
+
+            employability = {}
+            employment_rate = course_employability if course_employability is not None else university_employability
+            if employment_rate is not None:
+                employability['employmentRate'] = employment_rate
+
+            course = {
+                'id': course_id,
+                'name': name,
+                'ucasCode': ucas_code,
+                'university': {
+                    'id': university_id,
+                    'name': university_name,
+                    'region': region,
+                    'ranking': ranking,
+                    'website': website_url
+                },
+                'entryRequirements': requirements.get(course_id, {'subjects': [], 'grades': {}}),
+                'fees': {'uk': annual_fee} if annual_fee is not None else {},
+                'employability': employability,
+                'typicalOffer': {'text': offer_text, 'tariff': offer_tariff},
+                'url': course_url,
+                'source': 'course'
+            }
+            courses.append(course)
+
+        return courses
+
+    def _load_kis_courses(self, cursor) -> List[Dict[str, Any]]:
+        """Build course views from the Discover Uni tables"""
+        cursor.execute(SBJ_QUERY)
+        cah_codes = defaultdict(list)
+        for pubukprn, kiscourseid, kismode, sbj in cursor.fetchall():
+            cah_codes[(pubukprn, kiscourseid, kismode)].append(sbj)
+
+        cursor.execute(TARIFF_QUERY)
+        tariffs = {}
+        for pubukprn, kiscourseid, kismode, *buckets in cursor.fetchall():
+            distribution = [float(count or 0) for count in buckets]
+            if sum(distribution) > 0:
+                tariffs[(pubukprn, kiscourseid, kismode)] = distribution
+
+        cursor.execute(LOCATION_QUERY)
+        locations = defaultdict(list)
+        for pubukprn, kiscourseid, kismode, locid, locname, latitude, longitude in cursor.fetchall():
+            locations[(pubukprn, kiscourseid, kismode)].append({
+                'id': locid,
+                'name': locname,
+                'latitude': float(latitude),
+                'longitude': float(longitude)
+            })
+
+        cursor.execute(KISCOURSE_QUERY)
+        courses = []
+        for (pubukprn, kiscourseid, kismode, title, course_url, aim_code, provider_name, provider_url,
+             work_or_study, median_salary, lower_quartile_salary, upper_quartile_salary,
+             continuation_rate, *nss_themes) in cursor.fetchall():
+
+            employability = {}
+            if work_or_study is not None:
+                employability['employmentRate'] = work_or_study
+            if median_salary is not None:
+                employability['averageSalary'] = median_salary
+
+            outcomes = {}
+            if lower_quartile_salary is not None:
+                outcomes['salaryLowerQuartile'] = lower_quartile_salary
+            if upper_quartile_salary is not None:
+                outcomes['salaryUpperQuartile'] = upper_quartile_salary
+            if continuation_rate is not None:
+                outcomes['continuationRate'] = continuation_rate
+
+            courses.append({
+                'id': kis_course_id(pubukprn, kiscourseid, kismode),
+                'kisCourseId': kiscourseid,
+                'kisMode': kismode,
+                'kisAimCode': aim_code,
+                'name': title,
+                'university': {
+                    'id': pubukprn,
+                    'name': provider_name,
+                    'ranking': {},
+                    'website': provider_url
+                },
+                'entryRequirements': {'subjects': [], 'grades': {}},
+                'cahCodes': cah_codes.get((pubukprn, kiscourseid, kismode), []),
+                'locations': locations.get((pubukprn, kiscourseid, kismode), []),
+                'fees': {},
+                'employability': employability,
+                'outcomes': outcomes,
+                'tariffDistribution': tariffs.get((pubukprn, kiscourseid, kismode)),
+                # NSS theme scores t1-t7 (0-100, None where not published)
+                'nssThemes': nss_themes if any(theme is not None for theme in nss_themes) else None,
+                'url': course_url,
+                'source': 'discover_uni'
+            })
+
+        return courses
+
+
+class CourseCatalogue:
+    """
+    In-memory course catalogue with atomic hot reload.
+
+    Requests read `current()`, a lock-free attribute read returning the
+    published snapshot. Reloads build a complete new snapshot off to the side,
+    run the registered preparation hooks on it, then publish it with a single
+    reference swap, so in-flight requests keep the snapshot they started with.
+    """
+
+    def __init__(self, source, poll_interval: float = 60.0):
+        self.source = source
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._prepare_hooks: List[Callable[[CatalogueSnapshot], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_prepare_hook(self, hook: Callable[[CatalogueSnapshot], None]):
+        """Register a callable run on each new snapshot before it is published"""
+        self._prepare_hooks.append(hook)
+
+    def current(self) -> CatalogueSnapshot:
+        """The published snapshot, loading it on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                # Concurrent first requests queue on the lock; only the first loads
+                snapshot = self._snapshot or self._load()
+        return snapshot
+
+    @property
+    def version(self) -> Optional[int]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else None
+
+    def reload(self, force: bool = True) -> CatalogueSnapshot:
+        """
+        Load a new snapshot and publish it.
+
+        With force=False the load is skipped when the source version matches
+        the published one.
+        """
+        with self._reload_lock:
+            if not force and self._snapshot is not None:
+                if self.source.current_version() == self._snapshot.version:
+                    return self._snapshot
+            return self._load()
+
+    def _load(self) -> CatalogueSnapshot:
+        """Load, prepare and publish a snapshot; the caller holds the reload lock"""
+        started = time.perf_counter()
+        version, courses = self.source.load()
+        snapshot = CatalogueSnapshot(version=version, courses=courses)
+        for hook in self._prepare_hooks:
+            hook_started = time.perf_counter()
+            hook(snapshot)
+            snapshot.prepare_seconds[getattr(hook, '__name__', repr(hook))] = time.perf_counter() - hook_started
+        snapshot.load_seconds = time.perf_counter() - started
+
+        self._snapshot = snapshot
+        logger.info("Catalogue version %s loaded: %d courses in %.2fs (prepare: %s)",
+                    version, len(courses), snapshot.load_seconds,
+                    ', '.join(f"{name} {seconds:.2f}s" for name, seconds in snapshot.prepare_seconds.items()))
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the source reports a new data version; returns True if reloaded"""
+        previous = self._snapshot
+        snapshot = self.reload(force=False)
+        return snapshot is not previous
+
+    def start(self):
+        """Start polling the data version in a background daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name='catalogue-reload', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background polling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception:
+                # Keep serving the published snapshot; try again next poll
+                logger.exception("Catalogue reload failed")
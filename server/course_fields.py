@@ -0,0 +1,77 @@
+"""
+Per-field reads over a course list
+Matrices and indexes are compiled one field at a time for the whole catalogue.
+Plain lists of course dictionaries are walked; course lists that keep their
+fields as columns (memory-mapped snapshots) answer from the columns without
+building any course dictionaries
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+
+def _lookup(course: Dict[str, Any], path: Tuple[str, ...], default: Any) -> Any:
+    value = course
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+def field_values(courses: Sequence, path: Tuple[str, ...], default: Any = None) -> List[Any]:
+    """
+    The value at `path` for every course, as chained ``.get(key, {})`` calls
+    ending in ``.get(last, default)`` read it: `default` where a key is
+    missing, while a stored None stays None.
+    """
+    if hasattr(courses, 'field_values'):
+        return courses.field_values(path, default)
+    return [_lookup(course, path, default) for course in courses]
+
+
+def field_array(courses: Sequence, path: Tuple[str, ...], default: float) -> np.ndarray:
+    """A numeric field for every course as float64 (`default` where missing, NaN for None)"""
+    if hasattr(courses, 'field_array'):
+        return courses.field_array(path, default)
+    return np.array(
+        [np.nan if value is None else value for value in field_values(courses, path, default)],
+        dtype=np.float64
+    )
+
+
+def has_fields(courses: Sequence, path: Tuple[str, ...]) -> np.ndarray:
+    """Whether each course has a non-empty dictionary at `path`"""
+    if hasattr(courses, 'has_fields'):
+        return courses.has_fields(path)
+    return np.array([bool(_lookup(course, path, None)) for course in courses], dtype=bool)
+
+
+def field_matrix(courses: Sequence, path: Tuple[str, ...], width: int) -> np.ndarray:
+    """
+    A fixed-length numeric list field as a courses x `width` float64 matrix,
+    with NaN rows where the list is missing or empty and NaN for None items.
+    """
+    if hasattr(courses, 'field_matrix'):
+        return courses.field_matrix(path, width)
+    matrix = np.full((len(courses), width), np.nan)
+    for i, values in enumerate(field_values(courses, path)):
+        if values:
+            matrix[i] = [np.nan if value is None else value for value in values]
+    return matrix
+
+
+def location_points(courses: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every teaching location that has coordinates: the owning course
+    positions and an (n, 2) array of latitude, longitude pairs.
+    """
+    if hasattr(courses, 'location_points'):
+        return courses.location_points()
+    owners, coordinates = [], []
+    for i, locations in enumerate(field_values(courses, ('locations',), [])):
+        for location in locations:
+            if location.get('latitude') is not None and location.get('longitude') is not None:
+                owners.append(i)
+                coordinates.append((location['latitude'], location['longitude']))
+    return np.array(owners, dtype=np.int64), np.array(coordinates, dtype=np.float64).reshape(-1, 2)
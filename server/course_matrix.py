@@ -0,0 +1,434 @@
+"""
+Columnar course catalogue for vectorized recommendation scoring
+Compiles the course catalogue once into NumPy arrays so every criterion can be
+scored for the whole catalogue in a handful of array operations
+"""
+
+import time
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+import numpy as np
+from subject_index import SubjectIndex
+from geo_index import GeoIndex
+from tariff import TARIFF_BUCKETS, tariff_bucket, ucas_points
+from course_fields import field_values, field_array, field_matrix, has_fields
+
+# Number of set bits for every possible byte value, used to popcount packed subject masks
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _vocabulary_codes(values: List[str]) -> Tuple[Dict[str, int], np.ndarray]:
+    """Map a list of strings to integer codes, returning the vocabulary and code array"""
+    vocabulary = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        codes[i] = vocabulary.setdefault(value, len(vocabulary))
+    return vocabulary, codes
+
+
+def top_k_indices(scores: np.ndarray, k: int,
+                  positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the k highest positive scores, highest first.
+
+    Uses a partial partition so cost grows with k rather than N log N. Ties are
+    broken by catalogue position (the array index, or `positions` when scores
+    only cover a subset of the catalogue), matching a stable descending sort.
+    """
+    candidates = np.flatnonzero(scores > 0)
+    if k <= 0:
+        return candidates[:0]
+    order_key = candidates if positions is None else positions[candidates]
+
+    if len(candidates) > k:
+        candidate_scores = scores[candidates]
+        kth_score = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+        above = np.flatnonzero(candidate_scores > kth_score)
+        tied = np.flatnonzero(candidate_scores == kth_score)
+        tied = tied[np.argsort(order_key[tied], kind='stable')][:k - len(above)]
+        keep = np.concatenate([above, tied])
+        candidates, order_key = candidates[keep], order_key[keep]
+
+    return candidates[np.lexsort((order_key, -scores[candidates]))]
+
+
+def kth_highest_score(scores: np.ndarray, k: int) -> float:
+    """The k-th highest positive score, or 0.0 when fewer than k scores are positive"""
+    positive = scores[scores > 0]
+    if k <= 0 or len(positive) < k:
+        return 0.0
+    return float(np.partition(positive, len(positive) - k)[len(positive) - k])
+
+
+class CourseMatrix:
+    """
+    Read-only columnar view of a course catalogue.
+
+    Every method mirrors one of the per-course ``_calculate_*`` criteria in
+    RecommendationEngine and returns a float64 array with one score per course,
+    in catalogue order.
+    """
+
+    def __init__(self, courses: Sequence[Dict[str, Any]],
+                 grade_values: Dict[str, int],
+                 region_of: Callable[[str], str],
+                 version: Any = None):
+        self.courses = courses
+        self.size = len(courses)
+        self.grade_values = grade_values
+        self.version = version  # catalogue version the courses were loaded under
+
+        # Seconds spent on each compilation step, reported on catalogue reload
+        self.compile_seconds: Dict[str, float] = {}
+
+        self._timed('subjects', self._compile_subjects)
+        self._timed('grades', self._compile_grades)
+        self._timed('preferences', self._compile_preferences, region_of)
+        self._timed('ranking', self._compile_ranking)
+        self._timed('employability', self._compile_employability)
+        self._timed('tariff', self._compile_tariff)
+        self._timed('static_scores', self._compile_static_scores)
+
+        # Inverted subject -> course index, used to prune candidates per request
+        self.subject_index = self._timed('subject_index', SubjectIndex, courses)
+
+        # Grid over teaching location coordinates for distance preferences
+        self.geo_index = self._timed('geo_index', GeoIndex, courses)
+
+    def _timed(self, step: str, build: Callable, *args):
+        """Run one compilation step, recording how long it took"""
+        started = time.perf_counter()
+        result = build(*args)
+        self.compile_seconds[step] = time.perf_counter() - started
+        return result
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    def _compile_subjects(self):
+        """Pack each course's required subjects into a bitmask row"""
+        required_lists = field_values(self.courses, ('entryRequirements', 'subjects'), [])
+
+        self.subject_vocab = {}
+        for required in required_lists:
+            for subject in required:
+                self.subject_vocab.setdefault(subject, len(self.subject_vocab))
+
+        dense = np.zeros((self.size, max(len(self.subject_vocab), 1)), dtype=bool)
+        self.required_count = np.zeros(self.size, dtype=np.float64)
+        for i, required in enumerate(required_lists):
+            # The scalar criterion divides by the list length, duplicates included
+            self.required_count[i] = len(required)
+            for subject in required:
+                dense[i, self.subject_vocab[subject]] = True
+
+        self.subject_bits = np.packbits(dense, axis=1)
+        # Dense 0/1 copy for students x courses matrix products; float32 sums
+        # of at most a few dozen ones are exact
+        self.subject_dense = dense[:, :len(self.subject_vocab)].astype(np.float32)
+
+    def _compile_grades(self):
+        """
+        Pack each course's grade requirements into slot columns, in requirement order.
+
+        grade_slots holds subject codes (-1 = empty slot) and grade_slot_values
+        the required grade values. Keeping each course's own order lets the
+        vectorized criterion add subject scores in the same order as the scalar
+        loop, so the floating-point totals are identical.
+        """
+        required_dicts = field_values(self.courses, ('entryRequirements', 'grades'), {})
+
+        self.grade_vocab = {}
+        for required in required_dicts:
+            for subject in required:
+                self.grade_vocab.setdefault(subject, len(self.grade_vocab))
+
+        slots = max((len(required) for required in required_dicts), default=0)
+        self.grade_slots = np.full((self.size, slots), -1, dtype=np.int32)
+        self.grade_slot_values = np.full((self.size, slots), np.nan)
+        for i, required in enumerate(required_dicts):
+            for j, (subject, grade) in enumerate(required.items()):
+                self.grade_slots[i, j] = self.grade_vocab[subject]
+                self.grade_slot_values[i, j] = self.grade_values.get(grade, 0)
+        self.has_grade_requirements = (self.grade_slots >= 0).any(axis=1)
+
+        # Courses with a grade requirement in each subject
+        rows, columns = np.nonzero(self.grade_slots >= 0)
+        codes = self.grade_slots[rows, columns]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(self.grade_vocab) + 1))
+        self.grade_rows = [
+            np.unique(rows[order[start:stop]]) for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def _predicted_by_code(self, grade_dicts: List[Dict[str, str]]) -> np.ndarray:
+        """
+        Students x (subjects + 1) predicted grade values, NaN = not predicted.
+
+        The extra last column stays NaN, so empty slots (-1) index a missing grade.
+        """
+        predicted = np.full((len(grade_dicts), len(self.grade_vocab) + 1), np.nan)
+        for s, grades in enumerate(grade_dicts):
+            for subject, grade in grades.items():
+                code = self.grade_vocab.get(subject)
+                if code is not None:
+                    predicted[s, code] = self.grade_values.get(grade, 0)
+        return predicted
+
+    def _compile_preferences(self, region_of: Callable[[str], str]):
+        """Encode region, fee, university size and duration columns"""
+        # Regions depend only on the university name, so match each name once
+        names = field_values(self.courses, ('university', 'name'), '')
+        regions = {}
+        for name in names:
+            if name not in regions:
+                regions[name] = region_of(name)
+        self.region_vocab, self.region_codes = _vocabulary_codes([regions[name] for name in names])
+        self.size_vocab, self.size_codes = _vocabulary_codes(
+            field_values(self.courses, ('university', 'size'), 'medium')
+        )
+        self.duration_vocab, self.duration_codes = _vocabulary_codes(
+            [str(duration) for duration in field_values(self.courses, ('duration',), '3')]
+        )
+        self.fees = field_array(self.courses, ('fees', 'uk'), 0)
+
+    def _compile_ranking(self):
+        """Extract overall and subject ranks (0 = unknown)"""
+        self.has_ranking = has_fields(self.courses, ('university', 'ranking'))
+        # A stored None rank is unknown too
+        self.rank_overall = np.nan_to_num(field_array(self.courses, ('university', 'ranking', 'overall'), 0))
+        self.rank_subject = np.nan_to_num(field_array(self.courses, ('university', 'ranking', 'subject'), 0))
+
+    def _compile_employability(self):
+        """Extract employment rate and average salary columns"""
+        self.has_employability = has_fields(self.courses, ('employability',))
+        self.employment_rate = field_array(self.courses, ('employability', 'employmentRate'), 50)
+        self.average_salary = field_array(self.courses, ('employability', 'averageSalary'), 30000)
+
+    def _compile_tariff(self):
+        """
+        Build a buckets x courses matrix of cumulative entrant tariff shares.
+
+        tariff_cumulative[b, i] is the fraction of course i's entrants in
+        tariff bucket b or below, so scoring a student is one row read.
+        """
+        distributions = field_matrix(self.courses, ('tariffDistribution',), len(TARIFF_BUCKETS))
+        distributions[np.isnan(distributions).all(axis=1)] = 0.0
+
+        cumulative = np.cumsum(distributions, axis=1)
+        total = cumulative[:, -1:]
+        self.has_tariff = total[:, 0] > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tariff_cumulative = np.ascontiguousarray(np.where(total > 0, cumulative / total, 0.5).T)
+
+    def _compile_static_scores(self):
+        """
+        Materialize the student-independent criteria once per catalogue version.
+
+        Ranking and employability depend only on the course, so requests read
+        these arrays instead of re-deriving them.
+        """
+        rank = np.where(self.rank_subject > 0, self.rank_subject, self.rank_overall)
+        ranking = np.select(
+            [~self.has_ranking | (rank == 0), rank <= 10, rank <= 50],
+            [0.5, 1.0 - (rank - 1) * 0.01, 0.9 - (rank - 10) * 0.01],
+            np.maximum(0.1, 0.5 - (rank - 50) * 0.008)
+        )
+
+        salary_score = np.minimum(1.0, (self.average_salary - 20000) / 40000)
+        combined = (self.employment_rate / 100) * 0.7 + salary_score * 0.3
+        employability = np.where(self.has_employability, combined, 0.5)
+
+        self.static_scores = {
+            'university_ranking': ranking,
+            'employability': employability
+        }
+
+    # ------------------------------------------------------------------
+    # Vectorized criteria
+    #
+    # Each criterion scores the whole catalogue, or only the course positions
+    # in `rows` when a caller has already pruned the candidate set.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _take(column: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Select the requested rows of a column (all rows when rows is None)"""
+        return column if rows is None else column[rows]
+
+    def subject_match(self, a_level_subjects: List[str],
+                      rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_subject_match"""
+        student = np.zeros(self.subject_bits.shape[1] * 8, dtype=bool)
+        for subject in a_level_subjects:
+            code = self.subject_vocab.get(subject)
+            if code is not None:
+                student[code] = True
+        student_bits = np.packbits(student)
+
+        subject_bits = self._take(self.subject_bits, rows)
+        required_count = self._take(self.required_count, rows)
+        matches = _POPCOUNT_TABLE[subject_bits & student_bits].sum(axis=1, dtype=np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = matches / required_count
+        ratio = np.where(matches == required_count, np.minimum(ratio + 0.2, 1.0), ratio)
+        return np.where(required_count > 0, ratio, 0.5)
+
+    def grade_match(self, predicted_grades: Dict[str, str],
+                    rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_grade_match"""
+        predicted = self._predicted_by_code([predicted_grades])[0]
+        if np.isnan(predicted).all():
+            return np.full(self.size if rows is None else len(rows), 0.5)
+
+        slots = self._take(self.grade_slots, rows)
+        required = self._take(self.grade_slot_values, rows)
+        total_score = np.zeros(len(slots))
+        total_weight = np.zeros(len(slots))
+
+        # One requirement slot at a time, so each course adds its subject
+        # scores in requirement order like the scalar loop
+        for j in range(slots.shape[1]):
+            value = predicted[slots[:, j]]
+            present = ~np.isnan(value)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                partial = np.maximum(0, value / required[:, j])
+            total_score += np.where(present, np.where(value >= required[:, j], 1.0, partial), 0.0)
+            total_weight += present
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total_weight > 0, total_score / total_weight, 0.5)
+
+    def preference_match(self, preferences: Dict[str, Any],
+                         rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_preference_match"""
+        score = np.full(self.size if rows is None else len(rows), 0.5)
+        factors = 0
+
+        if 'preferredRegion' in preferences:
+            code = self.region_vocab.get(preferences['preferredRegion'], -1)
+            score += np.where(self._take(self.region_codes, rows) == code, 0.3, 0.0)
+            factors += 1
+
+        if 'maxBudget' in preferences:
+            max_budget = preferences['maxBudget']
+            fees = self._take(self.fees, rows)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                budget_ratio = fees / max_budget
+            score += np.where(fees <= max_budget, 0.2 * (1 - budget_ratio), -0.3)
+            factors += 1
+
+        if 'preferredUniSize' in preferences:
+            code = self.size_vocab.get(preferences['preferredUniSize'], -1)
+            score += np.where(self._take(self.size_codes, rows) == code, 0.2, 0.0)
+            factors += 1
+
+        if 'preferredCourseLength' in preferences:
+            code = self.duration_vocab.get(str(preferences['preferredCourseLength']), -1)
+            score += np.where(self._take(self.duration_codes, rows) == code, 0.1, 0.0)
+            factors += 1
+
+        if 'nearLocation' in preferences:
+            near = preferences['nearLocation']
+            radius = near.get('radiusKm', 50)
+            # A non-positive radius matches no campus (and would divide by zero)
+            if radius > 0:
+                distance = self.geo_index.nearest_distances(near['latitude'], near['longitude'], radius, rows)
+                score += np.where(distance <= radius, 0.3 * (1 - 0.5 * distance / radius), 0.0)
+            factors += 1
+
+        return np.clip(score / max(factors, 1), 0, 1)
+
+    def preference_bound(self, preferences: Dict[str, Any]) -> float:
+        """
+        Highest preference_match any course can score for these preferences.
+
+        Each preference adds at most its full bonus, summed in the same order
+        as preference_match so the bound is never below a course's score.
+        """
+        if 'maxBudget' in preferences and not (preferences['maxBudget'] > 0 and (self.fees >= 0).all()):
+            # Negative budgets or fees can push the budget bonus past 0.2
+            return 1.0
+
+        score, factors = 0.5, 0
+        for preference, bonus in [('preferredRegion', 0.3), ('maxBudget', 0.2), ('preferredUniSize', 0.2),
+                                  ('preferredCourseLength', 0.1), ('nearLocation', 0.3)]:
+            if preference in preferences:
+                score += bonus
+                factors += 1
+        return min(max(score / max(factors, 1), 0.0), 1.0)
+
+    def admission_likelihood(self, predicted_grades: Dict[str, str],
+                             rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_admission_likelihood"""
+        points = ucas_points(predicted_grades)
+        if points is None:
+            return np.full(self.size if rows is None else len(rows), 0.5)
+        return self._take(self.tariff_cumulative[tariff_bucket(points)], rows)
+
+    def ranking_score(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_ranking_score (precomputed)"""
+        return self._take(self.static_scores['university_ranking'], rows)
+
+    def employability_score(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized equivalent of RecommendationEngine._calculate_employability_score (precomputed)"""
+        return self._take(self.static_scores['employability'], rows)
+
+    # ------------------------------------------------------------------
+    # Batch criteria (students x courses)
+    # ------------------------------------------------------------------
+
+    def subject_match_batch(self, subject_lists: List[List[str]]) -> np.ndarray:
+        """Subject match for many students at once as one students x courses matrix product"""
+        students = np.zeros((len(subject_lists), len(self.subject_vocab)), dtype=np.float32)
+        for s, subjects in enumerate(subject_lists):
+            for subject in subjects:
+                code = self.subject_vocab.get(subject)
+                if code is not None:
+                    students[s, code] = 1.0
+
+        matches = (students @ self.subject_dense.T).astype(np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = matches / self.required_count
+        ratio = np.where(matches == self.required_count, np.minimum(ratio + 0.2, 1.0), ratio)
+        return np.where(self.required_count > 0, ratio, 0.5)
+
+    def admission_likelihood_batch(self, grade_dicts: List[Dict[str, str]]) -> np.ndarray:
+        """Admission likelihood for many students at once, one cumulative row per student"""
+        return np.stack([self.admission_likelihood(grades) for grades in grade_dicts]) \
+            if grade_dicts else np.empty((0, self.size))
+
+    def grade_match_batch(self, grade_dicts: List[Dict[str, str]]) -> np.ndarray:
+        """Grade match for many students at once, one students x courses pass per requirement slot"""
+        total_score = np.zeros((len(grade_dicts), self.size))
+        total_weight = np.zeros((len(grade_dicts), self.size))
+        predicted = self._predicted_by_code(grade_dicts)
+
+        # Slot by slot keeps each course's requirement order; within a slot,
+        # only the students predicting a subject touch the courses requiring it
+        for j in range(self.grade_slots.shape[1]):
+            codes = self.grade_slots[:, j]
+            filled = np.flatnonzero(codes >= 0)
+            filled = filled[np.argsort(codes[filled], kind='stable')]
+            bounds = np.searchsorted(codes[filled], np.arange(len(self.grade_vocab) + 1))
+
+            for code in np.flatnonzero(~np.isnan(predicted[:, :-1]).all(axis=0)):
+                rows = filled[bounds[code]:bounds[code + 1]]
+                students = np.flatnonzero(~np.isnan(predicted[:, code]))
+                if not len(rows):
+                    continue
+                required = self.grade_slot_values[rows, j][None, :]
+                value = predicted[students, code][:, None]
+
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    partial = np.maximum(0, value / required)
+                cell = np.where(value >= required, 1.0, partial)
+
+                block = np.ix_(students, rows)
+                total_score[block] += cell
+                total_weight[block] += 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total_weight > 0, total_score / total_weight, 0.5)
@@ -0,0 +1,508 @@
+"""
+Memory-mapped course catalogue snapshot
+Compiles the catalogue's joined course views into typed columns on disk (NumPy
+.npy files plus a UTF-8 string table) that the API opens read-only with mmap,
+so a cold start queries no tables and every process reads the same page-cache
+pages instead of its own copy of the query results. Matrices and indexes are
+compiled from the columns; course dictionaries are decoded only for the
+courses a request returns
+
+Usage: python course_snapshot.py [--output DIR]
+"""
+
+import os
+import json
+import time
+import shutil
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / 'database' / 'data' / 'catalogue_snapshot'
+
+SNAPSHOT_FORMAT = 1
+
+# Names the snapshot directory in use; replaced atomically by each build
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+# Course view fields: a path into the course dictionary and how the value is
+# stored. 'str' values are codes into the string table; list kinds are
+# Arrow-style offsets plus values; 'int_list' stores None as NaN.
+FIELDS = [
+    (('id',), 'str'),
+    (('kisCourseId',), 'str'),
+    (('kisMode',), 'str'),
+    (('kisAimCode',), 'str'),
+    (('name',), 'str'),
+    (('ucasCode',), 'str'),
+    (('university', 'id'), 'str'),
+    (('university', 'name'), 'str'),
+    (('university', 'region'), 'str'),
+    (('university', 'ranking', 'overall'), 'int'),
+    (('university', 'ranking', 'subject'), 'int'),
+    (('university', 'website'), 'str'),
+    (('university', 'size'), 'str'),
+    (('entryRequirements', 'subjects'), 'str_list'),
+    (('entryRequirements', 'grades'), 'str_map'),
+    (('cahCodes',), 'str_list'),
+    (('locations',), 'locations'),
+    (('fees', 'uk'), 'int'),
+    (('employability', 'employmentRate'), 'int'),
+    (('employability', 'averageSalary'), 'int'),
+    (('outcomes', 'salaryLowerQuartile'), 'int'),
+    (('outcomes', 'salaryUpperQuartile'), 'int'),
+    (('outcomes', 'continuationRate'), 'int'),
+    (('typicalOffer', 'text'), 'str'),
+    (('typicalOffer', 'tariff'), 'int'),
+    (('tariffDistribution',), 'float_list'),
+    (('nssThemes',), 'int_list'),
+    (('duration',), 'str'),
+    (('url',), 'str'),
+    (('source',), 'str')
+]
+
+_FIELD_KINDS = dict(FIELDS)
+
+# Arrays stored per field kind, besides its state column
+KIND_PARTS = {
+    'str': ['values'],
+    'int': ['values'],
+    'str_list': ['offsets', 'values'],
+    'float_list': ['offsets', 'values'],
+    'int_list': ['offsets', 'values'],
+    'str_map': ['offsets', 'keys', 'values'],
+    'locations': ['offsets', 'ids', 'names', 'latitudes', 'longitudes']
+}
+
+# Nested dictionaries, which a course can carry even when they are empty
+CONTAINERS = [
+    ('university',),
+    ('university', 'ranking'),
+    ('entryRequirements',),
+    ('fees',),
+    ('employability',),
+    ('outcomes',),
+    ('typicalOffer',)
+]
+
+# Per-course state of each field and container
+ABSENT, NULL, PRESENT = 0, 1, 2
+
+_MISSING = object()
+
+
+def _column_name(path: Tuple[str, ...]) -> str:
+    return '.'.join(path)
+
+
+def _lookup(course: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value = course
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _check_fields(course: Dict[str, Any]):
+    """Raise ValueError for keys the snapshot format cannot store"""
+    def check(values: Dict[str, Any], parent: Tuple[str, ...]):
+        for key, value in values.items():
+            path = parent + (key,)
+            if path in CONTAINERS:
+                check(value, path)
+            elif path not in _FIELD_KINDS:
+                raise ValueError(f"Course {course.get('id', '?')} has field "
+                                 f"'{_column_name(path)}' that snapshots do not store")
+
+    check(course, ())
+
+
+class _StringTable:
+    """Interned UTF-8 strings, stored as one byte buffer with offsets"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        return self.codes.setdefault(value, len(self.codes))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        encoded = [value.encode('utf-8') for value in self.codes]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return {
+            'strings.offsets': offsets,
+            'strings.data': np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        }
+
+
+def _encode_values(kind: str, values: List[Any], strings: _StringTable) -> Dict[str, np.ndarray]:
+    """Arrays for one field's present values (a list of values per course for list kinds)"""
+    if kind == 'str':
+        return {'values': np.array([strings.code(value) for value in values], dtype=np.int32)}
+    if kind == 'int':
+        return {'values': np.array(values, dtype=np.int64)}
+
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    items = [item for value in values for item in (value.items() if kind == 'str_map' else value)]
+    if kind == 'str_list':
+        arrays = {'values': np.array([strings.code(item) for item in items], dtype=np.int32)}
+    elif kind == 'float_list':
+        arrays = {'values': np.array(items, dtype=np.float64)}
+    elif kind == 'int_list':
+        arrays = {'values': np.array([np.nan if item is None else item for item in items], dtype=np.float64)}
+    elif kind == 'str_map':
+        arrays = {
+            'keys': np.array([strings.code(key) for key, _ in items], dtype=np.int32),
+            'values': np.array([strings.code(value) for _, value in items], dtype=np.int32)
+        }
+    else:  # locations
+        arrays = {
+            'ids': np.array([strings.code(item['id']) for item in items], dtype=np.int32),
+            'names': np.array([strings.code(item['name']) for item in items], dtype=np.int32),
+            'latitudes': np.array([item['latitude'] for item in items], dtype=np.float64),
+            'longitudes': np.array([item['longitude'] for item in items], dtype=np.float64)
+        }
+    arrays['offsets'] = offsets
+    return arrays
+
+
+def encode_courses(courses: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Column arrays for a course list, keyed by file name (without .npy)"""
+    for course in courses:
+        _check_fields(course)
+
+    strings = _StringTable()
+    columns = {}
+    for path in CONTAINERS:
+        columns[f'{_column_name(path)}.state'] = np.array(
+            [ABSENT if _lookup(course, path) is _MISSING else PRESENT for course in courses], dtype=np.int8
+        )
+
+    for path, kind in FIELDS:
+        values = [_lookup(course, path) for course in courses]
+        state = np.array(
+            [ABSENT if value is _MISSING else NULL if value is None else PRESENT for value in values],
+            dtype=np.int8
+        )
+        columns[f'{_column_name(path)}.state'] = state
+        present = [value for value in values if value is not _MISSING and value is not None]
+        for part, array in _encode_values(kind, present, strings).items():
+            columns[f'{_column_name(path)}.{part}'] = array
+
+    columns.update(strings.arrays())
+    return columns
+
+
+def _decode_values(kind: str, arrays: Dict[str, np.ndarray], strings: List[str]) -> List[Any]:
+    """Python values for one field's present courses, the inverse of _encode_values"""
+    if kind == 'str':
+        return [strings[code] for code in arrays['values'].tolist()]
+    if kind == 'int':
+        return arrays['values'].tolist()
+
+    if kind == 'str_list':
+        items = [strings[code] for code in arrays['values'].tolist()]
+    elif kind == 'float_list':
+        items = arrays['values'].tolist()
+    elif kind == 'int_list':
+        items = [None if item != item else int(item) for item in arrays['values'].tolist()]
+    elif kind == 'str_map':
+        items = list(zip([strings[code] for code in arrays['keys'].tolist()],
+                         [strings[code] for code in arrays['values'].tolist()]))
+    else:  # locations
+        items = [
+            {'id': strings[location_id], 'name': strings[name], 'latitude': latitude, 'longitude': longitude}
+            for location_id, name, latitude, longitude in zip(
+                arrays['ids'].tolist(), arrays['names'].tolist(),
+                arrays['latitudes'].tolist(), arrays['longitudes'].tolist()
+            )
+        ]
+
+    offsets = arrays['offsets'].tolist()
+    if kind == 'str_map':
+        return [dict(items[start:end]) for start, end in zip(offsets, offsets[1:])]
+    return [items[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def decode_courses(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Course dictionaries from snapshot columns, equal to the ones encoded"""
+    data = columns['strings.data'].tobytes()
+    offsets = columns['strings.offsets'].tolist()
+    strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    courses = [{} for _ in range(len(columns['id.state']))]
+
+    # The dictionary each field is written into, per course (None where absent)
+    holders = {(): courses}
+    for path in CONTAINERS:
+        *parents, key = path
+        parent_holders, path_holders = holders[tuple(parents)], [None] * len(courses)
+        for i in np.flatnonzero(columns[f'{_column_name(path)}.state'] == PRESENT).tolist():
+            path_holders[i] = parent_holders[i][key] = {}
+        holders[path] = path_holders
+
+    for path, kind in FIELDS:
+        name = _column_name(path)
+        state = columns[f'{name}.state']
+        *parents, key = path
+        field_holders = holders[tuple(parents)]
+        for i in np.flatnonzero(state == NULL).tolist():
+            field_holders[i][key] = None
+        values = _decode_values(kind, {part: columns[f'{name}.{part}'] for part in KIND_PARTS[kind]}, strings)
+        for i, value in zip(np.flatnonzero(state == PRESENT).tolist(), values):
+            field_holders[i][key] = value
+
+    return courses
+
+
+class SnapshotCourses(Sequence):
+    """
+    The courses of mapped snapshot columns, in catalogue order.
+
+    Indexing decodes just that course's dictionary (memoized), and the
+    field readers used by course_fields serve whole columns, so compiling
+    the catalogue never builds the course dictionaries. Slices decode to
+    lists, for consumers that need their own copies (scoring workers).
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.size = len(columns['id.state'])
+        self._strings = None
+        self._present_rank: Dict[str, np.ndarray] = {}
+        self._decoded: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('course index out of range')
+        course = self._decoded.get(index)
+        if course is None:
+            course = self._decoded.setdefault(index, self._decode(index))
+        return course
+
+    @property
+    def strings(self) -> List[str]:
+        """The decoded string table"""
+        if self._strings is None:
+            data = self.columns['strings.data'].tobytes()
+            offsets = self.columns['strings.offsets'].tolist()
+            self._strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        return self._strings
+
+    def _state(self, path: Tuple[str, ...]) -> np.ndarray:
+        return self.columns[f'{_column_name(path)}.state']
+
+    def _parts(self, path: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+        name = _column_name(path)
+        return {part: self.columns[f'{name}.{part}'] for part in KIND_PARTS[_FIELD_KINDS[path]]}
+
+    def _value(self, path: Tuple[str, ...], index: int) -> Any:
+        """One course's present value of a field"""
+        name = _column_name(path)
+        rank = self._present_rank.get(name)
+        if rank is None:
+            rank = self._present_rank[name] = np.cumsum(self._state(path) == PRESENT) - 1
+        j = int(rank[index])
+
+        kind, parts = _FIELD_KINDS[path], self._parts(path)
+        if kind in ('str', 'int'):
+            return _decode_values(kind, {'values': parts['values'][j:j + 1]}, self.strings)[0]
+        start, end = parts['offsets'][j:j + 2].tolist()
+        item_parts = {part: array[start:end] for part, array in parts.items() if part != 'offsets'}
+        item_parts['offsets'] = np.array([0, end - start], dtype=np.int64)
+        return _decode_values(kind, item_parts, self.strings)[0]
+
+    def _decode(self, index: int) -> Dict[str, Any]:
+        """One course dictionary, built as decode_courses builds it"""
+        course = {}
+        holders = {(): course}
+        for path in CONTAINERS:
+            parent = holders.get(path[:-1])
+            if parent is not None and self._state(path)[index] == PRESENT:
+                holders[path] = parent[path[-1]] = {}
+
+        for path, _ in FIELDS:
+            state = self._state(path)[index]
+            if state == NULL:
+                holders[path[:-1]][path[-1]] = None
+            elif state == PRESENT:
+                holders[path[:-1]][path[-1]] = self._value(path, index)
+        return course
+
+    def field_values(self, path: Tuple[str, ...], default: Any = None) -> List[Any]:
+        """course_fields.field_values over the columns of one field"""
+        state = self._state(path)
+        values = [default] * self.size
+        for i in np.flatnonzero(state == NULL).tolist():
+            values[i] = None
+        present = _decode_values(_FIELD_KINDS[path], self._parts(path), self.strings)
+        for i, value in zip(np.flatnonzero(state == PRESENT).tolist(), present):
+            values[i] = value
+        return values
+
+    def field_array(self, path: Tuple[str, ...], default: float) -> np.ndarray:
+        """course_fields.field_array, scattered straight from a numeric column"""
+        if _FIELD_KINDS[path] != 'int':
+            return np.array([np.nan if value is None else value
+                             for value in self.field_values(path, default)], dtype=np.float64)
+        state = self._state(path)
+        values = np.full(self.size, default, dtype=np.float64)
+        values[state == NULL] = np.nan
+        values[state == PRESENT] = self._parts(path)['values']
+        return values
+
+    def field_matrix(self, path: Tuple[str, ...], width: int) -> np.ndarray:
+        """course_fields.field_matrix, reshaped from a numeric list column"""
+        parts = self._parts(path)
+        counts = np.diff(parts['offsets'])
+        if np.any((counts != 0) & (counts != width)):
+            raise ValueError(f"'{_column_name(path)}' has lists that are not {width} long")
+        matrix = np.full((self.size, width), np.nan)
+        rows = np.flatnonzero(self._state(path) == PRESENT)[counts > 0]
+        matrix[rows] = np.asarray(parts['values'], dtype=np.float64).reshape(-1, width)
+        return matrix
+
+    def location_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """course_fields.location_points, read from the location columns"""
+        parts = self._parts(('locations',))
+        owners = np.repeat(np.flatnonzero(self._state(('locations',)) == PRESENT), np.diff(parts['offsets']))
+        coordinates = np.column_stack([parts['latitudes'], parts['longitudes']]).astype(np.float64)
+        # Missing coordinates are stored as NaN
+        known = ~np.isnan(coordinates).any(axis=1)
+        return owners[known].astype(np.int64), coordinates[known]
+
+    def has_fields(self, path: Tuple[str, ...]) -> np.ndarray:
+        """course_fields.has_fields: any field or nested dictionary stored under `path`"""
+        present = np.zeros(self.size, dtype=bool)
+        for nested in CONTAINERS:
+            if len(nested) > len(path) and nested[:len(path)] == path:
+                present |= self._state(nested) == PRESENT
+        for nested, _ in FIELDS:
+            if len(nested) > len(path) and nested[:len(path)] == path:
+                present |= self._state(nested) != ABSENT
+        return present
+
+
+def write_snapshot(directory: Path, version: int, courses: List[Dict[str, Any]]) -> Path:
+    """
+    Write a snapshot of `courses` under `directory` and make it current.
+
+    Each build goes to its own subdirectory and CURRENT is switched to it
+    with an atomic rename, so readers never see a partly written snapshot.
+    The previous build is kept for processes still mapping it.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = encode_courses(courses)
+
+    name = f"v{version}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}"
+    building = directory / f'.{name}'
+    building.mkdir()
+    for column, array in columns.items():
+        np.save(building / f'{column}.npy', array, allow_pickle=False)
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'version': version,
+        'courses': len(courses),
+        'built_at': datetime.now().isoformat(timespec='seconds')
+    }
+    (building / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    building.rename(directory / name)
+
+    pointer = directory / f'.{CURRENT_FILE}.{os.getpid()}'
+    pointer.write_text(name)
+    previous = (directory / CURRENT_FILE).read_text().strip() if (directory / CURRENT_FILE).exists() else None
+    os.replace(pointer, directory / CURRENT_FILE)
+
+    for old in directory.iterdir():
+        if old.is_dir() and old.name not in (name, previous) and not old.name.startswith('.'):
+            shutil.rmtree(old, ignore_errors=True)
+    return directory / name
+
+
+def _load_column(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode='r', allow_pickle=False)
+    except ValueError:
+        # Empty arrays cannot be memory-mapped
+        return np.load(path, allow_pickle=False)
+
+
+class SnapshotCatalogueSource:
+    """
+    Catalogue source reading a snapshot written by `write_snapshot`.
+
+    Columns are memory-mapped read-only; rebuilding the snapshot with a new
+    version is picked up by the catalogue's version polling.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_SNAPSHOT_DIR):
+        self.directory = Path(directory)
+
+    def _current(self) -> Tuple[Path, Dict[str, Any]]:
+        build = self.directory / (self.directory / CURRENT_FILE).read_text().strip()
+        manifest = json.loads((build / MANIFEST_FILE).read_text())
+        if manifest.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"{build} has snapshot format {manifest.get('format')}, "
+                             f"expected {SNAPSHOT_FORMAT}; rebuild it")
+        return build, manifest
+
+    def current_version(self) -> int:
+        """Version of the current snapshot (reads only its manifest)"""
+        return self._current()[1]['version']
+
+    def open_columns(self) -> Tuple[int, Dict[str, np.ndarray]]:
+        """The current snapshot's version and read-only memory-mapped columns"""
+        build, manifest = self._current()
+        columns = {path.name[:-len('.npy')]: _load_column(path) for path in build.glob('*.npy')}
+        return manifest['version'], columns
+
+    def load(self):
+        """Map the current snapshot, returning (version, courses) with lazily decoded courses"""
+        version, columns = self.open_columns()
+        return version, SnapshotCourses(columns)
+
+
+def main():
+    """Build a snapshot from the PostgreSQL catalogue"""
+    import argparse
+    from catalogue import PostgresCatalogueSource
+
+    parser = argparse.ArgumentParser(description='Build the memory-mapped course catalogue snapshot')
+    parser.add_argument('--output', default=str(DEFAULT_SNAPSHOT_DIR), help='Snapshot directory')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COURSE CATALOGUE SNAPSHOT")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    version, courses = PostgresCatalogueSource().load()
+    load_seconds = time.perf_counter() - started
+    print(f"  ✓ Loaded {len(courses):,} courses at catalogue version {version} in {load_seconds:.2f}s")
+
+    started = time.perf_counter()
+    build = write_snapshot(Path(args.output), version, courses)
+    size = sum(path.stat().st_size for path in build.iterdir())
+    print(f"  ✓ Wrote {build} ({size / (1024 * 1024):.1f} MB) in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    SnapshotCatalogueSource(Path(args.output)).load()
+    print(f"  ✓ Snapshot loads in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,29 @@ Imports University and Course data from CSV files into PostgreSQL
 """
 
 import os
+import re
 import sys
 import csv
 import uuid
+import difflib
+import time
+import hashlib
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from import_scheduler import ImportTask, run_import_tasks
+import staging
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 # Database configuration
 DB_NAME = os.getenv('POSTGRES_DB', 'university_recommender')
@@ -32,6 +47,18 @@ def get_db_connection():
     )
 
 
+def get_connection_pool(size: int) -> ThreadedConnectionPool:
+    """Thread-safe pool of up to `size` database connections"""
+    return ThreadedConnectionPool(
+        1, max(1, size),
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+
+
 def generate_id(prefix: str = '') -> str:
     """Generate unique ID with optional prefix"""
     return f"{prefix}{uuid.uuid4().hex[:12]}" if prefix else uuid.uuid4().hex[:12]
@@ -154,8 +181,294 @@ def import_entrance_exams(cursor, exams_file: Optional[str] = None):
         print(f"  ✓ Created {len(default_exams)} default entrance exams")
 
 
-def import_universities(cursor, universities_file: str):
-    """Import universities from CSV file"""
+# Target columns, in INSERT order
+UNIVERSITY_FIELDS = ['university_id', 'name', 'region', 'rank_overall', 'employability_score', 'website_url']
+COURSE_FIELDS = [
+    'course_id', 'university_id', 'ucas_code', 'name', 'annual_fee', 'subject_rank',
+    'employability_score', 'course_url', 'typical_offer_text', 'typical_offer_tariff'
+]
+
+
+def _column(df: pd.DataFrame, *aliases: str) -> Optional[pd.Series]:
+    """The first of several alias columns present in the file"""
+    for alias in aliases:
+        if alias in df.columns:
+            return df[alias]
+    return None
+
+
+def _text_values(df: pd.DataFrame, *aliases: str) -> np.ndarray:
+    """Stripped strings per row, None where blank or the column is absent"""
+    values = np.full(len(df), None, dtype=object)
+    column = _column(df, *aliases)
+    if column is not None:
+        text = column.fillna('').astype(str).str.strip().to_numpy(dtype=object)
+        present = text != ''
+        values[present] = text[present]
+    return values
+
+
+def _int_values(df: pd.DataFrame, *aliases: str) -> np.ndarray:
+    """Whole numbers per row, None where blank, non-numeric or the column is absent"""
+    values = np.full(len(df), None, dtype=object)
+    column = _column(df, *aliases)
+    if column is not None:
+        numbers = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float)
+        present = np.isfinite(numbers)
+        values[present] = np.trunc(numbers[present]).astype(np.int64).tolist()
+    return values
+
+
+def derived_id(prefix: str, *fields: Any) -> str:
+    """ID derived from a row's identifying fields, the same on every import of the row"""
+    key = '\x1f'.join('' if field is None else str(field) for field in fields)
+    return f"{prefix}{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _id_values(df: pd.DataFrame, column: str, prefix: str, *identity: np.ndarray) -> np.ndarray:
+    """
+    IDs from `column`, derived from the `identity` columns where the column or
+    a value is missing, so re-imports keep the same keys and row hashes
+    """
+    values = _text_values(df, column)
+    for index in np.flatnonzero(pd.isna(values)):
+        values[index] = derived_id(prefix, *(fields[index] for fields in identity))
+    return values
+
+
+def _rows(columns: Dict[str, np.ndarray], fields: List[str]) -> List[tuple]:
+    """Row tuples for execute_values from per-field arrays"""
+    return list(zip(*(columns[field] for field in fields)))
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    """Comma-separated cell -> stripped, non-empty items"""
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def prepare_universities(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """University columns resolved from their CSV aliases, for the rows that have a name"""
+    name = _text_values(df, 'name')
+    columns = {
+        'university_id': _id_values(df, 'university_id', 'UNIV_', name),
+        'name': name,
+        'region': _text_values(df, 'region', 'location'),
+        'rank_overall': _int_values(df, 'rank_overall', 'ranking'),
+        'employability_score': _int_values(df, 'employability_score', 'employability'),
+        'website_url': _text_values(df, 'website_url', 'website')
+    }
+    keep = pd.notna(columns['name'])
+    return {field: values[keep] for field, values in columns.items()}
+
+
+def prepare_courses(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Course columns resolved from their CSV aliases, for the rows that have a
+    name and a university. Also carries the raw requirement and exam lists.
+    """
+    university_id = _text_values(df, 'university_id')
+    ucas_code = _text_values(df, 'ucas_code', 'ucas')
+    name = _text_values(df, 'name', 'course_name')
+    columns = {
+        'course_id': _id_values(df, 'course_id', 'COURSE_', university_id, ucas_code, name),
+        'university_id': university_id,
+        'ucas_code': ucas_code,
+        'name': name,
+        'annual_fee': _int_values(df, 'annual_fee', 'fee', 'uk_fees'),
+        'subject_rank': _int_values(df, 'subject_rank', 'subject_ranking'),
+        'employability_score': _int_values(df, 'employability_score', 'employability'),
+        'course_url': _text_values(df, 'course_url', 'url'),
+        'typical_offer_text': _text_values(df, 'typical_offer_text', 'typical_offer'),
+        'typical_offer_tariff': _int_values(df, 'typical_offer_tariff', 'tariff'),
+        'required_subjects': _text_values(df, 'required_subjects', 'subjects'),
+        'required_grades': _text_values(df, 'required_grades', 'grades'),
+        'required_exams': _text_values(df, 'required_exams', 'entrance_exams')
+    }
+    keep = pd.notna(columns['name']) & pd.notna(columns['university_id'])
+    return {field: values[keep] for field, values in columns.items()}
+
+
+CHECKSUM_BLOCK_SIZE = 1 << 20
+
+# Fields whose content decides whether a tracked row changed
+COURSE_HASH_FIELDS = COURSE_FIELDS + ['required_subjects', 'required_grades', 'required_exams']
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_unchanged(cursor, path: str, checksum: str) -> bool:
+    """Whether the file matches the checksum recorded by the last incremental import"""
+    cursor.execute("SELECT checksum FROM import_file WHERE file_name = %s", (Path(path).name,))
+    result = cursor.fetchone()
+    return result is not None and result[0] == checksum
+
+
+def record_file(cursor, path: str, checksum: str, row_count: int):
+    cursor.execute(
+        """
+        INSERT INTO import_file (file_name, checksum, row_count)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (file_name) DO UPDATE
+        SET checksum = EXCLUDED.checksum,
+            row_count = EXCLUDED.row_count,
+            imported_at = CURRENT_TIMESTAMP
+        """,
+        (Path(path).name, checksum, row_count)
+    )
+
+
+def prune_row_hashes(cursor, table: str, key_field: str) -> int:
+    """Forget tracked rows that are no longer in the table (e.g. removed by a cascade); returns how many"""
+    cursor.execute(
+        f"""
+        DELETE FROM import_row_hash h
+        WHERE h.table_name = %s
+          AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{key_field} = h.row_key)
+        """,
+        (table,)
+    )
+    return cursor.rowcount
+
+
+class RowDelta:
+    """
+    Rows of an import file compared, chunk by chunk, with the hashes stored
+    by the last incremental import: new and changed rows are applied,
+    unchanged ones skipped, and tracked rows that never appear are deleted.
+    """
+
+    def __init__(self, cursor, table: str, key_field: str, hash_fields: List[str]):
+        self.table = table
+        self.key_field = key_field
+        self.hash_fields = hash_fields
+        self.new_count = 0
+        self.changed_count = 0
+        self.skipped = 0
+        self.deleted_keys: List[str] = []
+        self._seen = set()
+
+        cursor.execute("SELECT row_key, row_hash FROM import_row_hash WHERE table_name = %s", (table,))
+        stored = cursor.fetchall()
+        self._stored_keys = pd.Index([key for key, _ in stored], dtype=object)
+        self._stored_hashes = np.array([row_hash for _, row_hash in stored], dtype=np.int64)
+
+    def select(self, cursor, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """The new and changed rows of one chunk; records their hashes"""
+        keys = columns[self.key_field]
+        frame = pd.DataFrame({field: columns[field] for field in self.hash_fields})
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+        positions = self._stored_keys.get_indexer(keys)
+        tracked = positions >= 0
+        new = ~tracked
+        changed = np.zeros(len(keys), dtype=bool)
+        changed[tracked] = self._stored_hashes[positions[tracked]] != hashes[tracked]
+        apply = new | changed
+
+        self.new_count += int(new.sum())
+        self.changed_count += int(changed.sum())
+        self.skipped += int((~apply).sum())
+        self._seen.update(keys.tolist())
+
+        if apply.any():
+            execute_values(
+                cursor,
+                """
+                INSERT INTO import_row_hash (table_name, row_key, row_hash)
+                VALUES %s
+                ON CONFLICT (table_name, row_key) DO UPDATE
+                SET row_hash = EXCLUDED.row_hash
+                """,
+                [(self.table, key, row_hash) for key, row_hash in zip(keys[apply], hashes[apply].tolist())]
+            )
+        return {field: values[apply] for field, values in columns.items()}
+
+    def finish(self, cursor):
+        """Delete tracked rows that were not in the file, and forget their hashes"""
+        self.deleted_keys = self._stored_keys[~self._stored_keys.isin(self._seen)].tolist()
+        if self.deleted_keys:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE {self.key_field} = ANY(%s)",
+                (self.deleted_keys,)
+            )
+            cursor.execute(
+                "DELETE FROM import_row_hash WHERE table_name = %s AND row_key = ANY(%s)",
+                (self.table, self.deleted_keys)
+            )
+
+    def summary(self) -> str:
+        return (f"{self.new_count} new, {self.changed_count} changed, {len(self.deleted_keys)} deleted, "
+                f"{self.skipped} unchanged rows skipped")
+
+
+# Rows parsed, prepared and written at a time; memory use follows this, not the file size
+CHUNK_ROWS = 20000
+
+# How often a file being read reports its progress
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB, where the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class ChunkedCsv:
+    """
+    A CSV file read as DataFrames of up to `chunk_rows` rows, all columns as
+    strings. Rows/sec and MB/sec are reported on stderr while it is read, so
+    they show live even when the import's own output is buffered.
+    """
+
+    def __init__(self, path: str, label: str, chunk_rows: int = CHUNK_ROWS):
+        self.path = path
+        self.label = label
+        self.chunk_rows = chunk_rows
+        self.total_bytes = os.path.getsize(path)
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        started = last_report = time.perf_counter()
+        with open(self.path, 'rb') as f:
+            with pd.read_csv(f, dtype=str, chunksize=self.chunk_rows) as reader:
+                for chunk in reader:
+                    yield chunk
+                    self.rows += len(chunk)
+                    self.bytes = f.tell()
+                    now = time.perf_counter()
+                    self.seconds = now - started
+                    if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                        last_report = now
+                        sys.stderr.write(f"    … {self.label}: {self.throughput()}\n")
+        self.bytes = self.total_bytes
+        self.seconds = time.perf_counter() - started
+
+    def throughput(self) -> str:
+        megabytes = self.bytes / (1024 * 1024)
+        seconds = max(self.seconds, 1e-9)
+        return (f"{self.rows:,} rows, {megabytes:.1f} of {self.total_bytes / (1024 * 1024):.1f} MB "
+                f"in {self.seconds:.2f}s ({self.rows / seconds:,.0f} rows/s, {megabytes / seconds:.1f} MB/s)")
+
+    def summary(self) -> str:
+        peak = peak_rss_mb()
+        return self.throughput() + (f", peak RSS {peak:.0f} MB" if peak is not None else '')
+
+
+def import_universities(cursor, universities_file: str, incremental: bool = False):
+    """Import universities from CSV file; incrementally, only rows changed since the last run"""
     print("\n" + "="*60)
     print("Importing Universities")
     print("="*60)
@@ -164,22 +477,26 @@ def import_universities(cursor, universities_file: str):
         print(f"  ✗ File not found: {universities_file}")
         return
     
-    df = pd.read_csv(universities_file)
-    print(f"  → Reading {len(df)} universities from {universities_file}")
+    if incremental:
+        checksum = file_checksum(universities_file)
+        pruned = prune_row_hashes(cursor, 'university', 'university_id')
+        if not pruned and file_unchanged(cursor, universities_file, checksum):
+            print(f"  ⊙ {universities_file} unchanged since the last import, skipping")
+            return
     
-    universities = []
-    for _, row in df.iterrows():
-        university_id = str(row.get('university_id', generate_id('UNIV_')))
-        name = str(row.get('name', '')).strip()
-        region = str(row.get('region', row.get('location', ''))).strip() or None
-        rank_overall = int(row.get('rank_overall', row.get('ranking', 0))) if pd.notna(row.get('rank_overall', row.get('ranking', None))) else None
-        employability_score = int(row.get('employability_score', row.get('employability', 0))) if pd.notna(row.get('employability_score', row.get('employability', None))) else None
-        website_url = str(row.get('website_url', row.get('website', ''))).strip() or None
-        
-        if name:
-            universities.append((university_id, name, region, rank_overall, employability_score, website_url))
+    print(f"  → Reading universities from {universities_file}")
+    delta = RowDelta(cursor, 'university', 'university_id', UNIVERSITY_FIELDS) if incremental else None
+    reader = ChunkedCsv(universities_file, 'universities')
+    imported = 0
     
-    if universities:
+    for df in reader:
+        columns = prepare_universities(df)
+        if delta:
+            columns = delta.select(cursor, columns)
+        universities = _rows(columns, UNIVERSITY_FIELDS)
+        if not universities:
+            continue
+        
         execute_values(
             cursor,
             """
@@ -194,13 +511,23 @@ def import_universities(cursor, universities_file: str):
             """,
             universities
         )
-        print(f"  ✓ Imported {len(universities)} universities")
-    else:
+        imported += len(universities)
+    
+    print(f"  ✓ Read {reader.summary()}")
+    if imported:
+        print(f"  ✓ Imported {imported} universities")
+    elif not incremental:
         print("  ✗ No valid universities found in CSV")
+    
+    if delta:
+        # Deleting a university also deletes its courses (ON DELETE CASCADE)
+        delta.finish(cursor)
+        record_file(cursor, universities_file, checksum, reader.rows)
+        print(f"  ✓ {delta.summary()}")
 
 
-def import_courses(cursor, courses_file: str):
-    """Import courses from CSV file"""
+def import_courses(cursor, courses_file: str, incremental: bool = False):
+    """Import courses from CSV file; incrementally, only rows changed since the last run"""
     print("\n" + "="*60)
     print("Importing Courses")
     print("="*60)
@@ -209,30 +536,37 @@ def import_courses(cursor, courses_file: str):
         print(f"  ✗ File not found: {courses_file}")
         return
     
-    df = pd.read_csv(courses_file)
-    print(f"  → Reading {len(df)} courses from {courses_file}")
+    if incremental:
+        checksum = file_checksum(courses_file)
+        # Courses removed with their university must be re-imported even if the file is unchanged
+        pruned = prune_row_hashes(cursor, 'course', 'course_id')
+        if not pruned and file_unchanged(cursor, courses_file, checksum):
+            print(f"  ⊙ {courses_file} unchanged since the last import, skipping")
+            return
     
-    # Import courses
-    courses = []
-    course_university_map = {}  # Track course_id -> university_id mapping
+    print(f"  → Reading courses from {courses_file}")
+    delta = RowDelta(cursor, 'course', 'course_id', COURSE_HASH_FIELDS) if incremental else None
+    subject_ids = load_subject_ids(cursor)
+    exam_index = ExamIndex.load(cursor)
+    unresolved_subjects, unresolved_exams = Counter(), Counter()
+    reader = ChunkedCsv(courses_file, 'courses')
+    imported = requirement_count = exam_count = 0
     
-    for _, row in df.iterrows():
-        course_id = str(row.get('course_id', generate_id('COURSE_')))
-        university_id = str(row.get('university_id', '')).strip()
-        ucas_code = str(row.get('ucas_code', row.get('ucas', ''))).strip() or None
-        name = str(row.get('name', row.get('course_name', ''))).strip()
-        annual_fee = int(row.get('annual_fee', row.get('fee', row.get('uk_fees', 0)))) if pd.notna(row.get('annual_fee', row.get('fee', row.get('uk_fees', None)))) else None
-        subject_rank = int(row.get('subject_rank', row.get('subject_ranking', 0))) if pd.notna(row.get('subject_rank', row.get('subject_ranking', None))) else None
-        employability_score = int(row.get('employability_score', row.get('employability', 0))) if pd.notna(row.get('employability_score', row.get('employability', None))) else None
-        course_url = str(row.get('course_url', row.get('url', ''))).strip() or None
-        typical_offer_text = str(row.get('typical_offer_text', row.get('typical_offer', ''))).strip() or None
-        typical_offer_tariff = int(row.get('typical_offer_tariff', row.get('tariff', 0))) if pd.notna(row.get('typical_offer_tariff', row.get('tariff', None))) else None
+    for df in reader:
+        columns = prepare_courses(df)
+        if delta:
+            columns = delta.select(cursor, columns)
+        courses = _rows(columns, COURSE_FIELDS)
+        if not courses:
+            continue
+        
+        # Every course written below gets its requirements and exams rebuilt;
+        # it may already be in the table with them, from an earlier import or
+        # a reload (which leaves no row hashes), even when new to tracking
+        course_ids = columns['course_id'].tolist()
+        cursor.execute("DELETE FROM course_requirement WHERE course_id = ANY(%s)", (course_ids,))
+        cursor.execute("DELETE FROM course_required_exam WHERE course_id = ANY(%s)", (course_ids,))
         
-        if name and university_id:
-            courses.append((course_id, university_id, ucas_code, name, annual_fee, subject_rank, employability_score, course_url, typical_offer_text, typical_offer_tariff))
-            course_university_map[course_id] = university_id
-    
-    if courses:
         execute_values(
             cursor,
             """
@@ -251,55 +585,170 @@ def import_courses(cursor, courses_file: str):
             """,
             courses
         )
-        print(f"  ✓ Imported {len(courses)} courses")
-        
-        # Import course requirements (if present in CSV)
-        import_course_requirements(cursor, df, course_university_map)
-        
-        # Import course required exams (if present in CSV)
-        import_course_exams(cursor, df, course_university_map)
-    else:
+        imported += len(courses)
+        requirement_count += import_course_requirements(cursor, columns, subject_ids, unresolved_subjects)
+        exam_count += import_course_exams(cursor, columns, exam_index, unresolved_exams)
+    
+    print(f"  ✓ Read {reader.summary()}")
+    if imported:
+        print(f"  ✓ Imported {imported} courses, {requirement_count} course requirements "
+              f"and {exam_count} course-exam relationships")
+    elif not incremental:
         print("  ✗ No valid courses found in CSV")
+    _report_unresolved('subject', unresolved_subjects)
+    _report_unresolved('exam', unresolved_exams)
+    
+    if delta:
+        delta.finish(cursor)
+        record_file(cursor, courses_file, checksum, reader.rows)
+        print(f"  ✓ {delta.summary()}")
 
 
-def import_course_requirements(cursor, df: pd.DataFrame, course_map: Dict[str, str]):
-    """Import course requirements from courses CSV"""
-    print("\n  → Processing course requirements...")
-    
+# Other names entrance exams go by, keyed by normalized name, mapped to the
+# normalized abbreviation they should resolve to
+EXAM_ALIASES = {
+    'ucat': 'ukcat',  # UKCAT was renamed UCAT in 2019
+    'university clinical aptitude test': 'ukcat',
+    'ukcat': 'ucat',
+    'sixth term examination paper': 'step',
+    'step 1': 'step',
+    'step 2': 'step',
+    'step 3': 'step'
+}
+
+# Similarity ratio (difflib) a misspelt exam name needs to resolve
+FUZZY_MATCH_CUTOFF = 0.85
+
+
+def normalize_name(name: str) -> str:
+    """Case-, punctuation- and spacing-insensitive form of a subject or exam name"""
+    name = name.casefold().replace('&', ' and ')
+    return ' '.join(''.join(character if character.isalnum() else ' ' for character in name).split())
+
+
+def load_subject_ids(cursor) -> Dict[str, str]:
+    """Normalized subject name -> subject_id for every subject"""
+    cursor.execute("SELECT subject_id, subject_name FROM subject")
+    return {normalize_name(subject_name): subject_id for subject_id, subject_name in cursor.fetchall()}
+
+
+class ExamIndex:
+    """
+    Resolves exam names from course files to exam_ids, all in memory.
+
+    Tries, in order: the full name, the abbreviation ('MAT' from
+    'Mathematics Admissions Test (MAT)' or 'EXAM_MAT'), EXAM_ALIASES, a
+    phrase found in exactly one exam name, then a close misspelling.
+    """
+
+    def __init__(self, exams: List[Tuple[str, str]]):
+        self.by_name: Dict[str, str] = {}
+        self.by_abbreviation: Dict[str, str] = {}
+        for exam_id, name in exams:
+            self.by_name[normalize_name(name)] = exam_id
+            match = re.search(r'\(([^)]+)\)\s*$', name)
+            if match:
+                self.by_abbreviation.setdefault(normalize_name(match.group(1)), exam_id)
+            if exam_id.upper().startswith('EXAM_'):
+                self.by_abbreviation.setdefault(normalize_name(exam_id[5:]), exam_id)
+        # Names without their trailing abbreviation, for phrase and fuzzy matches
+        self._names = {
+            normalize_name(re.sub(r'\([^)]*\)\s*$', '', name)): exam_id for exam_id, name in exams
+        }
+        self._resolved: Dict[str, Optional[str]] = {}  # Each distinct name is resolved once
+
+    @classmethod
+    def load(cls, cursor) -> 'ExamIndex':
+        cursor.execute("SELECT exam_id, name FROM entrance_exam")
+        return cls(cursor.fetchall())
+
+    def resolve(self, name: str) -> Optional[str]:
+        """exam_id for a name as written in a course file, or None"""
+        if name not in self._resolved:
+            self._resolved[name] = self._match(name)
+        return self._resolved[name]
+
+    def _match(self, name: str) -> Optional[str]:
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key in self.by_name:
+            return self.by_name[key]
+        if key in self.by_abbreviation:
+            return self.by_abbreviation[key]
+        alias = EXAM_ALIASES.get(key)
+        if alias in self.by_abbreviation:
+            return self.by_abbreviation[alias]
+
+        padded = f' {key} '
+        containing = {exam_id for exam_name, exam_id in self._names.items() if padded in f' {exam_name} '}
+        if len(containing) == 1:
+            return containing.pop()
+
+        close = difflib.get_close_matches(key, list(self._names) + list(self.by_abbreviation),
+                                          n=1, cutoff=FUZZY_MATCH_CUTOFF)
+        if close:
+            return self._names.get(close[0]) or self.by_abbreviation[close[0]]
+        return None
+
+
+def _report_unresolved(kind: str, unresolved: Counter):
+    """Print names that matched nothing, most frequent first"""
+    if not unresolved:
+        return
+    listed = ', '.join(f"'{name}' ({count})" for name, count in unresolved.most_common(10))
+    more = f" and {len(unresolved) - 10} more" if len(unresolved) > 10 else ''
+    print(f"  ⊙ {sum(unresolved.values())} {kind} references matched nothing: {listed}{more}")
+
+
+def course_requirement_rows(columns: Dict[str, np.ndarray], subject_ids: Dict[str, str],
+                            unresolved: Counter) -> List[tuple]:
+    """course_requirement rows for a chunk of prepared courses"""
     requirements = []
-    req_count = 0
     
-    for _, row in df.iterrows():
-        course_id = str(row.get('course_id', ''))
-        if not course_id or course_id not in course_map:
+    # Format: "required_subjects" or "subjects" (comma-separated)
+    # Format: "required_grades" or "grades" (comma-separated), paired by position
+    for course_id, subjects_str, grades_str in zip(
+        columns['course_id'], columns['required_subjects'], columns['required_grades']
+    ):
+        if not subjects_str:
             continue
         
-        # Check for subject requirements columns
-        # Format: "required_subjects" or "subjects" (comma-separated)
-        # Format: "required_grades" or "grades" (comma-separated or JSON)
-        subjects_str = str(row.get('required_subjects', row.get('subjects', ''))).strip()
-        grades_str = str(row.get('required_grades', row.get('grades', ''))).strip()
-        
-        if subjects_str:
-            subject_list = [s.strip() for s in subjects_str.split(',') if s.strip()]
-            grade_list = [g.strip() for g in grades_str.split(',') if g.strip()] if grades_str else []
+        grade_list = _split_list(grades_str)
+        for idx, subject_name in enumerate(_split_list(subjects_str)):
+            subject_id = subject_ids.get(normalize_name(subject_name))
+            if subject_id is None:
+                unresolved[subject_name] += 1
+                continue
             
-            for idx, subject_name in enumerate(subject_list):
-                # Look up subject_id by name
-                cursor.execute(
-                    "SELECT subject_id FROM subject WHERE LOWER(subject_name) = LOWER(%s)",
-                    (subject_name,)
-                )
-                subject_result = cursor.fetchone()
-                
-                if subject_result:
-                    subject_id = subject_result[0]
-                    grade_req = grade_list[idx] if idx < len(grade_list) else 'B'  # Default grade
-                    
-                    req_id = generate_id('REQ_')
-                    requirements.append((req_id, course_id, subject_id, grade_req))
-                    req_count += 1
+            grade_req = grade_list[idx] if idx < len(grade_list) else 'B'  # Default grade
+            requirements.append((generate_id('REQ_'), course_id, subject_id, grade_req))
+    return requirements
+
+
+def course_exam_rows(columns: Dict[str, np.ndarray], exam_index: ExamIndex,
+                     unresolved: Counter) -> List[tuple]:
+    """course_required_exam rows for a chunk of prepared courses, without duplicates"""
+    course_exams = set()
     
+    # Format: "required_exams" or "entrance_exams" (comma-separated exam names)
+    for course_id, exams_str in zip(columns['course_id'], columns['required_exams']):
+        if not exams_str:
+            continue
+        
+        for exam_name in _split_list(exams_str):
+            exam_id = exam_index.resolve(exam_name)
+            if exam_id is None:
+                unresolved[exam_name] += 1
+            else:
+                course_exams.add((course_id, exam_id))
+    return sorted(course_exams)
+
+
+def import_course_requirements(cursor, columns: Dict[str, np.ndarray],
+                               subject_ids: Dict[str, str], unresolved: Counter) -> int:
+    """Insert the requirements of a chunk of prepared courses; returns how many"""
+    requirements = course_requirement_rows(columns, subject_ids, unresolved)
     if requirements:
         execute_values(
             cursor,
@@ -310,42 +759,13 @@ def import_course_requirements(cursor, df: pd.DataFrame, course_map: Dict[str, s
             """,
             requirements
         )
-        print(f"  ✓ Imported {req_count} course requirements")
-    else:
-        print("  ⊙ No course requirements found in CSV")
+    return len(requirements)
 
 
-def import_course_exams(cursor, df: pd.DataFrame, course_map: Dict[str, str]):
-    """Import course required exams from courses CSV"""
-    print("\n  → Processing course required exams...")
-    
-    course_exams = []
-    exam_count = 0
-    
-    for _, row in df.iterrows():
-        course_id = str(row.get('course_id', ''))
-        if not course_id or course_id not in course_map:
-            continue
-        
-        # Check for required_exams column (comma-separated exam names)
-        exams_str = str(row.get('required_exams', row.get('entrance_exams', ''))).strip()
-        
-        if exams_str:
-            exam_list = [e.strip() for e in exams_str.split(',') if e.strip()]
-            
-            for exam_name in exam_list:
-                # Look up exam_id by name
-                cursor.execute(
-                    "SELECT exam_id FROM entrance_exam WHERE LOWER(name) LIKE LOWER(%s)",
-                    (f'%{exam_name}%',)
-                )
-                exam_result = cursor.fetchone()
-                
-                if exam_result:
-                    exam_id = exam_result[0]
-                    course_exams.append((course_id, exam_id))
-                    exam_count += 1
-    
+def import_course_exams(cursor, columns: Dict[str, np.ndarray],
+                        exam_index: ExamIndex, unresolved: Counter) -> int:
+    """Insert the required exams of a chunk of prepared courses; returns how many"""
+    course_exams = course_exam_rows(columns, exam_index, unresolved)
     if course_exams:
         execute_values(
             cursor,
@@ -356,10 +776,84 @@ def import_course_exams(cursor, df: pd.DataFrame, course_map: Dict[str, str]):
             """,
             course_exams
         )
-        print(f"  ✓ Imported {exam_count} course-exam relationships")
-    else:
-        print("  ⊙ No course required exams found in CSV")
+    return len(course_exams)
+
 
+# Tables rebuilt and swapped in together by a reload, referenced before referencing
+CATALOGUE_TABLES = ['university', 'course', 'course_requirement', 'course_required_exam']
+
+
+def reload_catalogue(cursor, universities_file: str, courses_file: str):
+    """
+    Replace universities and courses wholesale: load both files into staging
+    tables, build their indexes, then swap them in for the live tables in one
+    short transaction. Commits as it goes; on failure the live tables are untouched.
+    """
+    print("\n" + "="*60)
+    print("Reloading Universities and Courses")
+    print("="*60)
+    
+    conn = cursor.connection
+    staging.create_staging_tables(cursor, CATALOGUE_TABLES)
+    conn.commit()
+    try:
+        print(f"  → Loading {universities_file} and {courses_file} into {staging.STAGING_SCHEMA}")
+        started = time.perf_counter()
+        reader = ChunkedCsv(universities_file, 'universities')
+        university_count = 0
+        for df in reader:
+            universities = _rows(prepare_universities(df), UNIVERSITY_FIELDS)
+            staging.copy_rows(cursor, 'university', UNIVERSITY_FIELDS, universities)
+            university_count += len(universities)
+        print(f"  ✓ Read {reader.summary()}")
+        
+        subject_ids = load_subject_ids(cursor)
+        exam_index = ExamIndex.load(cursor)
+        unresolved_subjects, unresolved_exams = Counter(), Counter()
+        reader = ChunkedCsv(courses_file, 'courses')
+        course_count = requirement_count = exam_count = 0
+        for df in reader:
+            columns = prepare_courses(df)
+            courses = _rows(columns, COURSE_FIELDS)
+            requirements = course_requirement_rows(columns, subject_ids, unresolved_subjects)
+            course_exams = course_exam_rows(columns, exam_index, unresolved_exams)
+            staging.copy_rows(cursor, 'course', COURSE_FIELDS, courses)
+            staging.copy_rows(cursor, 'course_requirement',
+                              ['req_id', 'course_id', 'subject_id', 'grade_req'], requirements)
+            staging.copy_rows(cursor, 'course_required_exam', ['course_id', 'exam_id'], course_exams)
+            course_count += len(courses)
+            requirement_count += len(requirements)
+            exam_count += len(course_exams)
+        print(f"  ✓ Read {reader.summary()}")
+        _report_unresolved('subject', unresolved_subjects)
+        _report_unresolved('exam', unresolved_exams)
+        if not university_count or not course_count:
+            raise ValueError("No valid universities or courses found in CSV; keeping the current tables")
+        print(f"  ✓ Loaded {university_count} universities, {course_count} courses, "
+              f"{requirement_count} course requirements and {exam_count} course-exam relationships "
+              f"in {time.perf_counter() - started:.2f}s")
+        
+        started = time.perf_counter()
+        staging.finish_staging_tables(cursor, CATALOGUE_TABLES)
+        conn.commit()
+        print(f"  ✓ Built constraints, indexes and statistics in {time.perf_counter() - started:.2f}s")
+        
+        started = time.perf_counter()
+        staging.swap_in(cursor, CATALOGUE_TABLES)
+        # Hashes from earlier incremental imports describe rows that are gone
+        cursor.execute("SELECT to_regclass('import_row_hash')")
+        if cursor.fetchone()[0]:
+            cursor.execute("DELETE FROM import_row_hash WHERE table_name IN ('university', 'course')")
+            cursor.execute("DELETE FROM import_file WHERE file_name IN (%s, %s)",
+                           (Path(universities_file).name, Path(courses_file).name))
+        conn.commit()
+        print(f"  ✓ Swapped in the new tables in {time.perf_counter() - started:.3f}s")
+    except Exception:
+        conn.rollback()
+        staging.drop_staging_tables(cursor)
+        conn.commit()
+        raise
+    
 
 def main():
     """Main import function"""
@@ -371,8 +865,16 @@ def main():
     parser.add_argument('--subjects', type=str, help='Path to subjects CSV file (optional)')
     parser.add_argument('--exams', type=str, help='Path to entrance exams CSV file (optional)')
     parser.add_argument('--data-dir', type=str, default='./data', help='Directory containing CSV files')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Apply only rows added, changed or removed since the last incremental import')
+    parser.add_argument('--reload', action='store_true',
+                        help='Replace universities and courses by loading them off to the side and swapping them in')
+    parser.add_argument('--jobs', type=int, default=4,
+                        help='Tables imported at once, each on its own connection and transaction')
     
     args = parser.parse_args()
+    if args.reload and args.incremental:
+        parser.error('--reload and --incremental cannot be combined')
     
     print("="*60)
     print("CSV Data Import Tool")
@@ -385,31 +887,60 @@ def main():
     subjects_file = args.subjects or data_dir / 'subjects.csv' if (data_dir / 'subjects.csv').exists() else None
     exams_file = args.exams or data_dir / 'exams.csv' if (data_dir / 'exams.csv').exists() else None
     
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Import in order: subjects, exams, universities, courses
-        import_subjects(cursor, subjects_file)
-        import_entrance_exams(cursor, exams_file)
-        
+    # Subjects, exams and universities are independent; courses need all three,
+    # and a reload replacing universities and courses together needs the first two
+    tasks = [
+        ImportTask('subject', lambda cursor: import_subjects(cursor, subjects_file)),
+        ImportTask('entrance_exam', lambda cursor: import_entrance_exams(cursor, exams_file))
+    ]
+    if args.reload:
+        missing = [str(path) for path in (universities_file, courses_file) if not Path(path).exists()]
+        if missing:
+            print(f"\n✗ Reload needs both files; not found: {', '.join(missing)}")
+            sys.exit(1)
+        tasks.append(ImportTask(
+            'catalogue',
+            lambda cursor: reload_catalogue(cursor, str(universities_file), str(courses_file)),
+            depends_on=['subject', 'entrance_exam']
+        ))
+    else:
         if Path(universities_file).exists():
-            import_universities(cursor, str(universities_file))
+            tasks.append(ImportTask(
+                'university',
+                lambda cursor: import_universities(cursor, str(universities_file), incremental=args.incremental)
+            ))
         else:
             print(f"\n⚠ Universities file not found: {universities_file}")
             print("  Skipping university import")
         
         if Path(courses_file).exists():
-            import_courses(cursor, str(courses_file))
+            tasks.append(ImportTask(
+                'course',
+                lambda cursor: import_courses(cursor, str(courses_file), incremental=args.incremental),
+                depends_on=['subject', 'entrance_exam', 'university']
+            ))
         else:
             print(f"\n⚠ Courses file not found: {courses_file}")
             print("  Skipping course import")
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+
+    try:
+        pool = get_connection_pool(args.jobs)
+        results = run_import_tasks(pool, tasks, jobs=args.jobs)
+        pool.closeall()
         
         print("\n" + "="*60)
+        for result in results.values():
+            marker = {'done': '✓', 'failed': '✗', 'skipped': '⊙'}[result.status]
+            print(f"{marker} {result.name:<14} {result.status:<8} {result.seconds:>7.2f}s")
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"→ Peak RSS: {peak:.0f} MB")
+        
+        incomplete = [result.name for result in results.values() if result.status != 'done']
+        if incomplete:
+            print(f"✗ Import finished with {len(incomplete)} table(s) not loaded: {', '.join(incomplete)}")
+            print("="*60)
+            sys.exit(1)
         print("✓ Import completed successfully!")
         print("="*60)
         
@@ -0,0 +1,397 @@
+"""
+Discover Uni Bulk Loader
+Streams the Discover Uni CSV files into the tables from
+002_discover_uni_data_schema.sql with COPY FROM STDIN, cleaning values on the fly
+"""
+
+import os
+import io
+import sys
+import csv
+import time
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Callable, Iterator
+
+from import_scheduler import ImportTask, TaskResult, run_import_tasks
+
+# Database configuration
+DB_NAME = os.getenv('POSTGRES_DB', 'university_recommender')
+DB_USER = os.getenv('POSTGRES_USER', 'postgres')
+DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'postgres')
+DB_HOST = os.getenv('POSTGRES_HOST', 'localhost')
+DB_PORT = os.getenv('POSTGRES_PORT', '5432')
+
+# CSV file -> table; load order comes from the foreign keys, this order breaks ties
+DISCOVER_UNI_FILES = [
+    ('KISAIM.csv', 'kis_aim'),
+    ('ACCREDITATIONTABLE.csv', 'accreditation_table'),
+    ('LOCATION.csv', 'location'),
+    ('INSTITUTION.csv', 'institution'),
+    ('KISCOURSE.csv', 'kiscourse'),
+    ('ACCREDITATION.csv', 'accreditation'),
+    ('COURSELOCATION.csv', 'courselocation'),
+    ('UCASCOURSEID.csv', 'ucascourseid'),
+    ('SBJ.csv', 'sbj'),
+    ('ENTRY.csv', 'entry'),
+    ('TARIFF.csv', 'tariff'),
+    ('CONTINUATION.csv', 'continuation'),
+    ('EMPLOYMENT.csv', 'employment'),
+    ('JOBTYPE.csv', 'jobtype'),
+    ('COMMON.csv', 'common'),
+    ('JOBLIST.csv', 'joblist'),
+    ('GOSALARY.csv', 'gosalary'),
+    ('GOSECSAL.csv', 'gosecsal'),
+    ('GOVOICEWORK.csv', 'govoicework'),
+    ('LEO3.csv', 'leo3'),
+    ('LEO3SEC.csv', 'leo3sec'),
+    ('LEO5.csv', 'leo5'),
+    ('LEO5SEC.csv', 'leo5sec'),
+    ('NSS.csv', 'nss'),
+    ('NSSCOUNTRY.csv', 'nsscountry'),
+    ('TEFOutcome.csv', 'tefoutcome'),
+    ('AccreditationByHep.csv', 'accreditation_by_hep'),
+]
+
+# Rows serialized per chunk handed to COPY, and the read size COPY asks for
+CHUNK_ROWS = 5000
+COPY_BUFFER_SIZE = 1 << 20
+
+INTEGER_TYPES = {'smallint', 'integer', 'bigint'}
+DECIMAL_TYPES = {'numeric', 'real', 'double precision'}
+
+COLUMNS_QUERY = """
+    SELECT column_name, data_type, character_maximum_length, column_default
+    FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = %s
+    ORDER BY ordinal_position
+"""
+
+
+def get_db_connection():
+    """Create database connection"""
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+
+
+def get_connection_pool(size: int) -> ThreadedConnectionPool:
+    """Thread-safe pool of up to `size` database connections"""
+    return ThreadedConnectionPool(
+        1, max(1, size),
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+
+
+def normalize_header(header: str) -> str:
+    """CSV header -> column name ('Accrediting Body Name' -> 'accrediting_body_name')"""
+    name = ''.join(character if character.isalnum() else '_' for character in header.strip().lower())
+    return '_'.join(part for part in name.split('_') if part)
+
+
+def find_csv_files(data_dir: Path) -> Dict[str, Path]:
+    """CSV files in a directory, keyed by lower-case file name"""
+    return {path.name.lower(): path for path in data_dir.glob('*') if path.suffix.lower() == '.csv'}
+
+
+class LoadStats:
+    """Counters for one table load"""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0
+        self.suppressed = 0  # non-numeric values in numeric columns, loaded as NULL
+        self.truncated = 0  # values longer than their VARCHAR column
+        self.bytes = 0
+        self.seconds = 0.0
+        self.unmapped: List[str] = []
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _integer_cleaner(stats: LoadStats) -> Callable[[str], str]:
+    def clean(value: str) -> str:
+        if not value:
+            return value
+        try:
+            return str(int(value))
+        except ValueError:
+            pass
+        try:
+            number = float(value)
+            if number.is_integer():
+                return str(int(number))
+        except ValueError:
+            pass
+        # Suppression and unavailability codes are not numbers
+        stats.suppressed += 1
+        return ''
+    return clean
+
+
+def _decimal_cleaner(stats: LoadStats) -> Callable[[str], str]:
+    def clean(value: str) -> str:
+        if not value:
+            return value
+        try:
+            float(value)
+            return value
+        except ValueError:
+            stats.suppressed += 1
+            return ''
+    return clean
+
+
+def _length_cleaner(stats: LoadStats, limit: int) -> Callable[[str], str]:
+    def clean(value: str) -> str:
+        if len(value) <= limit:
+            return value
+        stats.truncated += 1
+        return value[:limit]
+    return clean
+
+
+def plan_columns(cursor, table: str, headers: List[str],
+                 stats: LoadStats) -> Tuple[List[str], List[int], List[Tuple[int, Callable[[str], str]]]]:
+    """
+    Match CSV headers to table columns.
+
+    Returns the target columns, the CSV index feeding each one, and a cleaner
+    for each position whose type or length needs checking. Generated key
+    columns (SERIAL) are left to their defaults.
+    """
+    cursor.execute(COLUMNS_QUERY, (table,))
+    column_types = {
+        name: (data_type, max_length)
+        for name, data_type, max_length, default in cursor.fetchall()
+        if not (default or '').startswith('nextval(')
+    }
+
+    columns, picks, cleaners = [], [], []
+    for index, header in enumerate(headers):
+        name = normalize_header(header)
+        if name not in column_types or name in columns:
+            stats.unmapped.append(header)
+            continue
+        data_type, max_length = column_types[name]
+        if data_type in INTEGER_TYPES:
+            cleaners.append((len(columns), _integer_cleaner(stats)))
+        elif data_type in DECIMAL_TYPES:
+            cleaners.append((len(columns), _decimal_cleaner(stats)))
+        elif max_length:
+            cleaners.append((len(columns), _length_cleaner(stats, max_length)))
+        columns.append(name)
+        picks.append(index)
+    return columns, picks, cleaners
+
+
+def clean_chunks(reader: Iterator[List[str]], width: int, picks: List[int],
+                 cleaners: List[Tuple[int, Callable[[str], str]]],
+                 stats: LoadStats) -> Iterator[str]:
+    """
+    CSV text for COPY, CHUNK_ROWS rows at a time.
+
+    Values are trimmed and blanks become NULL (an unquoted empty CSV field);
+    numeric columns drop anything that is not a number.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    pending = 0
+
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        values = [row[index].strip() for index in picks]
+        for position, clean in cleaners:
+            values[position] = clean(values[position])
+        writer.writerow(values)
+        stats.rows += 1
+        pending += 1
+
+        if pending == CHUNK_ROWS:
+            chunk = buffer.getvalue()
+            stats.bytes += len(chunk)
+            yield chunk
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    chunk = buffer.getvalue()
+    if chunk:
+        stats.bytes += len(chunk)
+        yield chunk
+
+
+class CopyStream:
+    """Read-only file object over an iterator of text chunks, for copy_expert"""
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buffer = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_csv_file(cursor, csv_file: Path, table: str) -> LoadStats:
+    """Stream one CSV file into its table with COPY FROM STDIN"""
+    stats = LoadStats(table)
+    started = time.perf_counter()
+
+    with open(csv_file, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        columns, picks, cleaners = plan_columns(cursor, table, headers, stats)
+        if not columns:
+            return stats
+
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        cursor.copy_expert(
+            f'COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)',
+            CopyStream(clean_chunks(reader, len(headers), picks, cleaners, stats)),
+            size=COPY_BUFFER_SIZE
+        )
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+FOREIGN_KEYS_QUERY = """
+    SELECT DISTINCT child.relname, parent.relname
+    FROM pg_constraint c
+    JOIN pg_class child ON child.oid = c.conrelid
+    JOIN pg_class parent ON parent.oid = c.confrelid
+    WHERE c.contype = 'f'
+      AND child.relnamespace = current_schema()::regnamespace
+"""
+
+
+def table_dependencies(cursor) -> Dict[str, Set[str]]:
+    """Table -> the tables its foreign keys reference"""
+    cursor.execute(FOREIGN_KEYS_QUERY)
+    dependencies: Dict[str, Set[str]] = {}
+    for child, parent in cursor.fetchall():
+        if child != parent:
+            dependencies.setdefault(child, set()).add(parent)
+    return dependencies
+
+
+def load_table(cursor, csv_file: Path, table: str) -> LoadStats:
+    """Task body: COPY one file and print its counters"""
+    stats = copy_csv_file(cursor, csv_file, table)
+    print(f"  ✓ {table:<22} {stats.rows:>9,} rows  {stats.seconds:>6.2f}s  "
+          f"{stats.rows_per_second:>10,.0f} rows/s")
+    if stats.suppressed or stats.truncated:
+        print(f"    ⊙ {stats.suppressed:,} suppressed numeric values loaded as NULL, "
+              f"{stats.truncated:,} values truncated")
+    if stats.unmapped:
+        print(f"    ⊙ Ignored columns with no match in {table}: {', '.join(stats.unmapped)}")
+    return stats
+
+
+def load_discover_uni(pool, data_dir: Path, truncate: bool = True, jobs: int = 4) -> Dict[str, TaskResult]:
+    """
+    Load every Discover Uni file found in data_dir.
+
+    Tables load in foreign key order, up to `jobs` at a time, each in its own
+    transaction; a table that fails is rolled back and the tables that
+    reference it are skipped.
+    """
+    files = find_csv_files(data_dir)
+    plan = [(files[name.lower()], table) for name, table in DISCOVER_UNI_FILES if name.lower() in files]
+
+    print(f"  → Found {len(plan)} of {len(DISCOVER_UNI_FILES)} Discover Uni files in {data_dir}")
+    if not plan:
+        return {}
+
+    conn = pool.getconn()
+    try:
+        cursor = conn.cursor()
+        dependencies = table_dependencies(cursor)
+        if truncate:
+            # Cleared up front in one statement: truncating per task would
+            # have concurrent CASCADEs lock shared child tables in different
+            # orders. CASCADE also clears rows in child tables that reference them
+            cursor.execute(f"TRUNCATE {', '.join(table for _, table in plan)} CASCADE")
+            print(f"  ✓ Truncated {len(plan)} tables")
+        cursor.close()
+        conn.commit()
+    finally:
+        pool.putconn(conn)
+
+    tasks = [
+        ImportTask(table, lambda cursor, csv_file=csv_file, table=table: load_table(cursor, csv_file, table),
+                   depends_on=dependencies.get(table, ()))
+        for csv_file, table in plan
+    ]
+    print(f"  → Loading with up to {jobs} tables at a time")
+    return run_import_tasks(pool, tasks, jobs=jobs)
+
+
+def main():
+    """Main import function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bulk load the Discover Uni CSV files into PostgreSQL')
+    parser.add_argument('--data-dir', type=str, default='./data', help='Directory containing the Discover Uni CSV files')
+    parser.add_argument('--append', action='store_true', help='Keep existing rows instead of replacing the tables')
+    parser.add_argument('--jobs', type=int, default=4,
+                        help='Tables loaded at once, each on its own connection and transaction')
+
+    args = parser.parse_args()
+
+    print("="*60)
+    print("Discover Uni Bulk Load")
+    print("="*60)
+
+    try:
+        pool = get_connection_pool(args.jobs)
+        started = time.perf_counter()
+        results = load_discover_uni(pool, Path(args.data_dir), truncate=not args.append, jobs=args.jobs)
+        pool.closeall()
+        elapsed = time.perf_counter() - started
+
+        loaded = [result.value for result in results.values() if result.status == 'done']
+        incomplete = [result.name for result in results.values() if result.status != 'done']
+        rows = sum(stats.rows for stats in loaded)
+        megabytes = sum(stats.bytes for stats in loaded) / (1024 * 1024)
+        print("\n" + "="*60)
+        print(f"✓ Loaded {rows:,} rows ({megabytes:.1f} MB) into {len(loaded)} tables in {elapsed:.2f}s "
+              f"({rows / elapsed if elapsed > 0 else 0:,.0f} rows/s)")
+        if incomplete:
+            print(f"✗ {len(incomplete)} table(s) not loaded: {', '.join(incomplete)}")
+        print("="*60)
+        if incomplete:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n✗ Error during import: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Import Scheduler
+Runs table imports as a dependency graph: each table loads on its own pooled
+connection and transaction once the tables it depends on have committed, with
+up to `jobs` tables loading at a time
+"""
+
+import io
+import sys
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class ImportTask:
+    """One table import: `run(cursor)` inside its own transaction"""
+
+    def __init__(self, name: str, run: Callable[[Any], Any], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.run = run
+        self.depends_on = set(depends_on)
+
+
+class TaskResult:
+    """Outcome of one task: 'done', 'failed' or 'skipped' (a dependency did not load)"""
+
+    def __init__(self, name: str, status: str, value: Any = None,
+                 error: Optional[str] = None, seconds: float = 0.0):
+        self.name = name
+        self.status = status
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+        self.output = ''  # What the task printed
+
+
+class _ThreadOutput:
+    """sys.stdout stand-in that buffers prints from task threads, so each table's output stays together"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def check_acyclic(tasks: List[ImportTask]):
+    """Raise ValueError if the task dependencies contain a cycle"""
+    names = {task.name for task in tasks}
+    remaining = {task.name: task.depends_on & names for task in tasks}
+    while remaining:
+        ready = [name for name, depends_on in remaining.items() if not depends_on & remaining.keys()]
+        if not ready:
+            raise ValueError(f"Import dependencies form a cycle between: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+
+
+def _run_task(pool, output: _ThreadOutput, task: ImportTask) -> TaskResult:
+    output.local.buffer = io.StringIO()
+    started = time.perf_counter()
+    conn = pool.getconn()
+    try:
+        cursor = conn.cursor()
+        try:
+            value = task.run(cursor)
+        finally:
+            cursor.close()
+        conn.commit()
+        result = TaskResult(task.name, 'done', value=value)
+    except Exception as e:
+        conn.rollback()
+        traceback.print_exc(file=output.local.buffer)
+        result = TaskResult(task.name, 'failed', error=(str(e).strip().splitlines() or [repr(e)])[0])
+    finally:
+        pool.putconn(conn)
+
+    result.seconds = time.perf_counter() - started
+    result.output = output.local.buffer.getvalue()
+    output.local.buffer = None
+    return result
+
+
+def run_import_tasks(pool, tasks: List[ImportTask], jobs: int = 4) -> Dict[str, TaskResult]:
+    """
+    Run tasks as their dependencies allow, at most `jobs` at once.
+
+    Dependencies on names that are not tasks are ignored. A task whose
+    dependency failed or was skipped is skipped; everything else still runs.
+    Tasks start in list order when several are ready; results come back in
+    list order too.
+    """
+    check_acyclic(tasks)
+    jobs = max(1, jobs)
+    names = {task.name for task in tasks}
+    pending = {task.name: task for task in tasks}
+    depends_on = {task.name: task.depends_on & names for task in tasks}
+    results: Dict[str, TaskResult] = {}
+    running = {}
+
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while pending or running:
+                skipped = True
+                while skipped:
+                    skipped = False
+                    for name in list(pending):
+                        blocked = sorted(d for d in depends_on[name] if d in results and results[d].status != 'done')
+                        if blocked:
+                            del pending[name]
+                            results[name] = TaskResult(name, 'skipped', error=f"{blocked[0]} did not load")
+                            output.stream.write(f"  ⊙ Skipped {name}: {blocked[0]} did not load\n")
+                            skipped = True
+
+                for name in list(pending):
+                    if len(running) >= jobs:
+                        break
+                    if all(d in results for d in depends_on[name]):
+                        running[executor.submit(_run_task, pool, output, pending.pop(name))] = name
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    results[running.pop(future)] = result
+                    output.stream.write(result.output)
+                    if result.status == 'failed':
+                        output.stream.write(f"  ✗ {result.name} failed and was rolled back: {result.error}\n")
+    finally:
+        sys.stdout = output.stream
+
+    return {task.name: results[task.name] for task in tasks}
@@ -0,0 +1,65 @@
+-- Catalogue Data Version
+-- PostgreSQL Migration Script
+-- Single-row version counter bumped whenever course data changes.
+-- The API polls this row to hot-reload its in-memory course catalogue.
+
+-- ============================================
+-- 1. VERSION TABLE
+-- ============================================
+
+CREATE TABLE catalogue_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Enforces a single row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE catalogue_version IS 'Single-row data version for the in-memory course catalogue';
+COMMENT ON COLUMN catalogue_version.version IS 'Incremented by every statement that changes catalogue tables';
+
+INSERT INTO catalogue_version (id) VALUES (TRUE);
+
+-- ============================================
+-- 2. VERSION BUMP TRIGGERS
+-- ============================================
+
+-- Statement-level so a bulk import bumps the version once per statement, not per row
+CREATE OR REPLACE FUNCTION bump_catalogue_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE catalogue_version
+    SET version = version + 1,
+        updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_university_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON university
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_course_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON course
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_course_requirement_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON course_requirement
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_institution_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON institution
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_kiscourse_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON kiscourse
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_sbj_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON sbj
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_employment_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON employment
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_gosalary_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON gosalary
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
@@ -0,0 +1,12 @@
+-- Teaching Locations in the Catalogue Version
+-- PostgreSQL Migration Script
+-- The in-memory catalogue now carries course teaching locations (for
+-- distance preferences), so location changes must bump the data version too.
+
+CREATE TRIGGER trg_location_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON location
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+CREATE TRIGGER trg_courselocation_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON courselocation
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
@@ -0,0 +1,8 @@
+-- Continuation Data in the Catalogue Version
+-- PostgreSQL Migration Script
+-- The in-memory catalogue now precomputes continuation-rate features, so
+-- continuation changes must bump the data version too.
+
+CREATE TRIGGER trg_continuation_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON continuation
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
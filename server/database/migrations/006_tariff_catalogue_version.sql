@@ -0,0 +1,8 @@
+-- Tariff Data in the Catalogue Version
+-- PostgreSQL Migration Script
+-- The in-memory catalogue now carries entrant tariff distributions for
+-- admission likelihood scoring, so tariff changes must bump the data version too.
+
+CREATE TRIGGER trg_tariff_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tariff
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
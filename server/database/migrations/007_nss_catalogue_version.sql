@@ -0,0 +1,8 @@
+-- NSS Data in the Catalogue Version
+-- PostgreSQL Migration Script
+-- The in-memory catalogue now carries NSS theme scores for the similar-courses
+-- index, so NSS changes must bump the data version too.
+
+CREATE TRIGGER trg_nss_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON nss
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
@@ -0,0 +1,30 @@
+-- Incremental Import Tracking
+-- PostgreSQL Migration Script
+-- `import_csv.py --incremental` records a checksum per source file and a content
+-- hash per imported row, so later runs apply only new, changed and removed rows.
+
+-- ============================================
+-- 1. SOURCE FILES
+-- ============================================
+
+CREATE TABLE import_file (
+    file_name VARCHAR(255) PRIMARY KEY,
+    checksum CHAR(64) NOT NULL,  -- SHA-256 of the file contents
+    row_count INTEGER NOT NULL,
+    imported_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE import_file IS 'Checksum of each CSV file as of its last incremental import';
+
+-- ============================================
+-- 2. ROW HASHES
+-- ============================================
+
+CREATE TABLE import_row_hash (
+    table_name VARCHAR(63) NOT NULL,
+    row_key VARCHAR(50) NOT NULL,
+    row_hash BIGINT NOT NULL,
+    PRIMARY KEY (table_name, row_key)
+);
+
+COMMENT ON TABLE import_row_hash IS 'Content hash of each row written by the incremental import, keyed by target table and primary key';
@@ -0,0 +1,160 @@
+"""
+Staging Table Swap
+Rebuilds a group of tables off to the side and swaps them in at once: the new
+data is bulk-loaded into UNLOGGED copies with no indexes in a staging schema,
+then the live tables' constraints, indexes and triggers are built on it, and
+one short transaction moves the copies into place. Readers see the old tables
+or the new ones, never a half-loaded table.
+"""
+
+import io
+import csv
+import re
+from typing import List
+
+STAGING_SCHEMA = 'reload_staging'
+RETIRED_SCHEMA = 'reload_retired'
+
+# How long the swap waits for readers to release the live tables before giving up
+SWAP_LOCK_TIMEOUT = '10s'
+
+CONSTRAINTS_QUERY = """
+    SELECT conname, contype, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'c', 'f', 'x')
+    ORDER BY conname
+"""
+
+# Indexes that do not back a constraint (those come with the constraint)
+INDEXES_QUERY = """
+    SELECT pg_get_indexdef(i.indexrelid)
+    FROM pg_index i
+    WHERE i.indrelid = %s::regclass
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+    ORDER BY i.indexrelid
+"""
+
+TRIGGERS_QUERY = """
+    SELECT pg_get_triggerdef(oid)
+    FROM pg_trigger
+    WHERE tgrelid = %s::regclass AND NOT tgisinternal
+    ORDER BY tgname
+"""
+
+# Foreign keys into the given tables from tables outside the group, and views
+# over them; dropping the retired tables would silently take these with them
+DEPENDENTS_QUERY = """
+    SELECT c.conrelid::regclass::text || ' (foreign key ' || c.conname || ')'
+    FROM pg_constraint c
+    WHERE c.contype = 'f'
+      AND c.confrelid = ANY(%(tables)s::regclass[])
+      AND NOT c.conrelid = ANY(%(tables)s::regclass[])
+    UNION ALL
+    SELECT DISTINCT v.view_schema || '.' || v.view_name || ' (view)'
+    FROM information_schema.view_table_usage v
+    WHERE v.table_schema = current_schema() AND v.table_name = ANY(%(tables)s)
+"""
+
+
+def _retarget(definition: str, schema: str, table: str) -> str:
+    """Point an index or trigger definition at the staging copy of `table`"""
+    return re.sub(rf' ON (ONLY )?{re.escape(schema)}\.{re.escape(table)} ',
+                  rf' ON \g<1>{STAGING_SCHEMA}.{table} ', definition, count=1)
+
+
+def create_staging_tables(cursor, tables: List[str]):
+    """Empty UNLOGGED, index-free copies of `tables` in the staging schema"""
+    cursor.execute("SELECT %(tables)s::regclass[]", {'tables': tables})  # Fails early on unknown tables
+    cursor.execute(DEPENDENTS_QUERY, {'tables': tables})
+    dependents = [row[0] for row in cursor.fetchall()]
+    if dependents:
+        raise RuntimeError(f"Cannot swap {', '.join(tables)}: referenced by {', '.join(dependents)}")
+
+    cursor.execute(f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {STAGING_SCHEMA}")
+    for table in tables:
+        cursor.execute(f"CREATE UNLOGGED TABLE {STAGING_SCHEMA}.{table} (LIKE {table} INCLUDING DEFAULTS)")
+
+
+def copy_rows(cursor, table: str, fields: List[str], rows: List[tuple]):
+    """COPY rows into a staging table (None loads as NULL)"""
+    if not rows:
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {STAGING_SCHEMA}.{table} ({', '.join(fields)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+
+def finish_staging_tables(cursor, tables: List[str]):
+    """
+    Make the loaded copies match the live tables: WAL-logged, with the same
+    constraints, indexes and triggers, and fresh planner statistics.
+
+    Unique and key constraints are checked here, so duplicate keys in the
+    source fail the reload before anything live is touched.
+    """
+    cursor.execute("SELECT current_schema()")
+    schema = cursor.fetchone()[0]
+
+    constraints, indexes, triggers = {}, [], []
+    for table in tables:
+        cursor.execute(CONSTRAINTS_QUERY, (table,))
+        constraints[table] = cursor.fetchall()
+        cursor.execute(INDEXES_QUERY, (table,))
+        indexes += [_retarget(row[0], schema, table) for row in cursor.fetchall()]
+        cursor.execute(TRIGGERS_QUERY, (table,))
+        triggers += [_retarget(row[0], schema, table) for row in cursor.fetchall()]
+
+    for table in tables:
+        cursor.execute(f"ALTER TABLE {STAGING_SCHEMA}.{table} SET LOGGED")
+
+    # Constraint definitions name referenced tables unqualified, so resolve
+    # them to the staging copies where there are any; keys before the
+    # foreign keys that need them
+    cursor.execute(f"SET LOCAL search_path TO {STAGING_SCHEMA}, {schema}")
+    for foreign_keys in (False, True):
+        for table in tables:
+            for name, kind, definition in constraints[table]:
+                if (kind == 'f') == foreign_keys:
+                    cursor.execute(f'ALTER TABLE {STAGING_SCHEMA}.{table} ADD CONSTRAINT "{name}" {definition}')
+    cursor.execute(f"SET LOCAL search_path TO {schema}")
+
+    for definition in indexes + triggers:
+        cursor.execute(definition)
+    for table in tables:
+        cursor.execute(f"ANALYZE {STAGING_SCHEMA}.{table}")
+
+
+def swap_in(cursor, tables: List[str]):
+    """
+    Replace the live tables with their staging copies and drop the old ones.
+
+    Run in its own short transaction: it waits at most SWAP_LOCK_TIMEOUT for
+    readers, and renaming tables fires no triggers, so the catalogue version
+    is bumped here.
+    """
+    cursor.execute("SELECT current_schema()")
+    schema = cursor.fetchone()[0]
+
+    cursor.execute("SET LOCAL lock_timeout = %s", (SWAP_LOCK_TIMEOUT,))
+    cursor.execute(f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute(f"DROP SCHEMA IF EXISTS {RETIRED_SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {RETIRED_SCHEMA}")
+    for table in tables:
+        cursor.execute(f"ALTER TABLE {schema}.{table} SET SCHEMA {RETIRED_SCHEMA}")
+    for table in tables:
+        cursor.execute(f"ALTER TABLE {STAGING_SCHEMA}.{table} SET SCHEMA {schema}")
+    cursor.execute(f"DROP SCHEMA {RETIRED_SCHEMA} CASCADE")
+    cursor.execute(f"DROP SCHEMA {STAGING_SCHEMA}")
+
+    cursor.execute("SELECT to_regclass('catalogue_version')")
+    if cursor.fetchone()[0]:
+        cursor.execute("UPDATE catalogue_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP")
+
+
+def drop_staging_tables(cursor):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
@@ -0,0 +1,136 @@
+"""
+Geospatial index over course teaching locations
+Buckets distinct campus coordinates into a latitude/longitude grid so radius
+and nearest-campus queries only measure the locations in nearby cells
+"""
+
+import math
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence
+import numpy as np
+from course_fields import location_points
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(latitude: float, longitude: float,
+                 latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points"""
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def course_coordinates(course: Dict[str, Any]) -> List[tuple]:
+    """(latitude, longitude) of each of a course's teaching locations that has coordinates"""
+    return [
+        (location['latitude'], location['longitude'])
+        for location in course.get('locations', [])
+        if location.get('latitude') is not None and location.get('longitude') is not None
+    ]
+
+
+class GeoIndex:
+    """
+    Uniform grid over distinct teaching location coordinates.
+
+    Many courses share a campus, so each distinct coordinate pair is indexed
+    once with the list of courses taught there. Locations are stored sorted by
+    grid cell so each cell is one contiguous slice; a radius query visits only
+    the cells overlapping the query's bounding box and measures exact
+    distances for the locations in them.
+    """
+
+    def __init__(self, courses: Sequence[Dict[str, Any]], cell_degrees: float = 0.25):
+        owners, coordinates = location_points(courses)
+
+        self.size = len(courses)
+        self.cell_degrees = cell_degrees
+
+        unique, point_of = np.unique(coordinates, axis=0, return_inverse=True)
+        point_of = point_of.reshape(-1)
+
+        cell_rows = np.floor(unique[:, 0] / cell_degrees).astype(np.int64)
+        cell_cols = np.floor(unique[:, 1] / cell_degrees).astype(np.int64)
+        order = np.lexsort((cell_cols, cell_rows))
+        self.latitudes = unique[order, 0]
+        self.longitudes = unique[order, 1]
+        cell_rows, cell_cols = cell_rows[order], cell_cols[order]
+
+        # Courses at each location: point_courses[point_offsets[p]:point_offsets[p + 1]]
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        point_of = rank[point_of]
+        by_point = np.argsort(point_of, kind='stable')
+        self.point_courses = np.array(owners, dtype=np.int64)[by_point]
+        self.point_offsets = np.r_[0, np.cumsum(np.bincount(point_of, minlength=len(order)))].astype(np.int64)
+
+        # (row, col) -> (start, stop) slice of the sorted location arrays
+        self.cells = {}
+        starts = np.flatnonzero(np.r_[len(order) > 0, (cell_rows[1:] != cell_rows[:-1]) | (cell_cols[1:] != cell_cols[:-1])])
+        stops = np.r_[starts[1:], len(order)]
+        for start, stop in zip(starts, stops):
+            self.cells[(int(cell_rows[start]), int(cell_cols[start]))] = (start, stop)
+
+        # Cells per grid row, so a query can skip straight to the columns in range
+        self._row_cols = defaultdict(list)
+        for row, col in self.cells:
+            self._row_cols[row].append(col)
+
+    @property
+    def points(self) -> int:
+        return len(self.latitudes)
+
+    def points_within(self, latitude: float, longitude: float, radius_km: float):
+        """Location indices and distances of the locations within radius_km of a point"""
+        lat_span = radius_km / KM_PER_DEGREE
+        max_lat = min(abs(latitude) + lat_span, 89.9)
+        lon_span = min(radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_lat))), 180.0)
+
+        row_lo = math.floor((latitude - lat_span) / self.cell_degrees)
+        row_hi = math.floor((latitude + lat_span) / self.cell_degrees)
+        col_lo = math.floor((longitude - lon_span) / self.cell_degrees)
+        col_hi = math.floor((longitude + lon_span) / self.cell_degrees)
+
+        slices = []
+        for row in range(row_lo, row_hi + 1):
+            for col in self._row_cols.get(row, ()):
+                if col_lo <= col <= col_hi:
+                    slices.append(self.cells[(row, col)])
+
+        if not slices:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        points = np.concatenate([np.arange(start, stop) for start, stop in slices])
+        distances = haversine_km(latitude, longitude, self.latitudes[points], self.longitudes[points])
+        within = distances <= radius_km
+        return points[within], distances[within]
+
+    def _expand(self, points: np.ndarray, distances: np.ndarray):
+        """Course positions taught at the given locations, with each location's distance"""
+        counts = self.point_offsets[points + 1] - self.point_offsets[points]
+        first = np.repeat(self.point_offsets[points] - (np.cumsum(counts) - counts), counts)
+        return self.point_courses[first + np.arange(counts.sum())], np.repeat(distances, counts)
+
+    def courses_within(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Sorted positions of courses with at least one location within radius_km"""
+        courses, _ = self._expand(*self.points_within(latitude, longitude, radius_km))
+        return np.unique(courses)
+
+    def nearest_distances(self, latitude: float, longitude: float, radius_km: float,
+                          rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Distance in km to each course's nearest location, inf beyond radius_km.
+
+        Returns one value per course, or per course position in `rows`.
+        """
+        courses, distances = self._expand(*self.points_within(latitude, longitude, radius_km))
+        nearest = np.full(self.size, np.inf)
+        np.minimum.at(nearest, courses, distances)
+        return nearest if rows is None else nearest[rows]
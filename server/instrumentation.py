@@ -0,0 +1,127 @@
+"""
+Request pipeline instrumentation
+Optional timing spans around each stage of a recommendation request, with
+per-stage counters and latency histograms. Disabled instrumentation hands out
+a shared no-op span, so instrumented code costs one attribute check per span.
+"""
+
+import time
+import bisect
+import threading
+from contextlib import nullcontext
+from typing import Dict, Any, Optional
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is unbounded
+HISTOGRAM_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+_NULL_SPAN = nullcontext()
+
+
+class StageStats:
+    """Count, total, maximum and histogram of one stage's durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f'le{bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'totalMs': round(self.total_seconds * 1000, 3),
+            'meanMs': round(self.total_seconds * 1000 / self.count, 4) if self.count else 0.0,
+            'maxMs': round(self.max_seconds * 1000, 3),
+            'histogram': dict(zip(labels, self.buckets))
+        }
+
+
+class _Span:
+    """Times one stage and records it on exit"""
+    __slots__ = ('instrumentation', 'stage', 'started')
+
+    def __init__(self, instrumentation: 'Instrumentation', stage: str):
+        self.instrumentation = instrumentation
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class Instrumentation:
+    """
+    Aggregates stage timings across requests, and per request when traced.
+
+    `span(stage)` times a block; `record(stage, seconds)` adds a duration
+    measured elsewhere (e.g. summed over a per-course loop). Between
+    `start_trace()` and `finish_trace()` the calling thread also collects its
+    own stage totals, for the per-request debug breakdown.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, stage: str):
+        """Context manager timing `stage`; a shared no-op when disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        """Add one duration for a stage"""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.add(seconds)
+
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace[stage] = trace.get(stage, 0.0) + seconds
+
+    def start_trace(self):
+        """Start collecting this thread's stage timings"""
+        if self.enabled:
+            self._local.trace = {}
+
+    def finish_trace(self) -> Optional[Dict[str, float]]:
+        """This thread's stage totals in milliseconds since start_trace(), or None if not tracing"""
+        trace = getattr(self._local, 'trace', None)
+        self._local.trace = None
+        if trace is None:
+            return None
+        return {stage: round(seconds * 1000, 3) for stage, seconds in trace.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregate per-stage counters and histograms"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'histogramBoundsMs': HISTOGRAM_BOUNDS_MS,
+                'stages': {stage: stats.to_dict() for stage, stats in self._stages.items()}
+            }
+
+    def reset(self):
+        """Drop all aggregated timings"""
+        with self._lock:
+            self._stages = {}
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings (ms) as a Server-Timing header value"""
+    return ', '.join(f'{stage};dur={ms}' for stage, ms in timings.items())
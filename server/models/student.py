@@ -19,6 +19,7 @@ class Student:
     aLevelSubjects: List[str] = None
     predictedGrades: Dict[str, str] = None
     preferences: Dict[str, any] = None
+    role: str = "student"  # 'admin' unlocks the admin and cohort routes
     createdAt: datetime = None
     lastLogin: Optional[datetime] = None
     
@@ -43,6 +44,7 @@ class Student:
             'aLevelSubjects': self.aLevelSubjects,
             'predictedGrades': self.predictedGrades,
             'preferences': self.preferences,
+            'role': self.role,
             'createdAt': self.createdAt,
             'lastLogin': self.lastLogin
         }
@@ -60,6 +62,7 @@ class Student:
             aLevelSubjects=data.get('aLevelSubjects', []),
             predictedGrades=data.get('predictedGrades', {}),
             preferences=data.get('preferences', {}),
+            role=data.get('role', 'student'),
             createdAt=data.get('createdAt', datetime.now()),
             lastLogin=data.get('lastLogin')
         )
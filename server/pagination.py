@@ -0,0 +1,128 @@
+"""
+Cursor-based pagination of ranked recommendations
+Keeps the full ranked order of a request as compact position/score arrays
+under an opaque cursor, so deeper pages are slices rather than re-runs
+"""
+
+import base64
+import secrets
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from result_cache import ResultCache
+
+
+@dataclass
+class RankedOrder:
+    """
+    Every positively scored course for one request, best first.
+
+    `courses` is the catalogue snapshot list the positions refer to, so pages
+    stay consistent even if the catalogue reloads while a client is paging.
+    """
+    courses: List[Dict[str, Any]]
+    positions: np.ndarray  # int32 catalogue positions
+    scores: np.ndarray  # float64 match scores, same order
+    a_level_subjects: List[str]
+    predicted_grades: Dict[str, str]
+    preferences: Dict[str, Any]
+    owner: Optional[str] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.positions)
+
+    @property
+    def nbytes(self) -> int:
+        return self.positions.nbytes + self.scores.nbytes
+
+    def page(self, offset: int, size: int) -> List[Tuple[Dict[str, Any], float]]:
+        """Ranked (course, score) pairs for one page"""
+        return [
+            (self.courses[position], float(score))
+            for position, score in zip(self.positions[offset:offset + size], self.scores[offset:offset + size])
+        ]
+
+
+def parse_page_size(value: Any, max_size: int, name: str = 'pageSize') -> int:
+    """
+    Validate a requested page size (or result limit, reported as `name`).
+
+    Raises:
+        ValueError: Unless the value is an integer from 1 to max_size; a zero
+            page would never advance its cursor
+    """
+    if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f'{name} must be an integer')
+    if not 1 <= value <= max_size:
+        raise ValueError(f'{name} must be between 1 and {max_size}')
+    return value
+
+
+def encode_cursor(token: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{token}:{offset}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into its order token and offset; raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        token, offset = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii').rsplit(':', 1)
+        return token, int(offset)
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError('Malformed cursor') from e
+
+
+class RecommendationPager:
+    """
+    Serves recommendation pages from stored ranked orders.
+
+    The first page ranks every course once; the returned cursor points at the
+    next page of the stored order, which expires after `ttl_seconds` or when
+    evicted to stay under `max_bytes`.
+    """
+
+    def __init__(self, engine, ttl_seconds: float = 900.0,
+                 max_orders: int = 1024, max_bytes: int = 128 * 1024 * 1024):
+        self.engine = engine
+        self.orders = ResultCache(
+            max_entries=max_orders,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            size_of=lambda order: order.nbytes
+        )
+
+    def first_page(self, a_level_subjects: List[str],
+                   predicted_grades: Dict[str, str],
+                   preferences: Dict[str, Any],
+                   criteria: Dict[str, Any],
+                   page_size: int,
+                   owner: Optional[str] = None,
+                   weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Rank all courses, store the order and return its first page"""
+        order = self.engine.rank_all(a_level_subjects, predicted_grades, preferences, criteria, weights)
+        order.owner = owner
+
+        token = secrets.token_urlsafe(16)
+        if order.total > page_size:
+            self.orders.put(token, order)
+        return self._page(token, order, 0, page_size)
+
+    def next_page(self, cursor: str, page_size: int, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The page a cursor points at, or None if the cursor is unknown, expired or not the caller's"""
+        token, offset = decode_cursor(cursor)
+        order = self.orders.get(token)
+        if order is None or order.owner != owner or offset < 0:
+            return None
+        return self._page(token, order, offset, page_size)
+
+    def _page(self, token: str, order: RankedOrder, offset: int, page_size: int) -> Dict[str, Any]:
+        end = offset + page_size
+        return {
+            'recommendations': self.engine.get_ranked_page(order, offset, page_size),
+            'total': order.total,
+            'offset': offset,
+            'nextCursor': encode_cursor(token, end) if end < order.total else None
+        }
@@ -0,0 +1,30 @@
+"""
+Match reason codes and their text
+Results carry compact reason codes ([code, *args]); the text is only rendered
+when a user asks why a course matched
+"""
+
+from typing import List
+
+# Reason code -> message template, filled with the code's arguments in order
+REASON_TEMPLATES = {
+    'SUBJECTS': "Matches your A-level subjects: {0}",
+    'GRADE': "Your predicted {0} grade ({1}) meets requirements ({2})",
+    'REGION': "Located in your preferred region: {0}",
+    'NEAR_CAMPUS': "Nearest campus is {0} km from your chosen location",
+    'TOP_RANKED': "Top-ranked university (#{0})",
+    'EMPLOYMENT': "High graduate employment rate ({0}%)",
+    'TARIFF': "Your predicted grades ({0} UCAS points) match or beat {1} of recent entrants",
+    'CONTINUATION': "Most students continue their studies ({0}%)"
+}
+
+
+def render_reason(code: List[str]) -> str:
+    """Text for one reason code; unknown codes render as an empty string"""
+    template = REASON_TEMPLATES.get(code[0]) if code else None
+    return template.format(*code[1:]) if template else ''
+
+
+def render_reasons(codes: List[List[str]]) -> List[str]:
+    """Text for a course's reason codes, skipping any that are unknown"""
+    return [text for text in (render_reason(code) for code in codes) if text]
@@ -4,9 +4,46 @@ Implements weighted criteria scoring and matching algorithms
 """
 
 import math
-from typing import List, Dict, Any
+import json
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import heapq
+import numpy as np
 from models.course import Course
 from models.student import Student
+from course_matrix import CourseMatrix, kth_highest_score, top_k_indices
+from course_fields import field_values
+from catalogue import CatalogueSnapshot, CourseCatalogue, StaticCatalogueSource
+from result_cache import ResultCache, recommendation_cache_key
+from student_scores import STUDENT_CRITERIA, StudentScores, StudentScoreStore
+from sharded_scorer import ShardedScorer
+from geo_index import course_coordinates, haversine_km
+from tariff import share_at_or_below, ucas_points
+from pagination import RankedOrder
+from reasons import render_reasons
+from similarity import SimilarityIndex
+from instrumentation import Instrumentation
+
+SCORING_MODES = ('scalar', 'vectorized')
+DEFAULT_LIMIT = 50
+
+# Students scored together per students x courses block in batch mode
+BATCH_BLOCK_SIZE = 32
+
+# Served when no catalogue is configured
+SAMPLE_COURSES = [
+    {
+        'id': 'SAMPLE_CS_CAMBRIDGE',
+        'name': 'Computer Science',
+        'university': {'name': 'University of Cambridge', 'ranking': {'overall': 1}},
+        'entryRequirements': {
+            'subjects': ['Mathematics', 'Physics'],
+            'grades': {'Mathematics': 'A*', 'Physics': 'A'}
+        },
+        'fees': {'uk': 9250},
+        'employability': {'employmentRate': 95, 'averageSalary': 45000}
+    },
+]
 
 class RecommendationEngine:
     """
@@ -14,14 +51,62 @@ class RecommendationEngine:
     based on multiple weighted criteria including academic fit, preferences, and compatibility
     """
     
-    def __init__(self):
+    def __init__(self, scoring_mode: str = 'scalar',
+                 catalogue: Optional[CourseCatalogue] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 score_store: Optional[StudentScoreStore] = None,
+                 workers: int = 0,
+                 similarity_index: bool = False,
+                 instrumentation: Optional[Instrumentation] = None):
+        if scoring_mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode '{scoring_mode}', expected one of {SCORING_MODES}")
+        if workers > 0 and scoring_mode != 'vectorized':
+            raise ValueError("Sharded scoring requires the 'vectorized' scoring mode")
+        
+        # 'scalar' scores one course dict at a time, 'vectorized' scores the
+        # compiled CourseMatrix in a few array passes with identical results
+        self.scoring_mode = scoring_mode
+        
+        # Courses come from a versioned in-memory catalogue; compiled matrices
+        # are memoized on each snapshot and built before a reload is published
+        self.catalogue = catalogue or CourseCatalogue(StaticCatalogueSource(SAMPLE_COURSES))
+        if scoring_mode == 'vectorized':
+            self.catalogue.add_prepare_hook(self._compile_snapshot)
+        else:
+            self.catalogue.add_prepare_hook(self._precompute_static_scores)
+        
+        # With workers > 0 the catalogue is split into that many shards, each
+        # scored by its own persistent process; 0 scores in-process
+        self.workers = workers
+        self._sharded_scorer: Optional[ShardedScorer] = None
+        if workers > 0:
+            self.catalogue.add_prepare_hook(self._start_shards)
+        
+        # "Similar courses" index, built with each snapshot when enabled and
+        # on first use otherwise
+        if similarity_index:
+            self.catalogue.add_prepare_hook(self._build_similarity_index)
+        
+        # Stage timings (catalogue fetch, each criterion, sorting, reasons);
+        # disabled by default, when every span is a shared no-op
+        self.instrumentation = instrumentation or Instrumentation()
+        
+        # Optional cache of finished results; the catalogue version is part of
+        # every key so a reload never serves stale rankings
+        self.result_cache = result_cache
+        
+        # Per-student criterion scores from the last vectorized run, so a
+        # profile edit only rescores the courses it can affect
+        self.score_store = score_store if score_store is not None else StudentScoreStore()
+        
         # Weight configuration for different criteria
         self.weights = {
             'subject_match': 0.30,      # A-level subject alignment
             'grade_match': 0.25,        # Predicted grades vs requirements
             'preference_match': 0.20,   # Student preferences (location, budget, etc.)
             'university_ranking': 0.15,  # University prestige/ranking
-            'employability': 0.10       # Graduate employment prospects
+            'employability': 0.10,      # Graduate employment prospects
+            'admission_likelihood': 0.0  # Share of past entrants at or below the student's tariff (opt-in)
         }
         
         # Grade conversion mapping
@@ -44,7 +129,10 @@ class RecommendationEngine:
     def get_recommendations(self, a_level_subjects: List[str], 
                           predicted_grades: Dict[str, str],
                           preferences: Dict[str, Any],
-                          criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+                          criteria: Dict[str, Any],
+                          limit: int = DEFAULT_LIMIT,
+                          student_key: Optional[str] = None,
+                          weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
         """
         Generate personalized course recommendations based on student profile
         
@@ -53,45 +141,695 @@ class RecommendationEngine:
             predicted_grades: Dictionary of subject -> predicted grade
             preferences: Student preferences (location, budget, etc.)
             criteria: Additional search criteria
+            limit: Maximum number of recommendations to return
+            student_key: Stable student ID; enables incremental re-ranking
+                when the same student's profile changes between calls
+                (in-process vectorized scoring only, not with workers)
+            weights: Per-request criterion weights overriding the defaults
+                (see resolve_weights)
             
         Returns:
             List of recommended courses with match scores
         """
+        weights = self.resolve_weights(weights)
+        cache_key = self._cache_key(a_level_subjects, predicted_grades, preferences, criteria, limit, weights)
+        if cache_key is not None:
+            with self.instrumentation.span('cache_lookup'):
+                cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        
+        # Shards take precedence over incremental re-ranking: the stored
+        # component vectors span the whole catalogue and live in this process
+        if self.workers > 0:
+            ranked = self._rank_courses_sharded(
+                a_level_subjects, predicted_grades, preferences, criteria, limit, weights
+            )
+        elif self.scoring_mode == 'vectorized' and student_key is not None:
+            ranked = self._rank_courses_incremental(
+                student_key, a_level_subjects, predicted_grades, preferences, criteria, limit, weights
+            )
+        elif self.scoring_mode == 'vectorized':
+            ranked = self._rank_courses_vectorized(
+                a_level_subjects, predicted_grades, preferences, criteria, limit, weights
+            )
+        else:
+            ranked = self._rank_courses_scalar(
+                a_level_subjects, predicted_grades, preferences, criteria, limit, weights
+            )
+        
+        with self.instrumentation.span('reasons'):
+            results = self._build_results(ranked, a_level_subjects, predicted_grades, preferences)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, results)
+        return list(results)
+    
+    def resolve_weights(self, weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Merge per-request weights over the defaults, validated
+        
+        Weights must be known criteria with finite, non-negative values (the
+        candidate pruning bound relies on that) and must not all be zero.
+        Criteria left out keep their default weight.
+        
+        Raises:
+            ValueError: If a weight is unknown, non-numeric or negative
+        """
+        if weights is None:
+            return self.weights
+        
+        unknown = set(weights) - set(self.weights)
+        if unknown:
+            raise ValueError(f"Unknown weight criteria: {', '.join(sorted(unknown))}")
+        for criterion, weight in weights.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) \
+                    or not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Weight for '{criterion}' must be a non-negative number")
+        
+        # Keep the default key order: totals are accumulated in this order
+        resolved = {criterion: float(weights.get(criterion, default)) for criterion, default in self.weights.items()}
+        if sum(resolved.values()) <= 0:
+            raise ValueError("At least one weight must be positive")
+        return resolved
+    
+    def validate_preferences(self, preferences: Dict[str, Any]):
+        """
+        Check preference values the scoring criteria divide by or measure from
+        
+        Raises:
+            ValueError: If preferences or nearLocation is not an object,
+                nearLocation lacks numeric coordinates or its radius is not
+                a positive number
+        """
+        if not isinstance(preferences, dict):
+            raise ValueError("preferences must be an object")
+        if 'nearLocation' not in preferences:
+            return
+        near = preferences['nearLocation']
+        if not isinstance(near, dict):
+            raise ValueError("nearLocation must be an object")
+        for field in ('latitude', 'longitude', 'radiusKm'):
+            value = near.get(field, 50 if field == 'radiusKm' else None)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError(f"nearLocation.{field} must be a number")
+        if near.get('radiusKm', 50) <= 0:
+            raise ValueError("nearLocation.radiusKm must be positive")
+    
+    def get_batch_recommendations(self, profiles: List[Dict[str, Any]],
+                                  criteria: Dict[str, Any],
+                                  limit: int = DEFAULT_LIMIT,
+                                  weights: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Generate recommendations for a whole cohort in one call
+        
+        Args:
+            profiles: Student profiles with aLevelSubjects, predictedGrades and preferences
+            criteria: Additional search criteria shared by the cohort
+            limit: Maximum number of recommendations per student
+            weights: Per-request criterion weights shared by the cohort
+                (see resolve_weights)
+            
+        Returns:
+            One list of recommended courses per profile, in the same order
+        """
+        weights = self.resolve_weights(weights)
+        results = [None] * len(profiles)
+        cache_keys = [
+            self._cache_key(
+                profile.get('aLevelSubjects', []),
+                profile.get('predictedGrades', {}),
+                profile.get('preferences', {}),
+                criteria,
+                limit,
+                weights
+            )
+            for profile in profiles
+        ]
+        
+        # Serve cached students directly and score only the rest
+        misses = []
+        for s, cache_key in enumerate(cache_keys):
+            cached = self.result_cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[s] = list(cached)
+            else:
+                misses.append(s)
+        
+        scored = self._score_batch([profiles[s] for s in misses], criteria, limit, weights)
+        for s, student_results in zip(misses, scored):
+            if cache_keys[s] is not None:
+                self.result_cache.put(cache_keys[s], student_results)
+            results[s] = list(student_results)
+        
+        return results
+    
+    def rank_all(self, a_level_subjects: List[str],
+                 predicted_grades: Dict[str, str],
+                 preferences: Dict[str, Any],
+                 criteria: Dict[str, Any],
+                 weights: Optional[Dict[str, float]] = None) -> RankedOrder:
+        """
+        Rank every positively scored course, in the same order get_recommendations uses
+        
+        Returns:
+            Compact ranked order (positions + scores) that pages can be sliced from
+        """
+        weights = self.resolve_weights(weights)
+        if self.scoring_mode == 'vectorized':
+            matrix = self._get_course_matrix()
+            courses = matrix.courses
+            scores = self._calculate_match_scores(
+                matrix, a_level_subjects, predicted_grades, preferences, weights=weights
+            )
+            positions = top_k_indices(scores, matrix.size)
+        else:
+            courses = self._get_all_courses()
+            scores = np.array([
+                self._calculate_match_score(
+                    course, a_level_subjects, predicted_grades, preferences, criteria, course_static_scores, weights
+                )
+                for course, course_static_scores in zip(courses, self._get_static_scores())
+            ], dtype=np.float64)
+            positions = np.flatnonzero(scores > 0)
+            positions = positions[np.argsort(-scores[positions], kind='stable')]
+        
+        return RankedOrder(
+            courses=courses,
+            positions=positions.astype(np.int32),
+            scores=scores[positions],
+            a_level_subjects=list(a_level_subjects),
+            predicted_grades=dict(predicted_grades),
+            preferences=dict(preferences)
+        )
+    
+    def get_ranked_page(self, order: RankedOrder, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Result entries for one page of a ranked order"""
+        return self._build_results(
+            order.page(offset, limit), order.a_level_subjects, order.predicted_grades, order.preferences
+        )
+    
+    def _score_batch(self, profiles: List[Dict[str, Any]],
+                     criteria: Dict[str, Any],
+                     limit: int,
+                     weights: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """Score a list of profiles together and build their results"""
+        return [
+            self._build_results(
+                ranked,
+                profile.get('aLevelSubjects', []),
+                profile.get('predictedGrades', {}),
+                profile.get('preferences', {})
+            )
+            for profile, ranked in zip(profiles, self._rank_batch(profiles, criteria, limit, weights))
+        ]
+    
+    def _rank_batch(self, profiles: List[Dict[str, Any]],
+                    criteria: Dict[str, Any],
+                    limit: int,
+                    weights: Optional[Dict[str, float]] = None) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Rank a list of profiles together, one students x courses block at a time"""
+        weights = weights or self.weights
+        if self.workers > 0:
+            courses = self.catalogue.current().courses
+            return [
+                [(courses[position], score) for position, score in ranked]
+                for ranked in self._get_sharded_scorer().rank_batch(profiles, criteria, weights, limit)
+            ]
+        
+        if self.scoring_mode != 'vectorized':
+            return [
+                self._rank_courses_scalar(
+                    profile.get('aLevelSubjects', []),
+                    profile.get('predictedGrades', {}),
+                    profile.get('preferences', {}),
+                    criteria,
+                    limit,
+                    weights
+                )
+                for profile in profiles
+            ]
+        
+        matrix = self._get_course_matrix()
+        
+        # Student-independent criteria are scored once for the whole cohort
+        ranking = matrix.ranking_score()
+        employability = matrix.employability_score()
+        
+        ranked = []
+        for start in range(0, len(profiles), BATCH_BLOCK_SIZE):
+            block = profiles[start:start + BATCH_BLOCK_SIZE]
+            subjects = [profile.get('aLevelSubjects', []) for profile in block]
+            grades = [profile.get('predictedGrades', {}) for profile in block]
+            preferences = [profile.get('preferences', {}) for profile in block]
+            
+            # Students x courses score matrices for the block
+            span = self.instrumentation.span
+            scores = {'university_ranking': ranking, 'employability': employability}
+            with span('subject_match'):
+                scores['subject_match'] = matrix.subject_match_batch(subjects)
+            with span('grade_match'):
+                scores['grade_match'] = matrix.grade_match_batch(grades)
+            with span('preference_match'):
+                scores['preference_match'] = self._preference_match_batch(matrix, preferences)
+            if weights['admission_likelihood']:
+                with span('admission_likelihood'):
+                    scores['admission_likelihood'] = matrix.admission_likelihood_batch(grades)
+            else:
+                scores['admission_likelihood'] = np.zeros(scores['subject_match'].shape)
+            scores = self._weighted_total(scores, weights)
+            
+            with span('sort'):
+                for s in range(len(block)):
+                    ranked.append([(matrix.courses[i], float(scores[s, i])) for i in top_k_indices(scores[s], limit)])
+        
+        return ranked
+    
+    def _cache_key(self, a_level_subjects: List[str],
+                   predicted_grades: Dict[str, str],
+                   preferences: Dict[str, Any],
+                   criteria: Dict[str, Any],
+                   limit: int,
+                   weights: Optional[Dict[str, float]] = None) -> Optional[str]:
+        """Result cache key for a request, or None when caching is disabled"""
+        if self.result_cache is None:
+            return None
+        return recommendation_cache_key(
+            a_level_subjects, predicted_grades, preferences, criteria,
+            weights or self.weights, self.catalogue.current().version, limit
+        )
+    
+    def _preference_match_batch(self, matrix: CourseMatrix,
+                                preferences: List[Dict[str, Any]]) -> np.ndarray:
+        """Preference match rows for a block of students, scoring each distinct preference set once"""
+        rows = {}
+        block = np.empty((len(preferences), matrix.size))
+        for s, student_preferences in enumerate(preferences):
+            key = json.dumps(student_preferences, sort_keys=True, default=str)
+            if key not in rows:
+                rows[key] = matrix.preference_match(student_preferences)
+            block[s] = rows[key]
+        return block
+    
+    def _build_results(self, ranked: List[Tuple[Dict[str, Any], float]],
+                       a_level_subjects: List[str],
+                       predicted_grades: Dict[str, str],
+                       preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn ranked (course, score) pairs into result entries"""
+        # Reasons are only built for the courses actually returned, as compact
+        # codes; their text is rendered on demand (see reasons.render_reasons)
+        return [
+            {
+                'course': course,
+                'matchScore': match_score,
+                'reasonCodes': self._get_match_reason_codes(course, a_level_subjects, predicted_grades, preferences)
+            }
+            for course, match_score in ranked
+        ]
+    
+    def _rank_courses_scalar(self, a_level_subjects: List[str],
+                             predicted_grades: Dict[str, str],
+                             preferences: Dict[str, Any],
+                             criteria: Dict[str, Any],
+                             limit: int,
+                             weights: Optional[Dict[str, float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Score courses one at a time and keep the top `limit` (course, score) pairs"""
         # Get all courses from database (in real implementation)
-        courses = self._get_all_courses()
+        with self.instrumentation.span('catalogue_fetch'):
+            courses = self._get_all_courses()
+            static_scores = self._get_static_scores()
+        
+        # Per-criterion time summed over the course loop, only when instrumented
+        timings = dict.fromkeys(self.weights, 0.0) if self.instrumentation.enabled else None
         
         # Calculate match scores for each course
         scored_courses = []
         
-        for course in courses:
+        for course, course_static_scores in zip(courses, static_scores):
             match_score = self._calculate_match_score(
-                course, a_level_subjects, predicted_grades, preferences, criteria
+                course, a_level_subjects, predicted_grades, preferences, criteria,
+                course_static_scores, weights, timings
             )
             
             if match_score > 0:  # Only include courses with some match
-                scored_courses.append({
-                    'course': course,
-                    'matchScore': match_score,
-                    'reasons': self._get_match_reasons(course, a_level_subjects, predicted_grades, preferences)
+                scored_courses.append((course, match_score))
+        
+        if timings is not None:
+            # Criteria served from the precomputed static scores took no time
+            for criterion, seconds in timings.items():
+                if seconds:
+                    self.instrumentation.record(criterion, seconds)
+        
+        # Bounded heap selection, highest first; equivalent to a stable
+        # descending sort followed by slicing but costs O(N log K)
+        with self.instrumentation.span('sort'):
+            return heapq.nlargest(limit, scored_courses, key=lambda x: x[1])
+    
+    def _rank_courses_vectorized(self, a_level_subjects: List[str],
+                                 predicted_grades: Dict[str, str],
+                                 preferences: Dict[str, Any],
+                                 criteria: Dict[str, Any],
+                                 limit: int,
+                                 weights: Optional[Dict[str, float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Columnar equivalent of _rank_courses_scalar using the compiled CourseMatrix"""
+        matrix = self._get_course_matrix()
+        
+        def score(rows: np.ndarray) -> np.ndarray:
+            return self._calculate_match_scores(matrix, a_level_subjects, predicted_grades, preferences, rows, weights)
+        
+        # Score the courses reachable from the student's subjects first, then
+        # only the other courses whose score bound can still make the top-K
+        rows = matrix.subject_index.courses_for_subjects(a_level_subjects)
+        scores = score(rows)
+        unreached = np.ones(matrix.size, dtype=bool)
+        unreached[rows] = False
+        others = np.flatnonzero(unreached)
+        if len(others):
+            bounded_rows, bounded_scores = self._score_within_bound(
+                matrix, others, preferences, scores, limit, weights, score
+            )
+            rows = np.concatenate([rows, bounded_rows])
+            scores = np.concatenate([scores, bounded_scores])
+        
+        with self.instrumentation.span('sort'):
+            return [(matrix.courses[rows[i]], float(scores[i])) for i in top_k_indices(scores, limit, rows)]
+    
+    def _rank_courses_incremental(self, student_key: str,
+                                  a_level_subjects: List[str],
+                                  predicted_grades: Dict[str, str],
+                                  preferences: Dict[str, Any],
+                                  criteria: Dict[str, Any],
+                                  limit: int,
+                                  weights: Optional[Dict[str, float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank from the student's stored component scores, updating only what changed
+        
+        The first call scores the courses the student's subjects reach and,
+        like _rank_courses_vectorized, only the others whose score bound can
+        make the top-K. Later calls with an edited profile rescore just the
+        scored courses that require a changed subject or grade (every scored
+        course for a preference change), score any courses the bound now
+        admits, then redo the weighted total and top-K.
+        """
+        matrix = self._get_course_matrix()
+        
+        with self.instrumentation.span('component_update'):
+            previous = self.score_store.get(student_key)
+            if previous is None:
+                state = StudentScores.empty(matrix, a_level_subjects, predicted_grades, preferences)
+            else:
+                state = previous.update(matrix, a_level_subjects, predicted_grades, preferences)
+            
+            # Newly scored courses are stored together once ranking is done
+            new_rows, new_scores = [], []
+            
+            def score(rows: np.ndarray) -> np.ndarray:
+                scores = state.score_rows(matrix, rows)
+                new_rows.append(rows)
+                new_scores.append(scores)
+                return self._weighted_total(scores, weights)
+            
+            # Only the weighted sum, the bound and top-K depend on the weights,
+            # so re-weighting an unchanged profile reuses every stored vector.
+            # Courses not scored total 0, which top-K and the k-th score skip.
+            scores = np.zeros(len(state.scored))
+            if state.scored.any():
+                scores = np.where(state.scored, self._weighted_total(state.components(matrix), weights), 0.0)
+            
+            # Then the courses the subjects reach, and the others the bound admits
+            reached = matrix.subject_index.courses_for_subjects(a_level_subjects)
+            reached = reached[~state.scored[reached]]
+            scores[reached] = score(reached)
+            unscored = ~state.scored
+            unscored[reached] = False
+            others = np.flatnonzero(unscored)
+            if len(others):
+                bounded_rows, bounded_scores = self._score_within_bound(
+                    matrix, others, preferences, scores, limit, weights, score
+                )
+                scores[bounded_rows] = bounded_scores
+            
+            if new_rows:
+                state = state.extend(np.concatenate(new_rows), {
+                    name: np.concatenate([batch[name] for batch in new_scores]) for name in STUDENT_CRITERIA
                 })
+            self.score_store.put(student_key, state)
         
-        # Sort by match score (highest first)
-        scored_courses.sort(key=lambda x: x['matchScore'], reverse=True)
+        with self.instrumentation.span('sort'):
+            return [(matrix.courses[i], float(scores[i])) for i in top_k_indices(scores, limit)]
+    
+    def _rank_courses_sharded(self, a_level_subjects: List[str],
+                              predicted_grades: Dict[str, str],
+                              preferences: Dict[str, Any],
+                              criteria: Dict[str, Any],
+                              limit: int,
+                              weights: Optional[Dict[str, float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """_rank_courses_vectorized run on every shard in parallel, partial top-K lists merged"""
+        with self.instrumentation.span('catalogue_fetch'):
+            courses = self.catalogue.current().courses
+            scorer = self._get_sharded_scorer()
+        with self.instrumentation.span('shard_scoring'):
+            ranked = scorer.rank(
+                a_level_subjects, predicted_grades, preferences, criteria, weights or self.weights, limit
+            )
+        return [(courses[position], score) for position, score in ranked]
+    
+    def _get_sharded_scorer(self) -> ShardedScorer:
+        """Worker pool for the current catalogue snapshot, started once per version"""
+        snapshot = self.catalogue.current()
+        scorer = snapshot.derived.get((ShardedScorer, id(self)))
+        if scorer is None:
+            scorer = self._start_shards(snapshot)
+        return scorer
+    
+    def _start_shards(self, snapshot: CatalogueSnapshot) -> ShardedScorer:
+        """Start worker processes for a snapshot and retire the previous snapshot's workers"""
+        scorer = ShardedScorer(snapshot.courses, snapshot.version, self.grade_values, self.regions, self.workers)
+        snapshot.derived[(ShardedScorer, id(self))] = scorer
         
-        # Return top recommendations (limit to 50)
-        return scored_courses[:50]
+        previous, self._sharded_scorer = self._sharded_scorer, scorer
+        if previous is not None:
+            # Requests already queued on the old workers still complete
+            previous.close(wait=False)
+        return scorer
+    
+    def close(self):
+        """Stop any scoring worker processes"""
+        if self._sharded_scorer is not None:
+            self._sharded_scorer.close()
+            self._sharded_scorer = None
+    
+    def _get_static_scores(self) -> List[Tuple[float, float]]:
+        """(ranking, employability) score per course of the current snapshot, computed once per version"""
+        snapshot = self.catalogue.current()
+        static_scores = snapshot.derived.get(('static_scores', id(self)))
+        if static_scores is None:
+            static_scores = self._precompute_static_scores(snapshot)
+        return static_scores
+    
+    def _precompute_static_scores(self, snapshot: CatalogueSnapshot) -> List[Tuple[float, float]]:
+        """Score the student-independent criteria for every course in a snapshot"""
+        static_scores = [
+            (self._calculate_ranking_score(course), self._calculate_employability_score(course))
+            for course in snapshot.courses
+        ]
+        snapshot.derived[('static_scores', id(self))] = static_scores
+        return static_scores
+    
+    def find_courses(self, course_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up courses in the current catalogue snapshot by ID (unknown IDs are omitted)"""
+        snapshot = self.catalogue.current()
+        positions = snapshot.derived.get('course_positions')
+        if positions is None:
+            positions = {course_id: i for i, course_id in enumerate(field_values(snapshot.courses, ('id',)))}
+            snapshot.derived['course_positions'] = positions
+        return {
+            course_id: snapshot.courses[positions[course_id]]
+            for course_id in course_ids if course_id in positions
+        }
+    
+    def get_reason_codes(self, course_ids: List[str],
+                         a_level_subjects: List[str],
+                         predicted_grades: Dict[str, str],
+                         preferences: Dict[str, Any]) -> Dict[str, List[List[str]]]:
+        """Reason codes for catalogue courses by ID, for results whose codes were not stored"""
+        return {
+            course_id: self._get_match_reason_codes(course, a_level_subjects, predicted_grades, preferences)
+            for course_id, course in self.find_courses(course_ids).items()
+        }
+    
+    def get_similar_courses(self, course_id: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Courses most similar to the given one, or None if the course is not in the catalogue"""
+        snapshot = self.catalogue.current()
+        index = snapshot.derived.get(SimilarityIndex)
+        if index is None:
+            index = self._build_similarity_index(snapshot)
+        
+        neighbours = index.neighbours(course_id, limit)
+        if neighbours is None:
+            return None
+        return [
+            {'course': snapshot.courses[position], 'similarity': similarity}
+            for position, similarity in neighbours
+        ]
+    
+    def _build_similarity_index(self, snapshot: CatalogueSnapshot) -> SimilarityIndex:
+        """Build the similar-courses index for a snapshot and memoize it"""
+        index = SimilarityIndex(snapshot.courses)
+        snapshot.derived[SimilarityIndex] = index
+        return index
+    
+    def get_catalogue_stats(self) -> Dict[str, Any]:
+        """Size, load time and precompute cost of the current catalogue snapshot"""
+        snapshot = self.catalogue.current()
+        stats = {
+            'version': snapshot.version,
+            'courses': len(snapshot.courses),
+            'loadedAt': snapshot.loaded_at.isoformat(),
+            'loadSeconds': round(snapshot.load_seconds, 4),
+            'prepareSeconds': {hook: round(seconds, 4) for hook, seconds in snapshot.prepare_seconds.items()}
+        }
+        matrix = snapshot.derived.get((CourseMatrix, id(self)))
+        if matrix is not None:
+            stats['compileSeconds'] = {step: round(seconds, 4) for step, seconds in matrix.compile_seconds.items()}
+        return stats
+    
+    def _get_course_matrix(self) -> CourseMatrix:
+        """Columnar form of the current catalogue snapshot, compiled once per version"""
+        with self.instrumentation.span('catalogue_fetch'):
+            snapshot = self.catalogue.current()
+            matrix = snapshot.derived.get((CourseMatrix, id(self)))
+            if matrix is None:
+                matrix = self._compile_snapshot(snapshot)
+            return matrix
+    
+    def _compile_snapshot(self, snapshot: CatalogueSnapshot) -> CourseMatrix:
+        """Compile a catalogue snapshot into a CourseMatrix and memoize it on the snapshot"""
+        matrix = CourseMatrix(snapshot.courses, self.grade_values, self._get_university_region,
+                              version=snapshot.version)
+        snapshot.derived[(CourseMatrix, id(self))] = matrix
+        return matrix
+    
+    def _calculate_match_scores(self, matrix: CourseMatrix,
+                                a_level_subjects: List[str],
+                                predicted_grades: Dict[str, str],
+                                preferences: Dict[str, Any],
+                                rows: Optional[np.ndarray] = None,
+                                weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Calculate weighted match scores for many courses at once
+        
+        Args:
+            rows: Course positions to score (defaults to the whole catalogue)
+        
+        Returns:
+            Array of floats between 0 and 1, one per scored course
+        """
+        span = self.instrumentation.span
+        scores = {}
+        with span('subject_match'):
+            scores['subject_match'] = matrix.subject_match(a_level_subjects, rows)
+        with span('grade_match'):
+            scores['grade_match'] = matrix.grade_match(predicted_grades, rows)
+        with span('preference_match'):
+            scores['preference_match'] = matrix.preference_match(preferences, rows)
+        with span('university_ranking'):
+            scores['university_ranking'] = matrix.ranking_score(rows)
+        with span('employability'):
+            scores['employability'] = matrix.employability_score(rows)
+        if (weights or self.weights)['admission_likelihood']:
+            with span('admission_likelihood'):
+                scores['admission_likelihood'] = matrix.admission_likelihood(predicted_grades, rows)
+        else:
+            scores['admission_likelihood'] = np.zeros(len(scores['subject_match']))
+        return self._weighted_total(scores, weights)
+    
+    def _score_within_bound(self, matrix: CourseMatrix, others: np.ndarray,
+                            preferences: Dict[str, Any],
+                            scores: np.ndarray, limit: int,
+                            weights: Optional[Dict[str, float]],
+                            score: Callable[[np.ndarray], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score the courses among `others` that could still make the top `limit`
+        
+        `scores` are the totals already computed for other courses and
+        `score(rows)` computes more. The courses with the best bounds are
+        scored first so there is a k-th score to compare against even when
+        the student's subjects reach no course; then every course whose
+        bound reaches it is scored too.
+        
+        Returns:
+            The positions scored and their totals
+        """
+        # Bounding the whole catalogue reads contiguous columns, faster than gathering rows
+        bounds = self._score_upper_bound(matrix, None, preferences, weights)[others]
+        seed = top_k_indices(bounds, limit)
+        seed_scores = score(others[seed])
+        
+        threshold = kth_highest_score(np.concatenate([scores, seed_scores]), limit)
+        remaining = bounds >= threshold
+        remaining[seed] = False
+        rest = others[remaining]
+        return np.concatenate([others[seed], rest]), np.concatenate([seed_scores, score(rest)])
+    
+    def _score_upper_bound(self, matrix: CourseMatrix, rows: Optional[np.ndarray],
+                           preferences: Dict[str, Any],
+                           weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Highest score possible for courses none of the student's subjects reach
+        
+        Such a course's subject match is exactly 0, or the neutral 0.5 when it
+        has no subject requirements; its grade match is 0.5 without grade
+        requirements and at most 1 otherwise, and its preference match is at
+        most the full bonus of every preference given.
+        """
+        if rows is None:
+            rows = slice(None)
+        required_count = matrix.required_count[rows]
+        scores = {
+            'subject_match': np.where(required_count == 0, 0.5, 0.0),
+            'grade_match': np.where(matrix.has_grade_requirements[rows], 1.0, 0.5),
+            'preference_match': np.full(len(required_count), matrix.preference_bound(preferences)),
+            'university_ranking': matrix.static_scores['university_ranking'][rows],
+            'employability': matrix.static_scores['employability'][rows],
+            'admission_likelihood': np.ones(len(required_count))
+        }
+        return self._weighted_total(scores, weights)
+    
+    def _weighted_total(self, scores: Dict[str, np.ndarray],
+                        weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Combine per-criterion score arrays into capped weighted totals"""
+        # Accumulate in weight order so totals match the scalar sum() exactly;
+        # works for per-course vectors and students x courses matrices alike
+        total_score = np.zeros(np.shape(scores['subject_match']))
+        for criterion, weight in (weights or self.weights).items():
+            total_score += scores[criterion] * weight
+        
+        return np.minimum(total_score, 1.0)  # Cap at 1.0
     
     def _calculate_match_score(self, course: Dict[str, Any], 
                             a_level_subjects: List[str],
                             predicted_grades: Dict[str, str],
                             preferences: Dict[str, Any],
-                            criteria: Dict[str, Any]) -> float:
+                            criteria: Dict[str, Any],
+                            static_scores: Optional[Tuple[float, float]] = None,
+                            weights: Optional[Dict[str, float]] = None,
+                            timings: Optional[Dict[str, float]] = None) -> float:
         """
         Calculate weighted match score for a course
         
+        Args:
+            static_scores: Precomputed (ranking, employability) scores for the course
+            weights: Criterion weights (defaults to self.weights)
+            timings: When given, each criterion's seconds are added to it
+        
         Returns:
             Float between 0 and 1 representing match quality
         """
+        if timings is not None:
+            return self._calculate_match_score_timed(
+                course, a_level_subjects, predicted_grades, preferences, static_scores, weights, timings
+            )
+        
         scores = {}
         
         # 1. Subject match score
@@ -103,16 +841,64 @@ class RecommendationEngine:
         # 3. Preference match score
         scores['preference_match'] = self._calculate_preference_match(course, preferences)
         
-        # 4. University ranking score
-        scores['university_ranking'] = self._calculate_ranking_score(course)
+        if static_scores is not None:
+            # 4. and 5. depend only on the course and were precomputed for this catalogue version
+            scores['university_ranking'], scores['employability'] = static_scores
+        else:
+            # 4. University ranking score
+            scores['university_ranking'] = self._calculate_ranking_score(course)
+            
+            # 5. Employability score
+            scores['employability'] = self._calculate_employability_score(course)
         
-        # 5. Employability score
-        scores['employability'] = self._calculate_employability_score(course)
+        # 6. Admission likelihood from past entrants' tariff points (skipped
+        # while its weight is zero, the default)
+        weights = weights or self.weights
+        if weights['admission_likelihood']:
+            scores['admission_likelihood'] = self._calculate_admission_likelihood(course, predicted_grades)
+        else:
+            scores['admission_likelihood'] = 0.0
         
         # Calculate weighted total
         total_score = sum(
             scores[criterion] * weight 
-            for criterion, weight in self.weights.items()
+            for criterion, weight in weights.items()
+        )
+        
+        return min(total_score, 1.0)  # Cap at 1.0
+    
+    def _calculate_match_score_timed(self, course: Dict[str, Any],
+                                     a_level_subjects: List[str],
+                                     predicted_grades: Dict[str, str],
+                                     preferences: Dict[str, Any],
+                                     static_scores: Optional[Tuple[float, float]],
+                                     weights: Optional[Dict[str, float]],
+                                     timings: Dict[str, float]) -> float:
+        """_calculate_match_score with each criterion's time added to `timings`"""
+        calculations = [
+            ('subject_match', self._calculate_subject_match, (course, a_level_subjects)),
+            ('grade_match', self._calculate_grade_match, (course, predicted_grades)),
+            ('preference_match', self._calculate_preference_match, (course, preferences)),
+            ('university_ranking', self._calculate_ranking_score, (course,)),
+            ('employability', self._calculate_employability_score, (course,)),
+            ('admission_likelihood', self._calculate_admission_likelihood, (course, predicted_grades))
+        ]
+        
+        weights = weights or self.weights
+        scores = {}
+        if static_scores is not None:
+            scores['university_ranking'], scores['employability'] = static_scores
+        if not weights['admission_likelihood']:
+            scores['admission_likelihood'] = 0.0
+        for criterion, calculate, args in calculations:
+            if criterion not in scores:
+                started = time.perf_counter()
+                scores[criterion] = calculate(*args)
+                timings[criterion] += time.perf_counter() - started
+        
+        total_score = sum(
+            scores[criterion] * weight 
+            for criterion, weight in weights.items()
         )
         
         return min(total_score, 1.0)  # Cap at 1.0
@@ -207,6 +993,14 @@ class RecommendationEngine:
                 score += 0.1
             factors += 1
         
+        # Distance preference: bonus for a campus within the radius, more the closer it is
+        if 'nearLocation' in preferences:
+            radius = preferences['nearLocation'].get('radiusKm', 50)
+            distance = self._get_nearest_campus_km(course, preferences['nearLocation']) if radius > 0 else None
+            if distance is not None and distance <= radius:
+                score += 0.3 * (1 - 0.5 * distance / radius)
+            factors += 1
+        
         return min(max(score / max(factors, 1), 0), 1)
     
     def _calculate_ranking_score(self, course: Dict[str, Any]) -> float:
@@ -252,9 +1046,25 @@ class RecommendationEngine:
         # Combine employment rate and salary
         return (employment_rate / 100) * 0.7 + salary_score * 0.3
     
+    def _calculate_admission_likelihood(self, course: Dict[str, Any],
+                                        predicted_grades: Dict[str, str]) -> float:
+        """Fraction of past entrants whose UCAS tariff was at or below the student's predicted tariff"""
+        distribution = course.get('tariffDistribution')
+        points = ucas_points(predicted_grades)
+        
+        if not distribution or points is None:
+            return 0.5  # Neutral score if no tariff data or no predicted grades
+        
+        share = share_at_or_below(distribution, points)
+        return share if share is not None else 0.5
+    
     def _get_course_region(self, course: Dict[str, Any]) -> str:
         """Determine the region of a course's university"""
-        university_name = course.get('university', {}).get('name', '').lower()
+        return self._get_university_region(course.get('university', {}).get('name', ''))
+    
+    def _get_university_region(self, university_name: str) -> str:
+        """Determine a university's region from the city in its name"""
+        university_name = university_name.lower()
         
         for region, cities in self.regions.items():
             for city in cities:
@@ -263,19 +1073,37 @@ class RecommendationEngine:
         
         return 'Unknown'
     
+    def _get_nearest_campus_km(self, course: Dict[str, Any],
+                               near_location: Dict[str, Any]) -> Optional[float]:
+        """Distance in km from a point to the course's nearest teaching location"""
+        coordinates = course_coordinates(course)
+        if not coordinates:
+            return None
+        latitudes, longitudes = np.array(coordinates, dtype=np.float64).T
+        return float(haversine_km(near_location['latitude'], near_location['longitude'], latitudes, longitudes).min())
+    
     def _get_match_reasons(self, course: Dict[str, Any], 
                           a_level_subjects: List[str],
                           predicted_grades: Dict[str, str],
                           preferences: Dict[str, Any]) -> List[str]:
         """Generate human-readable reasons for the match"""
-        reasons = []
+        return render_reasons(
+            self._get_match_reason_codes(course, a_level_subjects, predicted_grades, preferences)
+        )
+    
+    def _get_match_reason_codes(self, course: Dict[str, Any],
+                                a_level_subjects: List[str],
+                                predicted_grades: Dict[str, str],
+                                preferences: Dict[str, Any]) -> List[List[str]]:
+        """Generate compact reason codes for the match (rendered by reasons.render_reasons)"""
+        codes = []
         
         # Subject match reasons
         required_subjects = course.get('entryRequirements', {}).get('subjects', [])
         matching_subjects = set(a_level_subjects) & set(required_subjects)
         
         if matching_subjects:
-            reasons.append(f"Matches your A-level subjects: {', '.join(matching_subjects)}")
+            codes.append(['SUBJECTS', ', '.join(matching_subjects)])
         
         # Grade match reasons
         required_grades = course.get('entryRequirements', {}).get('grades', {})
@@ -283,40 +1111,42 @@ class RecommendationEngine:
             if subject in predicted_grades:
                 predicted_grade = predicted_grades[subject]
                 if self.grade_values.get(predicted_grade, 0) >= self.grade_values.get(required_grade, 0):
-                    reasons.append(f"Your predicted {subject} grade ({predicted_grade}) meets requirements ({required_grade})")
+                    codes.append(['GRADE', subject, str(predicted_grade), str(required_grade)])
         
         # Preference reasons
         if 'preferredRegion' in preferences:
             course_region = self._get_course_region(course)
             if course_region == preferences['preferredRegion']:
-                reasons.append(f"Located in your preferred region: {course_region}")
+                codes.append(['REGION', course_region])
+        
+        if 'nearLocation' in preferences and preferences['nearLocation'].get('radiusKm', 50) > 0:
+            distance = self._get_nearest_campus_km(course, preferences['nearLocation'])
+            if distance is not None and distance <= preferences['nearLocation'].get('radiusKm', 50):
+                codes.append(['NEAR_CAMPUS', f"{distance:.0f}"])
         
         # University ranking reasons
         ranking = course.get('university', {}).get('ranking', {})
-        if ranking.get('overall', 0) <= 20:
-            reasons.append(f"Top-ranked university (#{ranking['overall']})")
+        if 0 < ranking.get('overall', 0) <= 20:
+            codes.append(['TOP_RANKED', str(ranking['overall'])])
         
         # Employability reasons
         employability = course.get('employability', {})
         if employability.get('employmentRate', 0) >= 90:
-            reasons.append(f"High graduate employment rate ({employability['employmentRate']}%)")
+            codes.append(['EMPLOYMENT', str(employability['employmentRate'])])
         
-        return reasons
+        distribution = course.get('tariffDistribution')
+        points = ucas_points(predicted_grades)
+        if distribution and points is not None:
+            share = share_at_or_below(distribution, points)
+            if share is not None and share >= 0.5:
+                codes.append(['TARIFF', str(points), f"{share:.0%}"])
+        
+        outcomes = course.get('outcomes', {})
+        if outcomes.get('continuationRate', 0) >= 90:
+            codes.append(['CONTINUATION', str(outcomes['continuationRate'])])
+        
+        return codes
     
     def _get_all_courses(self) -> List[Dict[str, Any]]:
-        """Get all courses from database (placeholder for now)"""
-        # In real implementation, this would query the database
-        # For now, return sample data
-        return [
-            {
-                'name': 'Computer Science',
-                'university': {'name': 'University of Cambridge', 'ranking': {'overall': 1}},
-                'entryRequirements': {
-                    'subjects': ['Mathematics', 'Physics'],
-                    'grades': {'Mathematics': 'A*', 'Physics': 'A'}
-                },
-                'fees': {'uk': 9250},
-                'employability': {'employmentRate': 95, 'averageSalary': 45000}
-            },
-            # Add more sample courses...
-        ]
+        """Get all courses from the published catalogue snapshot"""
+        return self.catalogue.current().courses
@@ -0,0 +1,149 @@
+"""
+Recommendation result cache
+LRU cache with TTL expiry and a memory bound, keyed by a canonical hash of the
+student profile, criteria, weights and catalogue version
+"""
+
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional
+
+
+def recommendation_cache_key(a_level_subjects: List[str],
+                             predicted_grades: Dict[str, str],
+                             preferences: Dict[str, Any],
+                             criteria: Dict[str, Any],
+                             weights: Dict[str, float],
+                             catalogue_version: Any,
+                             limit: int) -> str:
+    """
+    Canonical hash of everything a recommendation result depends on.
+
+    Subject order and duplicates don't affect scoring, so subjects are
+    de-duplicated and sorted; dictionaries are serialized with sorted keys.
+    Including the catalogue version means a reload never serves stale results.
+    """
+    canonical = json.dumps(
+        {
+            'aLevelSubjects': sorted(set(a_level_subjects)),
+            'predictedGrades': predicted_grades,
+            'preferences': preferences,
+            'criteria': criteria,
+            'weights': weights,
+            'catalogueVersion': catalogue_version,
+            'limit': limit
+        },
+        sort_keys=True,
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def estimate_result_size(results: List[Dict[str, Any]]) -> int:
+    """
+    Approximate bytes held by a cached result list.
+
+    Course dicts are shared with the catalogue, so only the result entries and
+    their reason codes are counted.
+    """
+    size = sys.getsizeof(results)
+    for result in results:
+        size += sys.getsizeof(result)
+        codes = result.get('reasonCodes', [])
+        size += sys.getsizeof(codes) + sum(
+            sys.getsizeof(code) + sum(sys.getsizeof(part) for part in code) for code in codes
+        )
+    return size
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and a total size bound.
+
+    Entries are evicted least-recently-used first whenever either the entry
+    count or the estimated byte total exceeds its limit.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 600.0,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 size_of: Callable[[Any], int] = estimate_result_size):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting least-recently-used entries to stay within bounds"""
+        size = self.size_of(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'ttlSeconds': self.ttl_seconds
+            }
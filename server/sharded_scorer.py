@@ -0,0 +1,140 @@
+"""
+Multi-core sharded scoring
+Splits the course catalogue into contiguous shards, each owned by one
+persistent worker process that compiles its shard once at startup. Requests
+are scored on every shard in parallel and the partial top-K lists are merged.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from course_matrix import top_k_indices
+
+# State of the worker process, set once by _init_worker
+_worker_engine = None
+_worker_positions = None
+
+
+def _init_worker(courses: List[Dict[str, Any]], version: Any,
+                 grade_values: Dict[str, int], regions: Dict[str, List[str]]):
+    """Build the worker's in-process engine and compile its shard"""
+    from recommendation_engine import RecommendationEngine
+    from catalogue import CourseCatalogue, StaticCatalogueSource
+
+    global _worker_engine, _worker_positions
+    engine = RecommendationEngine(
+        scoring_mode='vectorized',
+        catalogue=CourseCatalogue(StaticCatalogueSource(courses, version))
+    )
+    engine.grade_values = grade_values
+    engine.regions = regions
+    engine._get_course_matrix()
+
+    _worker_engine = engine
+    _worker_positions = {id(course): i for i, course in enumerate(courses)}
+
+
+def _ranked_positions(ranked: List[Tuple[Dict[str, Any], float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Shard-local positions and scores of ranked (course, score) pairs"""
+    positions = np.array([_worker_positions[id(course)] for course, _ in ranked], dtype=np.int64)
+    scores = np.array([score for _, score in ranked], dtype=np.float64)
+    return positions, scores
+
+
+def _rank_shard(a_level_subjects: List[str], predicted_grades: Dict[str, str],
+                preferences: Dict[str, Any], criteria: Dict[str, Any],
+                weights: Dict[str, float], limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top `limit` courses of this worker's shard for one student"""
+    _worker_engine.weights = weights
+    return _ranked_positions(_worker_engine._rank_courses_vectorized(
+        a_level_subjects, predicted_grades, preferences, criteria, limit
+    ))
+
+
+def _rank_shard_batch(profiles: List[Dict[str, Any]], criteria: Dict[str, Any],
+                      weights: Dict[str, float], limit: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Top `limit` courses of this worker's shard for each student in a cohort"""
+    _worker_engine.weights = weights
+    return [_ranked_positions(ranked) for ranked in _worker_engine._rank_batch(profiles, criteria, limit)]
+
+
+def _ready() -> bool:
+    return _worker_engine is not None
+
+
+class ShardedScorer:
+    """
+    Persistent per-shard worker processes for one catalogue snapshot.
+
+    Each shard gets a single-worker pool, so a shard is compiled in exactly one
+    process and every task for it lands where its data already lives. Shards
+    are contiguous, so shard-local position plus offset is the catalogue
+    position and merged rankings break ties exactly like the in-process path.
+    """
+
+    def __init__(self, courses: List[Dict[str, Any]], version: Any,
+                 grade_values: Dict[str, int], regions: Dict[str, List[str]],
+                 workers: int, start_method: str = 'forkserver'):
+        # Pools may be started from a request or catalogue-reload thread, and
+        # forking a multithreaded process can copy a lock some other thread
+        # holds. The fork server is a fresh single-threaded process, so it
+        # only preloads the scoring modules (not the app's __main__, which
+        # opens connections and threads); each worker gets its shard pickled
+        # through initargs.
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            context.set_forkserver_preload(['recommendation_engine'])
+        bounds = np.linspace(0, len(courses), max(1, min(workers, len(courses))) + 1).astype(np.int64)
+
+        self.version = version
+        self.offsets = bounds[:-1]
+        self.pools = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(courses[start:stop], version, grade_values, regions)
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+        # Start the workers now so shards compile before the snapshot is served
+        for future in [pool.submit(_ready) for pool in self.pools]:
+            future.result()
+
+    @property
+    def workers(self) -> int:
+        return len(self.pools)
+
+    def rank(self, a_level_subjects: List[str], predicted_grades: Dict[str, str],
+             preferences: Dict[str, Any], criteria: Dict[str, Any],
+             weights: Dict[str, float], limit: int) -> List[Tuple[int, float]]:
+        """Catalogue positions and scores of the top `limit` courses, highest first"""
+        futures = [
+            pool.submit(_rank_shard, a_level_subjects, predicted_grades, preferences,
+                        criteria, weights, limit)
+            for pool in self.pools
+        ]
+        return self._merge([future.result() for future in futures], limit)
+
+    def rank_batch(self, profiles: List[Dict[str, Any]], criteria: Dict[str, Any],
+                   weights: Dict[str, float], limit: int) -> List[List[Tuple[int, float]]]:
+        """`rank` for every profile in a cohort, in profile order"""
+        futures = [pool.submit(_rank_shard_batch, profiles, criteria, weights, limit) for pool in self.pools]
+        shard_results = [future.result() for future in futures]
+        return [
+            self._merge([shard[s] for shard in shard_results], limit)
+            for s in range(len(profiles))
+        ]
+
+    def _merge(self, partials: List[Tuple[np.ndarray, np.ndarray]], limit: int) -> List[Tuple[int, float]]:
+        """Merge per-shard top-K lists into the global top-K"""
+        positions = np.concatenate([local + offset for (local, _), offset in zip(partials, self.offsets)])
+        scores = np.concatenate([shard_scores for _, shard_scores in partials])
+        return [(int(positions[i]), float(scores[i])) for i in top_k_indices(scores, limit, positions)]
+
+    def close(self, wait: bool = True):
+        """Shut the worker processes down once their queued tasks finish"""
+        for pool in self.pools:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,162 @@
+"""
+"Similar courses" nearest-neighbour search
+Builds one feature vector per course from Discover Uni data (CAH subject codes,
+KIS aim, entrant tariff distribution, salary quantiles, continuation and NSS
+theme scores) and answers exact cosine top-N queries against the catalogue
+"""
+
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import numpy as np
+from course_fields import field_values, field_matrix
+from course_matrix import top_k_indices
+from tariff import TARIFF_BUCKETS
+
+# Relative influence of each feature block on the similarity score
+SIMILARITY_WEIGHTS = {
+    'subjects': 3.0,
+    'aim': 1.0,
+    'tariff': 1.0,
+    'salary': 1.0,
+    'continuation': 0.5,
+    'satisfaction': 0.5
+}
+
+NSS_THEMES = 7
+
+
+def _cah_prefixes(code: str) -> List[str]:
+    """Expand a CAH code into every level of its hierarchy (CAH02-05-01 -> CAH02, CAH02-05, CAH02-05-01)"""
+    parts = code.split('-')
+    return ['-'.join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """Z-score each column, with missing values (NaN) at the column mean"""
+    present = ~np.isnan(values)
+    count = np.maximum(present.sum(axis=0), 1)
+    mean = np.where(present, values, 0.0).sum(axis=0) / count
+    deviation = np.where(present, values - mean, 0.0)
+    std = np.sqrt((deviation ** 2).sum(axis=0) / count)
+    return deviation / np.where(std > 0, std, 1.0)
+
+
+class SimilarityIndex:
+    """
+    Exact cosine nearest-neighbour index over course feature vectors.
+
+    Numeric features (tariff shares, salary quantiles, continuation, NSS themes)
+    are standardized into a small dense float32 matrix. Categorical features
+    (every level of each CAH code, the KIS aim) would be hundreds of mostly-zero
+    one-hot columns, so they are kept as inverted postings instead: a query
+    only touches the courses sharing one of its codes. Each block is scaled so
+    its expected squared norm is its weight squared, and row norms are
+    precomputed, so a query is one mat-vec plus a few posting scatters.
+    """
+
+    def __init__(self, courses: Sequence[Dict[str, Any]],
+                 weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(SIMILARITY_WEIGHTS, **(weights or {}))
+        self.size = len(courses)
+        self.positions = {course_id: i for i, course_id in enumerate(field_values(courses, ('id',)))}
+
+        self.dense = self._numeric_features(courses)
+        self.postings, self.course_codes = self._categorical_features(courses)
+
+        categorical_norms = np.zeros(self.size)
+        for rows, values in self.postings.values():
+            categorical_norms[rows] += values.astype(np.float64) ** 2
+        self.norms = np.sqrt(np.einsum('ij,ij->i', self.dense, self.dense, dtype=np.float64) + categorical_norms)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dense.nbytes + self.norms.nbytes + sum(
+            rows.nbytes + values.nbytes for rows, values in self.postings.values()
+        )
+
+    def _numeric_features(self, courses: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Standardized, weighted numeric blocks as one dense float32 matrix"""
+        def column(values):
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+        tariff = field_matrix(courses, ('tariffDistribution',), len(TARIFF_BUCKETS))
+        # Summed bucket by bucket, in list order like the built-in sum
+        total = tariff[:, 0].copy()
+        for bucket in range(1, tariff.shape[1]):
+            total += tariff[:, bucket]
+        with np.errstate(invalid='ignore'):
+            tariff = np.where((total > 0)[:, None], tariff / np.where(total > 0, total, 1.0)[:, None], np.nan)
+        satisfaction = field_matrix(courses, ('nssThemes',), NSS_THEMES)
+
+        salary = np.column_stack([
+            column(field_values(courses, ('outcomes', 'salaryLowerQuartile'))),
+            column(field_values(courses, ('employability', 'averageSalary'))),
+            column(field_values(courses, ('outcomes', 'salaryUpperQuartile')))
+        ]) if len(courses) else np.empty((0, 3))
+        continuation = column(field_values(courses, ('outcomes', 'continuationRate'))).reshape(-1, 1)
+
+        blocks = [
+            ('tariff', tariff),
+            ('salary', salary),
+            ('continuation', continuation),
+            ('satisfaction', satisfaction)
+        ]
+        return np.hstack([
+            _standardize(values) * (self.weights[name] / np.sqrt(values.shape[1]))
+            for name, values in blocks
+        ]).astype(np.float32)
+
+    def _categorical_features(self, courses: Sequence[Dict[str, Any]]):
+        """Inverted code -> (rows, values) postings and each course's (code, value) pairs"""
+        by_code = defaultdict(lambda: ([], []))
+        course_codes = []
+
+        cah_lists = field_values(courses, ('cahCodes',), [])
+        aim_codes = field_values(courses, ('kisAimCode',))
+        for i, (cah_codes, aim_code) in enumerate(zip(cah_lists, aim_codes)):
+            pairs = []
+            codes = set()
+            for code in cah_codes:
+                codes.update(_cah_prefixes(code))
+            if codes:
+                # Spread the block's weight so its norm is the weight, however many codes
+                value = self.weights['subjects'] / np.sqrt(len(codes))
+                pairs.extend((f'CAH:{code}', value) for code in sorted(codes))
+            if aim_code:
+                pairs.append((f"AIM:{aim_code}", self.weights['aim']))
+
+            for code, value in pairs:
+                rows, values = by_code[code]
+                rows.append(i)
+                values.append(value)
+            course_codes.append(pairs)
+
+        postings = {
+            code: (np.array(rows, dtype=np.int64), np.array(values, dtype=np.float32))
+            for code, (rows, values) in by_code.items()
+        }
+        return postings, course_codes
+
+    def similarities(self, row: int) -> np.ndarray:
+        """Cosine similarity of one course to every course in the catalogue"""
+        scores = self.dense @ self.dense[row]
+        for code, value in self.course_codes[row]:
+            rows, values = self.postings[code]
+            # Rows are unique within a posting list, so fancy-index += is exact
+            scores[rows] += values * np.float32(value)
+
+        norms = self.norms * self.norms[row]
+        return np.divide(scores, norms, out=np.zeros(self.size), where=norms > 0)
+
+    def neighbours(self, course_id: str, limit: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """
+        Catalogue positions and similarities of the `limit` most similar courses.
+
+        The course itself is excluded; returns None for an unknown course ID.
+        """
+        row = self.positions.get(course_id)
+        if row is None:
+            return None
+        scores = self.similarities(row)
+        scores[row] = 0.0
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, limit)]
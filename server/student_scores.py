@@ -0,0 +1,223 @@
+"""
+Per-student component scores for incremental re-ranking
+Keeps each student's per-criterion score vectors from their last run so a
+profile edit only recomputes the courses the edit can affect
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import List, Dict, Any, Optional
+import numpy as np
+from course_matrix import CourseMatrix
+
+# Criteria that depend on the student; the others are read from the matrix
+STUDENT_CRITERIA = ('subject_match', 'grade_match', 'preference_match', 'admission_likelihood')
+
+
+@dataclass(frozen=True)
+class StudentScores:
+    """
+    Student-dependent criterion scores for the courses of one catalogue version.
+
+    Vectors span the catalogue, but only the courses marked in `scored` have
+    been computed (the others are NaN): ranking scores just the courses that
+    can make the top-K and stores them with `extend`. Instances are never
+    modified in place; `update` and `extend` return a new instance sharing
+    the vectors that did not change, so concurrent readers are safe.
+    """
+    catalogue_version: Any
+    a_level_subjects: List[str]
+    predicted_grades: Dict[str, str]
+    preferences: Dict[str, Any]
+    subject_match: np.ndarray
+    grade_match: np.ndarray
+    preference_match: np.ndarray
+    admission_likelihood: np.ndarray
+    scored: np.ndarray
+    recomputed_rows: int = 0
+
+    @classmethod
+    def empty(cls, matrix: CourseMatrix,
+              a_level_subjects: List[str],
+              predicted_grades: Dict[str, str],
+              preferences: Dict[str, Any]) -> 'StudentScores':
+        """A profile with no course scored yet"""
+        unscored = np.full(matrix.size, np.nan)
+        return cls(
+            catalogue_version=matrix.version,
+            a_level_subjects=list(a_level_subjects),
+            predicted_grades=dict(predicted_grades),
+            preferences=dict(preferences),
+            subject_match=unscored,
+            grade_match=unscored,
+            preference_match=unscored,
+            admission_likelihood=unscored,
+            scored=np.zeros(matrix.size, dtype=bool)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the score vectors and mask, counting shared vectors once"""
+        arrays = {id(array): array for array in (*(getattr(self, name) for name in STUDENT_CRITERIA), self.scored)}
+        return sum(array.nbytes for array in arrays.values())
+
+    def score_rows(self, matrix: CourseMatrix, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every criterion for the given courses, computed for the stored profile"""
+        return {
+            'subject_match': matrix.subject_match(self.a_level_subjects, rows),
+            'grade_match': matrix.grade_match(self.predicted_grades, rows),
+            'preference_match': matrix.preference_match(self.preferences, rows),
+            'university_ranking': matrix.ranking_score(rows),
+            'employability': matrix.employability_score(rows),
+            'admission_likelihood': matrix.admission_likelihood(self.predicted_grades, rows)
+        }
+
+    def extend(self, rows: np.ndarray, scores: Dict[str, np.ndarray]) -> 'StudentScores':
+        """Store `score_rows` results for courses that were not scored yet"""
+        if not len(rows):
+            return self
+
+        vectors = {}
+        for name in STUDENT_CRITERIA:
+            vectors[name] = getattr(self, name).copy()
+            vectors[name][rows] = scores[name]
+        scored = self.scored.copy()
+        scored[rows] = True
+        return replace(self, scored=scored, recomputed_rows=self.recomputed_rows + len(rows), **vectors)
+
+    def update(self, matrix: CourseMatrix,
+               a_level_subjects: List[str],
+               predicted_grades: Dict[str, str],
+               preferences: Dict[str, Any]) -> 'StudentScores':
+        """
+        Apply a profile delta, recomputing only the affected courses.
+
+        A changed subject only affects courses that require it, and a changed
+        predicted grade only affects courses with a grade requirement in that
+        subject. Only scored courses are recomputed, with the same vectorized
+        criteria, so they match a fresh `score_rows`; courses an added subject
+        now reaches are left for the caller to score.
+        """
+        if matrix.version != self.catalogue_version:
+            return self.empty(matrix, a_level_subjects, predicted_grades, preferences)
+
+        subject_match = self.subject_match
+        grade_match = self.grade_match
+        preference_match = self.preference_match
+        admission_likelihood = self.admission_likelihood
+        recomputed_rows = 0
+        scored_rows = np.flatnonzero(self.scored)
+
+        changed_subjects = set(self.a_level_subjects) ^ set(a_level_subjects)
+        if changed_subjects:
+            rows = matrix.subject_index.courses_for_subjects(changed_subjects)
+            rows = rows[self.scored[rows]]
+            if len(rows):
+                subject_match = subject_match.copy()
+                subject_match[rows] = matrix.subject_match(a_level_subjects, rows)
+                recomputed_rows += len(rows)
+
+        changed_grades = [
+            subject for subject in set(self.predicted_grades) | set(predicted_grades)
+            if self.predicted_grades.get(subject) != predicted_grades.get(subject)
+            and subject in matrix.grade_vocab
+        ]
+        if changed_grades:
+            changed = np.zeros(len(self.scored), dtype=bool)
+            for subject in changed_grades:
+                changed[matrix.grade_rows[matrix.grade_vocab[subject]]] = True
+            rows = np.flatnonzero(changed & self.scored)
+            if len(rows):
+                grade_match = grade_match.copy()
+                grade_match[rows] = matrix.grade_match(predicted_grades, rows)
+                recomputed_rows += len(rows)
+
+        # Admission likelihood depends on the student's total tariff, so any
+        # grade edit re-reads one cumulative row for every course
+        if predicted_grades != self.predicted_grades:
+            admission_likelihood = np.where(self.scored, matrix.admission_likelihood(predicted_grades), np.nan)
+
+        if preferences != self.preferences:
+            preference_match = np.full(matrix.size, np.nan)
+            preference_match[scored_rows] = matrix.preference_match(preferences, scored_rows)
+            recomputed_rows += len(scored_rows)
+
+        return replace(
+            self,
+            a_level_subjects=list(a_level_subjects),
+            predicted_grades=dict(predicted_grades),
+            preferences=dict(preferences),
+            subject_match=subject_match,
+            grade_match=grade_match,
+            preference_match=preference_match,
+            admission_likelihood=admission_likelihood,
+            recomputed_rows=recomputed_rows
+        )
+
+    def components(self, matrix: CourseMatrix, rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Every criterion vector (or just the given courses), ready for weighting"""
+        def take(vector: np.ndarray) -> np.ndarray:
+            return vector if rows is None else vector[rows]
+
+        return {
+            'subject_match': take(self.subject_match),
+            'grade_match': take(self.grade_match),
+            'preference_match': take(self.preference_match),
+            'university_ranking': matrix.ranking_score(rows),
+            'employability': matrix.employability_score(rows),
+            'admission_likelihood': take(self.admission_likelihood)
+        }
+
+
+class StudentScoreStore:
+    """
+    Thread-safe LRU store of StudentScores keyed by student ID.
+
+    Each state holds several catalogue-length vectors, so students are evicted
+    least-recently-used first whenever either the student count or the byte
+    total of their vectors exceeds its limit.
+    """
+
+    def __init__(self, max_students: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_students = max_students
+        self.max_bytes = max_bytes
+        self._states = OrderedDict()  # key -> (size, state)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, student_key: str) -> Optional[StudentScores]:
+        with self._lock:
+            entry = self._states.get(student_key)
+            if entry is None:
+                return None
+            self._states.move_to_end(student_key)
+            return entry[1]
+
+    def put(self, student_key: str, state: StudentScores):
+        size = state.nbytes
+        with self._lock:
+            self._pop(student_key)
+            if size > self.max_bytes or self.max_students <= 0:
+                return
+            self._states[student_key] = (size, state)
+            self._bytes += size
+            while len(self._states) > self.max_students or self._bytes > self.max_bytes:
+                _, (evicted_size, _) = self._states.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def discard(self, student_key: str):
+        with self._lock:
+            self._pop(student_key)
+
+    def _pop(self, student_key: str):
+        entry = self._states.pop(student_key, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._states)
@@ -0,0 +1,36 @@
+"""
+Inverted subject index over a course catalogue
+Maps A-level subject names to the courses that require them, so recommendation
+requests can start from the courses a student's subjects reach
+"""
+
+from typing import Dict, Any, Iterable, Sequence
+from collections import defaultdict
+import numpy as np
+from course_fields import field_values
+
+
+class SubjectIndex:
+    """
+    Subject -> course index lookup built once when the catalogue loads.
+
+    Course positions refer to the order of the course list the index was built
+    from, so they can be used directly as rows of the matching CourseMatrix.
+    """
+
+    def __init__(self, courses: Sequence[Dict[str, Any]]):
+        by_subject = defaultdict(list)
+        for i, required_subjects in enumerate(field_values(courses, ('entryRequirements', 'subjects'), [])):
+            for subject in set(required_subjects):
+                by_subject[subject].append(i)
+
+        self.size = len(courses)
+        self.by_subject = {subject: np.array(rows, dtype=np.int64) for subject, rows in by_subject.items()}
+
+    def courses_for_subjects(self, subjects: Iterable[str]) -> np.ndarray:
+        """Sorted positions of courses requiring at least one of the given subjects"""
+        reached = np.zeros(self.size, dtype=bool)
+        for subject in set(subjects):
+            if subject in self.by_subject:
+                reached[self.by_subject[subject]] = True
+        return np.flatnonzero(reached)
@@ -0,0 +1,55 @@
+"""
+UCAS tariff helpers for admission likelihood scoring
+Converts predicted A-level grades to UCAS points and maps points onto the
+Discover Uni TARIFF entrant buckets (T001 ... T240)
+"""
+
+from bisect import bisect_right
+from typing import List, Dict, Optional
+
+# UCAS tariff points per A-level grade
+UCAS_TARIFF_POINTS = {
+    'A*': 56, 'A': 48, 'B': 40, 'C': 32, 'D': 24, 'E': 16, 'U': 0
+}
+
+# TARIFF table columns and the lowest point total each bucket covers
+TARIFF_COLUMNS = [
+    't001', 't048', 't064', 't080', 't096', 't112', 't128',
+    't144', 't160', 't176', 't192', 't208', 't224', 't240'
+]
+TARIFF_BUCKETS = [0, 48, 64, 80, 96, 112, 128, 144, 160, 176, 192, 208, 224, 240]
+
+# Offers are normally made on three A-levels
+COUNTED_GRADES = 3
+
+
+def ucas_points(predicted_grades: Dict[str, str]) -> Optional[int]:
+    """UCAS points of the best three predicted grades, or None without any recognised grade"""
+    points = sorted(
+        (UCAS_TARIFF_POINTS[grade] for grade in predicted_grades.values() if grade in UCAS_TARIFF_POINTS),
+        reverse=True
+    )
+    if not points:
+        return None
+    return sum(points[:COUNTED_GRADES])
+
+
+def tariff_bucket(points: int) -> int:
+    """Index of the TARIFF bucket a point total falls in"""
+    return bisect_right(TARIFF_BUCKETS, points) - 1
+
+
+def share_at_or_below(distribution: List[float], points: int) -> Optional[float]:
+    """
+    Fraction of entrants in the same tariff bucket as `points` or a lower one.
+
+    Returns None when the distribution is empty or all zero.
+    """
+    total = 0.0
+    below = 0.0
+    bucket = tariff_bucket(points)
+    for i, count in enumerate(distribution):
+        total += count
+        if i <= bucket:
+            below += count
+    return below / total if total > 0 else None
@@ -0,0 +1,9 @@
+"""
+Shared test setup
+Puts the server directory on sys.path so tests import modules the way app.py does
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+"""
+Course catalogue tests
+Concurrent first requests must share one catalogue load
+"""
+
+import threading
+import time
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from benchmarks.synthetic import generate_courses
+
+
+class SlowSource(StaticCatalogueSource):
+    """Static source whose load takes long enough for requests to pile up"""
+
+    def __init__(self, courses):
+        super().__init__(courses)
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        time.sleep(0.05)
+        return super().load()
+
+
+def test_concurrent_cold_start_loads_once():
+    source = SlowSource(generate_courses(50, seed=41))
+    catalogue = CourseCatalogue(source)
+    barrier = threading.Barrier(8)
+    snapshots = []
+
+    def request():
+        barrier.wait()
+        snapshots.append(catalogue.current())
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.loads == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+    # An explicit reload still loads again
+    catalogue.reload()
+    assert source.loads == 2
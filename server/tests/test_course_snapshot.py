@@ -0,0 +1,84 @@
+"""
+Course snapshot tests
+A memory-mapped snapshot must serve the same courses, field reads and
+rankings as the course list it was built from
+"""
+
+import numpy as np
+import pytest
+from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from course_snapshot import CONTAINERS, FIELDS, SnapshotCatalogueSource, SnapshotCourses, write_snapshot
+from course_fields import field_values, field_array, field_matrix, has_fields, location_points
+from tariff import TARIFF_BUCKETS
+from similarity import NSS_THEMES
+from benchmarks.synthetic import generate_courses, generate_students
+
+# Courses with missing, empty and None fields next to the synthetic ones
+EDGE_COURSES = [
+    {'id': 'edge-bare'},
+    {'id': 'edge-empty', 'university': {'name': 'University of Leeds', 'ranking': {}},
+     'employability': {}, 'entryRequirements': {'subjects': [], 'grades': {}}, 'locations': []},
+    {'id': 'edge-none', 'university': {'name': 'Bristol University', 'ranking': {'overall': None}},
+     'fees': {'uk': None}, 'employability': {'employmentRate': None}, 'tariffDistribution': None,
+     'locations': [{'id': 'L1', 'name': 'Main', 'latitude': 51.45, 'longitude': -2.6}]}
+]
+
+
+@pytest.fixture(scope='module')
+def courses():
+    return generate_courses(500, seed=31) + EDGE_COURSES
+
+
+@pytest.fixture(scope='module')
+def snapshot(courses, tmp_path_factory):
+    directory = tmp_path_factory.mktemp('snapshot')
+    write_snapshot(directory, 7, courses)
+    return SnapshotCatalogueSource(directory)
+
+
+def test_load_decodes_courses_on_access(courses, snapshot):
+    version, loaded = snapshot.load()
+
+    assert version == 7
+    assert isinstance(loaded, SnapshotCourses)
+    assert len(loaded) == len(courses)
+    assert loaded[3] == courses[3] and loaded[-1] == courses[-1]
+    assert loaded[3] is loaded[3]
+    assert len(loaded._decoded) == 2
+    assert list(loaded) == courses
+    assert loaded[10:20] == courses[10:20]
+
+
+def test_field_reads_match_course_dicts(courses, snapshot):
+    _, loaded = snapshot.load()
+
+    for path, kind in FIELDS:
+        assert field_values(loaded, path, 'missing') == field_values(courses, path, 'missing'), path
+        if kind == 'int':
+            np.testing.assert_array_equal(field_array(loaded, path, -1), field_array(courses, path, -1))
+    for path in CONTAINERS:
+        np.testing.assert_array_equal(has_fields(loaded, path), has_fields(courses, path))
+
+    for path, width in [(('tariffDistribution',), len(TARIFF_BUCKETS)), (('nssThemes',), NSS_THEMES)]:
+        np.testing.assert_array_equal(field_matrix(loaded, path, width), field_matrix(courses, path, width))
+    for loaded_array, expected in zip(location_points(loaded), location_points(courses)):
+        np.testing.assert_array_equal(loaded_array, expected)
+
+
+def test_snapshot_engine_matches_course_list(courses, snapshot):
+    students = generate_students(10, seed=32)
+    from_list = RecommendationEngine(scoring_mode='vectorized',
+                                     catalogue=CourseCatalogue(StaticCatalogueSource(courses)))
+    from_snapshot = RecommendationEngine(scoring_mode='vectorized', catalogue=CourseCatalogue(snapshot))
+
+    for student in students:
+        args = student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {}
+        expected = from_list.get_recommendations(*args, limit=20)
+        assert from_snapshot.get_recommendations(*args, limit=20) == expected
+
+    assert from_snapshot.get_similar_courses(courses[0]['id']) == from_list.get_similar_courses(courses[0]['id'])
+    assert from_snapshot.find_courses(['edge-none', 'unknown']) == {'edge-none': courses[-1]}
+
+    # Only the courses returned were decoded
+    assert len(from_snapshot.catalogue.current().courses._decoded) < len(courses)
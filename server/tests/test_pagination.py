@@ -0,0 +1,48 @@
+"""
+Pagination tests
+Page size validation and cursor encoding
+"""
+
+import pytest
+from pagination import parse_page_size, encode_cursor, decode_cursor
+
+
+@pytest.mark.parametrize('value, expected', [(1, 1), (50, 50), (100, 100), ('25', 25)])
+def test_parse_page_size_accepts_range(value, expected):
+    assert parse_page_size(value, 100) == expected
+
+
+@pytest.mark.parametrize('value', [0, -1, 101, '0', '-3', 2.5, '2.5', True, None, 'ten'])
+def test_parse_page_size_rejects(value):
+    with pytest.raises(ValueError):
+        parse_page_size(value, 100)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('token_-x', 40)) == ('token_-x', 40)
+
+
+def test_malformed_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor('%%%')
+
+
+def test_reason_codes_for_unstored_pages():
+    from recommendation_engine import RecommendationEngine
+    from catalogue import CourseCatalogue, StaticCatalogueSource
+    from pagination import RecommendationPager
+    from benchmarks.synthetic import generate_courses, generate_students
+
+    engine = RecommendationEngine(
+        scoring_mode='vectorized',
+        catalogue=CourseCatalogue(StaticCatalogueSource(generate_courses(300, seed=41)))
+    )
+    student = generate_students(1, seed=42)[0]
+    profile = (student['aLevelSubjects'], student['predictedGrades'], student['preferences'])
+    pager = RecommendationPager(engine)
+
+    first = pager.first_page(*profile, {}, 5, owner='student')
+    second = pager.next_page(first['nextCursor'], 5, owner='student')
+    expected = {result['course']['id']: result['reasonCodes'] for result in second['recommendations']}
+
+    assert engine.get_reason_codes(list(expected) + ['UNKNOWN'], *profile) == expected
@@ -0,0 +1,178 @@
+"""
+Ranking equivalence tests
+Every scoring path must return the same courses, in the same order, with the
+same scores as the scalar reference on synthetic catalogues
+"""
+
+import pytest
+from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from student_scores import StudentScoreStore
+from benchmarks.synthetic import generate_courses, generate_students
+
+LIMITS = [1, 10, 50]
+
+
+@pytest.fixture(scope='module', params=[(300, 11), (2000, 12)], ids=['300', '2000'])
+def courses(request):
+    size, seed = request.param
+    return generate_courses(size, seed=seed)
+
+
+@pytest.fixture(scope='module')
+def students():
+    return generate_students(25, seed=21)
+
+
+def make_engine(courses, scoring_mode, **kwargs):
+    return RecommendationEngine(
+        scoring_mode=scoring_mode,
+        catalogue=CourseCatalogue(StaticCatalogueSource(courses)),
+        **kwargs
+    )
+
+
+def ranking(results):
+    """(course ID, match score) pairs of a result list, in order"""
+    return [(result['course']['id'], result['matchScore']) for result in results]
+
+
+def profile_args(student):
+    return student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {}
+
+
+@pytest.mark.parametrize('limit', LIMITS)
+def test_vectorized_matches_scalar(courses, students, limit):
+    scalar = make_engine(courses, 'scalar')
+    vectorized = make_engine(courses, 'vectorized')
+
+    for student in students:
+        expected = ranking(scalar.get_recommendations(*profile_args(student), limit=limit))
+        assert ranking(vectorized.get_recommendations(*profile_args(student), limit=limit)) == expected
+
+
+def test_batch_matches_single_requests(courses, students):
+    for mode in ('scalar', 'vectorized'):
+        engine = make_engine(courses, mode)
+        batch = engine.get_batch_recommendations(students, {}, limit=10)
+        for student, results in zip(students, batch):
+            assert ranking(results) == ranking(engine.get_recommendations(*profile_args(student), limit=10))
+
+
+def test_batch_applies_request_weights(courses, students):
+    weights = {'subject_match': 0.1, 'university_ranking': 0.6}
+    for mode in ('scalar', 'vectorized'):
+        engine = make_engine(courses, mode)
+        batch = engine.get_batch_recommendations(students, {}, limit=10, weights=weights)
+        for student, results in zip(students, batch):
+            expected = engine.get_recommendations(*profile_args(student), limit=10, weights=weights)
+            assert ranking(results) == ranking(expected)
+        assert batch != engine.get_batch_recommendations(students, {}, limit=10)
+
+
+def test_reason_codes_match(courses, students):
+    scalar = make_engine(courses, 'scalar')
+    vectorized = make_engine(courses, 'vectorized')
+
+    for student in students[:5]:
+        expected = [result['reasonCodes'] for result in scalar.get_recommendations(*profile_args(student))]
+        assert [result['reasonCodes'] for result in vectorized.get_recommendations(*profile_args(student))] == expected
+
+
+def test_incremental_matches_scalar_across_profile_edits(courses, students):
+    scalar = make_engine(courses, 'scalar')
+    vectorized = make_engine(courses, 'vectorized')
+
+    # One student key walks through every profile, so each call after the
+    # first is an incremental update of the previous one
+    for student in students:
+        expected = ranking(scalar.get_recommendations(*profile_args(student), limit=20))
+        incremental = vectorized.get_recommendations(*profile_args(student), limit=20, student_key='student')
+        assert ranking(incremental) == expected
+
+
+def test_sharded_matches_scalar(courses, students):
+    scalar = make_engine(courses, 'scalar')
+    sharded = make_engine(courses, 'vectorized', workers=3)
+    try:
+        for student in students[:10]:
+            expected = ranking(scalar.get_recommendations(*profile_args(student), limit=20))
+            assert ranking(sharded.get_recommendations(*profile_args(student), limit=20)) == expected
+
+        batch = sharded.get_batch_recommendations(students[:10], {}, limit=20)
+        for student, results in zip(students[:10], batch):
+            assert ranking(results) == ranking(scalar.get_recommendations(*profile_args(student), limit=20))
+    finally:
+        sharded.close()
+
+
+def test_student_key_uses_shard_pool(courses, students, monkeypatch):
+    from sharded_scorer import ShardedScorer
+
+    calls = []
+    rank = ShardedScorer.rank
+
+    def counting_rank(self, *args, **kwargs):
+        calls.append(self)
+        return rank(self, *args, **kwargs)
+
+    monkeypatch.setattr(ShardedScorer, 'rank', counting_rank)
+    engine = make_engine(courses, 'vectorized', workers=2)
+    try:
+        engine.get_recommendations(*profile_args(students[0]), limit=10, student_key='student')
+    finally:
+        engine.close()
+
+    assert len(calls) == 1
+    assert len(engine.score_store) == 0
+
+
+@pytest.mark.parametrize('mode', ['scalar', 'vectorized'])
+@pytest.mark.parametrize('page_size', [1, 7, 50])
+def test_pages_concatenate_to_full_ranking(courses, students, mode, page_size):
+    from pagination import RecommendationPager
+
+    scalar = make_engine(courses, 'scalar')
+    pager = RecommendationPager(make_engine(courses, mode))
+
+    for student in students[:5]:
+        page = pager.first_page(*profile_args(student), page_size, owner='student')
+        paged = ranking(page['recommendations'])
+        while page['nextCursor'] is not None:
+            page = pager.next_page(page['nextCursor'], page_size, owner='student')
+            paged += ranking(page['recommendations'])
+
+        assert len(paged) == page['total']
+        assert paged == ranking(scalar.get_recommendations(*profile_args(student), limit=len(courses)))
+
+
+def test_pruning_without_subject_requirements(courses, students):
+    # Discover Uni courses carry no entry requirements: no course is reached
+    # by subjects, so every course is bounded instead
+    bare = [dict(course, entryRequirements={'subjects': [], 'grades': {}}) for course in courses]
+    scalar = make_engine(bare, 'scalar')
+    vectorized = make_engine(bare, 'vectorized')
+
+    for s, student in enumerate(students[:10]):
+        expected = ranking(scalar.get_recommendations(*profile_args(student), limit=10))
+        assert ranking(vectorized.get_recommendations(*profile_args(student), limit=10)) == expected
+        incremental = vectorized.get_recommendations(*profile_args(student), limit=10, student_key=f'student-{s}')
+        assert ranking(incremental) == expected
+
+        # The first incremental pass only scored the courses the bound admitted
+        assert vectorized.score_store.get(f'student-{s}').scored.sum() < len(bare)
+
+
+def test_score_store_stays_within_byte_bound(courses, students):
+    engine = make_engine(courses, 'vectorized')
+    engine.get_recommendations(*profile_args(students[0]), limit=10, student_key='student-0')
+    size = engine.score_store.get('student-0').nbytes
+    engine.score_store = StudentScoreStore(max_bytes=int(size * 2.5))
+
+    for s, student in enumerate(students[:5]):
+        engine.get_recommendations(*profile_args(student), limit=10, student_key=f'student-{s}')
+
+    # Least recently used students are evicted first
+    assert len(engine.score_store) == 2
+    assert engine.score_store.nbytes <= engine.score_store.max_bytes
+    assert engine.score_store.get('student-4') is not None and engine.score_store.get('student-2') is None
@@ -0,0 +1,93 @@
+"""
+Scoring criteria edge cases
+Distance preferences with degenerate radii and the opt-in admission
+likelihood criterion, checked on both scoring modes
+"""
+
+import random
+import pytest
+from recommendation_engine import RecommendationEngine
+from catalogue import CourseCatalogue, StaticCatalogueSource
+from benchmarks.synthetic import generate_courses, generate_students
+
+LONDON = {'latitude': 51.5072, 'longitude': -0.1276}
+
+
+@pytest.fixture(scope='module')
+def courses():
+    courses = generate_courses(500, seed=31)
+    rng = random.Random(32)
+    for course in courses[::3]:
+        course['locations'] = [{
+            'latitude': LONDON['latitude'] + rng.uniform(-1, 1),
+            'longitude': LONDON['longitude'] + rng.uniform(-1, 1)
+        }]
+    # One campus exactly at the search point
+    courses[0]['locations'] = [dict(LONDON)]
+    return courses
+
+
+def make_engine(courses, scoring_mode):
+    return RecommendationEngine(scoring_mode=scoring_mode, catalogue=CourseCatalogue(StaticCatalogueSource(courses)))
+
+
+def ranking(results):
+    return [(result['course']['id'], result['matchScore'], result['reasonCodes']) for result in results]
+
+
+@pytest.mark.parametrize('radius', [0, -5, 25])
+def test_near_location_radius(courses, radius):
+    student = generate_students(1, seed=33)[0]
+    preferences = dict(student['preferences'], nearLocation=dict(LONDON, radiusKm=radius))
+    args = (student['aLevelSubjects'], student['predictedGrades'], preferences, {})
+
+    expected = ranking(make_engine(courses, 'scalar').get_recommendations(*args, limit=30))
+    assert ranking(make_engine(courses, 'vectorized').get_recommendations(*args, limit=30)) == expected
+    if radius <= 0:
+        assert not any(code[0] == 'NEAR_CAMPUS' for _, _, codes in expected for code in codes)
+
+
+@pytest.mark.parametrize('weight', [0.0, 0.2])
+def test_admission_likelihood_weight(courses, weight):
+    weights = {'admission_likelihood': weight}
+    scalar = make_engine(courses, 'scalar')
+    vectorized = make_engine(courses, 'vectorized')
+
+    for student in generate_students(10, seed=34):
+        args = (student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {})
+        expected = ranking(scalar.get_recommendations(*args, limit=20, weights=weights))
+        assert ranking(vectorized.get_recommendations(*args, limit=20, weights=weights)) == expected
+
+
+def test_admission_likelihood_skipped_at_zero_weight(courses, monkeypatch):
+    engine = make_engine(courses, 'scalar')
+    monkeypatch.setattr(engine, '_calculate_admission_likelihood', lambda *args: pytest.fail('scored at weight 0'))
+    student = generate_students(1, seed=35)[0]
+    engine.get_recommendations(student['aLevelSubjects'], student['predictedGrades'], student['preferences'], {})
+
+
+@pytest.mark.parametrize('near', [
+    dict(LONDON, radiusKm=0),
+    dict(LONDON, radiusKm=-1),
+    dict(LONDON, radiusKm='10'),
+    {'latitude': 51.5, 'radiusKm': 10},
+    None,
+    'London',
+    [51.5, -0.12],
+])
+def test_validate_preferences_rejects_bad_near_location(near):
+    with pytest.raises(ValueError):
+        RecommendationEngine().validate_preferences({'nearLocation': near})
+
+
+@pytest.mark.parametrize('preferences', [None, [], 'London'])
+def test_validate_preferences_rejects_non_object(preferences):
+    with pytest.raises(ValueError):
+        RecommendationEngine().validate_preferences(preferences)
+
+
+def test_validate_preferences_accepts_defaults():
+    engine = RecommendationEngine()
+    engine.validate_preferences({})
+    engine.validate_preferences({'nearLocation': dict(LONDON)})
+    engine.validate_preferences({'nearLocation': dict(LONDON, radiusKm=5)})